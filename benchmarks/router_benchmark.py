@@ -0,0 +1,71 @@
+'''Compares matching concrete paths against 10k registered routes with the
+segment trie router and with a loop over compiled route regexes.
+
+Run with `python benchmarks/router_benchmark.py`'''
+import random
+import re
+import timeit
+
+from oapispec.core.router import Router
+
+
+ROUTE_COUNT = 10000
+LOOKUPS = 1000
+
+
+def make_routes(count):
+    routes = []
+    for i in range(count):
+        resource = f'resource{i // 10}'
+        kind = i % 10
+        if kind < 4:
+            routes.append(f'/api/{resource}/action{kind}')
+        elif kind < 7:
+            routes.append(f'/api/{resource}/<int:id>/child{kind}')
+        else:
+            routes.append(f'/api/{resource}/<string:slug>/child{kind}/<int:child_id>')
+    return routes
+
+def concrete_path(route):
+    path = re.sub(r'<int:[a-z_]+>', '42', route)
+    return re.sub(r'<string:[a-z_]+>', 'some-slug', path)
+
+def route_regex(route):
+    pattern = re.sub(r'<int:([a-z_]+)>', r'(?P<\1>\\d+)', route)
+    pattern = re.sub(r'<string:([a-z_]+)>', r'(?P<\1>[^/]+)', pattern)
+    return re.compile(f'^{pattern}$')
+
+def main():
+    routes = make_routes(ROUTE_COUNT)
+    paths = [concrete_path(r) for r in random.Random(0).sample(routes, LOOKUPS)]
+
+    router = Router()
+    for route in routes:
+        router.add(route, 'GET', route)
+
+    regexes = [(route_regex(r), r) for r in routes]
+
+    def match_regex(path):
+        for regex, route in regexes:
+            match = regex.match(path)
+            if match:
+                return route, match.groupdict()
+        return None
+
+    def run_trie():
+        for path in paths:
+            router.match('GET', path)
+
+    def run_regex():
+        for path in paths:
+            match_regex(path)
+
+    trie = min(timeit.repeat(run_trie, number=1, repeat=5)) / LOOKUPS
+    regex = min(timeit.repeat(run_regex, number=1, repeat=1)) / LOOKUPS
+
+    print(f'{ROUTE_COUNT} routes, {LOOKUPS} lookups')
+    print(f'trie:  {trie * 1e6:10.2f} us/lookup')
+    print(f'regex: {regex * 1e6:10.2f} us/lookup')
+
+if __name__ == '__main__':
+    main()
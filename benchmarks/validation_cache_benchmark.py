@@ -0,0 +1,58 @@
+'''Compares hashing a payload for the validation cache with validating it,
+for payloads of growing size, to show where caching starts to pay off.
+
+Run with `python benchmarks/validation_cache_benchmark.py`'''
+import timeit
+
+from oapispec import fields
+from oapispec.model import Model
+from oapispec.core.cache import ValidationCache, payload_hash
+
+
+SIZES = [0, 1, 2, 5, 10, 50, 100, 500]
+NUMBER = 200
+
+
+def make_model():
+    item = Model('Item', {
+        'sku': fields.string(required=True, pattern='^[A-Z]{3}-[0-9]+$'),
+        'quantity': fields.integer(minimum=1, required=True),
+        'price': fields.float(minimum=0)
+    })
+    return Model('Order', {
+        'id': fields.integer(required=True),
+        'customer': fields.string(required=True, max_length=64),
+        'items': fields.array(fields.nested(item))
+    })
+
+def make_payload(size):
+    return {
+        'id': 1,
+        'customer': 'someone@example.com',
+        'items': [{'sku': f'ABC-{i}', 'quantity': i + 1, 'price': 9.99} for i in range(size)]
+    }
+
+def main():
+    model = make_model()
+    model.validator # compile up front
+    print(f'{"items":>6} {"hash us":>10} {"validate us":>12} {"cache hit us":>13} {"speedup":>8}')
+    for size in SIZES:
+        payload = make_payload(size)
+        cache = ValidationCache()
+        cache.validate(model, payload)
+
+        hashing = min(timeit.repeat(lambda: payload_hash(payload), number=NUMBER, repeat=5)) / NUMBER
+        validating = min(timeit.repeat(lambda: model.validate(payload), number=NUMBER, repeat=5)) / NUMBER
+        hit = min(timeit.repeat(lambda: cache.validate(model, payload), number=NUMBER, repeat=5)) / NUMBER
+        print(f'{size:>6} {hashing * 1e6:>10.2f} {validating * 1e6:>12.2f} {hit * 1e6:>13.2f} {validating / hit:>7.1f}x')
+
+    # The smallest possible payload, where validating is about as cheap as hashing
+    flag = Model('Flag', {'on': fields.boolean()})
+    cache = ValidationCache()
+    cache.validate(flag, {'on': True})
+    validating = min(timeit.repeat(lambda: flag.validate({'on': True}), number=NUMBER, repeat=5)) / NUMBER
+    hit = min(timeit.repeat(lambda: cache.validate(flag, {'on': True}), number=NUMBER, repeat=5)) / NUMBER
+    print(f'single boolean field: validate {validating * 1e6:.2f} us, cache hit {hit * 1e6:.2f} us')
+
+if __name__ == '__main__':
+    main()
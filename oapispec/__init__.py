@@ -2,5 +2,8 @@
 from oapispec.version import VERSION
 from oapispec import model
 from oapispec.schema import schema
+from oapispec.registry import Registry
 from oapispec import doc
 from oapispec import fields
+from oapispec import serve
+from oapispec import mock
@@ -0,0 +1,256 @@
+'''The `python -m oapispec` command line.
+
+    python -m oapispec validate --model pkg.mod:Model data.ndjson
+
+validates every line of an ndjson file against a model. The file is memory
+mapped and split on line boundaries across a process pool, each worker
+compiles the model's validator once and the error reports are written to
+stdout, in line order, as ndjson.
+
+    python -m oapispec build pkg.mod:schema -o dist/ [--check]
+
+writes the schema's spec ahead of time: as canonical json, gzip and deflate
+compressed copies of it and a python module holding it as a marshalled
+constant, plus a manifest with the spec's fingerprint. With `--check`
+nothing is written and the command fails when the artifact is stale.'''
+import argparse
+import json
+import marshal
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from oapispec.core.fingerprint import canonical_json, digest
+from oapispec.core.loader import load_object
+from oapispec.serve import ENCODINGS, compress
+
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+#: The file extension of each precompressed copy of the spec
+ENCODING_EXTENSIONS = {'gzip': '.gz', 'deflate': '.deflate'}
+
+# Every value is written with repr() so spec metadata can't inject code
+SPEC_MODULE = """'''A spec generated by `python -m oapispec build`. Do not edit.'''
+import marshal
+
+TITLE = {title!r}
+FINGERPRINT = {fingerprint!r}
+SPEC = marshal.loads({data!r})
+"""
+
+
+def line_ranges(buffer, chunk_size):
+    '''
+    Splits a buffer into (start, end) byte ranges of about `chunk_size`
+    bytes that always end just after a newline (or at the end).
+    '''
+    size = len(buffer)
+    start = 0
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = buffer.find(b'\n', end - 1)
+            end = size if newline == -1 else newline + 1
+        yield start, end
+        start = end
+
+
+_worker = {}
+
+def _init_worker(model_path, fail_fast, max_errors):
+    model = load_object(model_path)
+    # compile the validator once per worker, not on the first record
+    _ = model.validator
+    _worker.update(model=model, fail_fast=fail_fast, max_errors=max_errors)
+
+def _range_lines(buffer, start, end):
+    '''Yields the lines of a byte range of a buffer, with their newline'''
+    position = start
+    while position < end:
+        newline = buffer.find(b'\n', position, end)
+        line_end = end if newline == -1 else newline + 1
+        yield buffer[position:line_end]
+        position = line_end
+
+def _validate_range(job):
+    '''Validates the lines of a byte range of the file, returns the number
+    of lines read and a list of (line index in the range, errors)'''
+    path, start, end = job
+    model = _worker['model']
+    reports = []
+    count = 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for count, line in enumerate(_range_lines(buffer, start, end), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                reports.append((count, {'': f'Invalid JSON: {e}'}))
+                continue
+            errors = model.validate(record, fail_fast=_worker['fail_fast'], max_errors=_worker['max_errors'])
+            if errors:
+                reports.append((count, errors))
+    return count, reports
+
+def validate_file(path, model_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, fail_fast=False, max_errors=None):
+    '''
+    Validates every line of an ndjson file against a model, in parallel.
+
+    :param str path: the ndjson file
+    :param str model_path: the model as `package.module:Model`
+    :param int workers: the number of worker processes, 1 validates in this process
+    :returns: a generator of (line number, errors) for the invalid lines, in order
+    '''
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        jobs = [(path, start, end) for start, end in line_ranges(buffer, chunk_size)]
+
+    initargs = (model_path, fail_fast, max_errors)
+    if workers == 1:
+        _init_worker(*initargs)
+        results = map(_validate_range, jobs)
+        yield from _number_lines(results)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        yield from _number_lines(pool.map(_validate_range, jobs))
+
+def _number_lines(results):
+    offset = 0
+    for count, reports in results:
+        for index, errors in reports:
+            yield offset + index, errors
+        offset += count
+
+def validate_command(args, out=None, err=None):
+    out = out or sys.stdout
+    err = err or sys.stderr
+    invalid = 0
+    for line, errors in validate_file(
+            args.file,
+            args.model,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            fail_fast=args.fail_fast,
+            max_errors=args.max_errors):
+        invalid += 1
+        out.write(json.dumps({'line': line, 'errors': errors}) + '\n')
+    err.write(f'{invalid} invalid line(s) in {args.file}\n')
+    return 1 if invalid else 0
+
+def build_artifacts(schema, name='swagger'):
+    '''
+    Builds the files of a spec artifact.
+
+    :param schema: the schema to build (see `oapispec.schema`)
+    :param str name: the base name of the files
+    :returns: a dict of file name to content (bytes), the manifest included
+    '''
+    spec = schema.generate()
+    fingerprint = schema.fingerprint().spec
+    body = canonical_json(spec)
+
+    files = {f'{name}.json': body}
+    for encoding in ENCODINGS:
+        files[f'{name}.json{ENCODING_EXTENSIONS[encoding]}'] = compress(body, encoding)
+    files[f'{name}.py'] = SPEC_MODULE.format(
+        title=spec['info']['title'],
+        fingerprint=fingerprint,
+        data=marshal.dumps(spec)).encode('utf-8')
+
+    manifest = {
+        'fingerprint': fingerprint,
+        'files': dict((file, digest(content)) for file, content in sorted(files.items()))
+    }
+    files[f'{name}.manifest.json'] = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8') + b'\n'
+    return files
+
+def stale_artifacts(schema, out, name='swagger'):
+    '''
+    Checks a built artifact against the schema, without generating the spec
+    when the fingerprints differ.
+
+    :returns: a list of reasons the artifact is stale, empty when it is up to date
+    '''
+    try:
+        with open(os.path.join(out, f'{name}.manifest.json'), 'rb') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return [f'{name}.manifest.json is missing or unreadable']
+
+    if manifest.get('fingerprint') != schema.fingerprint().spec:
+        return ['the spec changed since the artifact was built']
+
+    reasons = []
+    for file, expected in manifest.get('files', {}).items():
+        try:
+            with open(os.path.join(out, file), 'rb') as f:
+                content = f.read()
+        except OSError:
+            reasons.append(f'{file} is missing')
+            continue
+        if digest(content) != expected:
+            reasons.append(f'{file} was modified')
+    return reasons
+
+def build_command(args, out=None, err=None):
+    out = out or sys.stdout
+    err = err or sys.stderr
+    schema = load_object(args.schema)
+
+    if args.check:
+        reasons = stale_artifacts(schema, args.out, args.name)
+        for reason in reasons:
+            err.write(f'stale: {reason}\n')
+        if reasons:
+            return 1
+        out.write(f'{args.out} is up to date\n')
+        return 0
+
+    os.makedirs(args.out, exist_ok=True)
+    for file, content in build_artifacts(schema, args.name).items():
+        with open(os.path.join(args.out, file), 'wb') as f:
+            f.write(content)
+        out.write(f'wrote {os.path.join(args.out, file)}\n')
+    return 0
+
+def positive_int(value):
+    '''An argparse type for counts and sizes that must be at least 1'''
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a positive integer')
+    return number
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='python -m oapispec')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    validate = commands.add_parser('validate', help='validate an ndjson file against a model')
+    validate.add_argument('file', help='the ndjson file to validate')
+    validate.add_argument('--model', required=True, help='the model to validate with, as package.module:Model')
+    validate.add_argument('--workers', type=positive_int, default=None, help='number of worker processes (default: cpu count)')
+    validate.add_argument('--chunk-size', type=positive_int, default=DEFAULT_CHUNK_SIZE, help='bytes of the file per job')
+    validate.add_argument('--fail-fast', action='store_true', help='report only the first error per line')
+    validate.add_argument('--max-errors', type=positive_int, default=None, help='report at most this many errors per line')
+    validate.set_defaults(run=validate_command)
+
+    build = commands.add_parser('build', help='write the spec of a schema ahead of time')
+    build.add_argument('schema', help='the schema to build, as package.module:schema')
+    build.add_argument('-o', '--out', default='dist', help='the directory to write to (default: dist)')
+    build.add_argument('--name', default='swagger', help='the base name of the files (default: swagger)')
+    build.add_argument('--check', action='store_true', help='write nothing, fail if the files in the directory are stale')
+    build.set_defaults(run=build_command)
+
+    return parser
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    return args.run(args)
@@ -0,0 +1,96 @@
+'''Streaming validation of many records against one model.
+
+Records are consumed lazily and validated with the model's compiled
+validator, so batches of any size go through in constant memory and
+without any per record setup.'''
+from itertools import islice
+from time import perf_counter
+
+from oapispec.core.validation import error_key, error_limit
+
+
+class BatchSummary:
+    '''
+    Running counts of a batch validation. Pass one to `validate_iter` and
+    read it once the iteration is done (or while it is running). `stopped`
+    is set when the batch was cut short by `stop_after`.
+    '''
+
+    def __init__(self):
+        self.total = 0
+        self.valid = 0
+        self.invalid = 0
+        self.errors = 0
+        self.stopped = False
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'valid': self.valid,
+            'invalid': self.invalid,
+            'errors': self.errors,
+            'stopped': self.stopped
+        }
+
+    def __repr__(self):
+        return 'BatchSummary({0})'.format(', '.join(f'{k}={v!r}' for k, v in self.as_dict().items()))
+
+
+def validate_iter(model, records, errors_only=False, fail_fast=False, max_errors=None, stop_after=None, summary=None):
+    '''
+    Lazily validates records, yielding an `(index, errors)` pair per record
+    where errors is a dict like `Model.validate` returns (None when valid).
+
+    :param Model model: the model to validate against
+    :param records: any iterable of records, consumed lazily
+    :param bool errors_only: only yield the invalid records
+    :param bool fail_fast: stop validating a record at its first error
+    :param int max_errors: stop validating a record after this many errors
+    :param int stop_after: stop the whole batch after this many invalid records
+    :param BatchSummary summary: optional summary to update with counts
+    '''
+    summary = summary if summary is not None else BatchSummary()
+    iter_errors = model.validator.iter_errors
+    limit = error_limit(fail_fast, max_errors)
+
+    if stop_after is not None and stop_after < 1:
+        raise ValueError('stop_after must be at least 1')
+
+    observer = model.observer
+    for index, record in enumerate(records):
+        summary.total += 1
+        if observer is None:
+            errors = dict((error_key(e), e.message) for e in islice(iter_errors(record), limit))
+        else:
+            started = perf_counter()
+            errors = dict((error_key(e), e.message) for e in islice(iter_errors(record), limit))
+            observer.observe(model, record, list(errors), perf_counter() - started)
+        if not errors:
+            summary.valid += 1
+            if not errors_only:
+                yield index, None
+            continue
+        summary.invalid += 1
+        summary.errors += len(errors)
+        yield index, errors
+        if summary.invalid == stop_after:
+            summary.stopped = True
+            return
+
+def chunked(iterable, size):
+    '''Lazily splits an iterable into lists of (at most) `size` items'''
+    if size < 1:
+        raise ValueError('Chunk size must be at least 1')
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def validate_chunks(model, records, chunk_size, **kwargs):
+    '''
+    Like `validate_iter` but yields the results in lists of `chunk_size`
+    pairs, handy for acknowledging queue messages in batches.
+    '''
+    return chunked(validate_iter(model, records, **kwargs), chunk_size)
@@ -0,0 +1,141 @@
+'''A bounded cache of validation results for payloads seen before.
+
+Results are keyed by the model's fingerprint (the canonical json of its
+self-contained schema) and a blake2b hash of the payload's canonical json,
+so equal payloads hit the cache whatever their key order. Hashing is a
+single `json.dumps` plus blake2b, which is cheaper than validating all but
+the smallest payloads, see `benchmarks/validation_cache_benchmark.py`.'''
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+from oapispec.core.fingerprint import canonical_json, digest
+from oapispec.core.validation import self_contained_schema
+
+
+def check_json_types(data):
+    '''
+    Checks a payload only holds json types. `json.dumps` serializes tuples
+    like lists and non-str keys as strings, but the validator rejects them,
+    so such payloads would share the cache key of a valid one.
+
+    :raises TypeError: on a tuple or a non-str key
+    '''
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise TypeError(f'{key!r} is not a str key')
+                pending.append(item)
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, tuple):
+            raise TypeError('tuples are not json arrays')
+
+def payload_hash(data):
+    '''
+    Hashes a payload's canonical json with blake2b
+
+    :raises TypeError: if the payload isn't json serializable or holds
+        values json would coerce (see `check_json_types`)
+    :rtype: bytes
+    '''
+    check_json_types(data)
+    return hashlib.blake2b(canonical_json(data), digest_size=16).digest()
+
+
+class ValidationCache:
+    '''
+    An LRU cache of `Model.validate` results.
+
+    :param int maxsize: the number of results kept, the least recently used
+        result is evicted past it
+    :param float ttl: seconds a result stays valid, None to keep results
+        until they are evicted
+    :param clock: the time function used for the ttl
+    '''
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._results = OrderedDict()
+        self._fingerprints = WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.uncacheable = 0
+
+    def fingerprint(self, model):
+        '''The fingerprint of a model's self-contained schema, computed once per model'''
+        fingerprint = self._fingerprints.get(model)
+        if fingerprint is None:
+            fingerprint = digest(canonical_json(self_contained_schema(model)))
+            self._fingerprints[model] = fingerprint
+        return fingerprint
+
+    def validate(self, model, data, fail_fast=False, max_errors=None, partial=False):
+        '''
+        Like `model.validate(data, ...)` but returns the cached result when
+        an equal payload was validated with the same options before.
+        Payloads that aren't json serializable, or hold tuples or non-str
+        keys, are validated every time.
+        '''
+        try:
+            key = (self.fingerprint(model), payload_hash(data), fail_fast, max_errors, partial)
+        except (TypeError, ValueError):
+            self.uncacheable += 1
+            return model.validate(data, fail_fast=fail_fast, max_errors=max_errors, partial=partial)
+
+        now = self.clock()
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                expires, errors = cached
+                if expires is None or now < expires:
+                    self._results.move_to_end(key)
+                    self.hits += 1
+                    return dict(errors) if errors else None
+                del self._results[key]
+                self.expirations += 1
+            self.misses += 1
+
+        errors = model.validate(data, fail_fast=fail_fast, max_errors=max_errors, partial=partial)
+        expires = None if self.ttl is None else now + self.ttl
+
+        with self._lock:
+            self._results[key] = (expires, dict(errors) if errors else None)
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+        return errors
+
+    def clear(self):
+        '''Drops every cached result, the stats are kept'''
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'uncacheable': self.uncacheable
+        }
@@ -0,0 +1,219 @@
+'''Columnar validation of batches of flat records with numpy.
+
+A batch is transposed into one array per field and the field's type,
+`minimum`/`maximum` (and their exclusive flags), `multipleOf`,
+`minLength`/`maxLength` and `enum` constraints are checked with vector
+operations, reading the constraints straight from the field schemas. Fields
+with anything else in their schema (nested models, arrays, patterns ...)
+are validated per record with jsonschema. Errors have the same keys and
+messages as `Model.validate`.
+
+When a `Model.observer` is installed every row of a batch is reported to it,
+each with an even share of the batch's validation time.
+
+numpy is an optional dependency, install it with `pip install oapispec[columnar]`.'''
+from time import perf_counter
+
+from oapispec.core.validation import Validator, compile_enums, describe_enum, error_key, referenced_models
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
+
+
+MISSING = object()
+
+#: Checks whether a value is an instance of a swagger type, like jsonschema's Draft4 type checker
+TYPE_CHECKS = {
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'string': lambda v: isinstance(v, str),
+    'boolean': lambda v: isinstance(v, bool)
+}
+
+#: Schema keys that either have a vectorized check or don't affect validation
+SUPPORTED_KEYS = frozenset([
+    'type', 'minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum', 'multipleOf',
+    'minLength', 'maxLength', 'enum', 'format', 'title', 'description', 'readOnly',
+    'default', 'example', 'multiple'
+])
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError('Columnar validation requires numpy, install it with `pip install oapispec[columnar]`')
+
+
+class Column:
+    '''
+    A field compiled for columnar validation.
+
+    :param str name: the field name
+    :param dict schema: the field's schema, None if it is validated per record
+        (then only its presence is checked here)
+    :param bool required: whether the field is required
+    '''
+
+    def __init__(self, name, schema, required):
+        self.name = name
+        self.required = required
+        self.schema = schema
+        self.type = schema['type'] if schema is not None else None
+
+    def check(self, values):
+        '''
+        Checks the (present) values of this column, returns a list of
+        (position in values, message) pairs. When a value fails several
+        constraints the last pair is the one `Model.validate` reports.
+        '''
+        is_type = TYPE_CHECKS[self.type]
+        typed = numpy.fromiter((is_type(v) for v in values), dtype=bool, count=len(values))
+        failures = [
+            (i, f'{values[i]!r} is not of type {self.type!r}')
+            for i in numpy.flatnonzero(~typed)
+        ]
+
+        positions = numpy.flatnonzero(typed)
+        typed_values = [values[i] for i in positions]
+        if self.type in ('integer', 'number'):
+            checks = self._numeric_checks(typed_values)
+        elif self.type == 'string':
+            checks = self._string_checks(typed_values)
+        else:
+            checks = self._enum_checks(typed_values, numpy.array(typed_values, dtype=bool))
+
+        # jsonschema checks the keywords in the (sorted) schema order
+        for _, failed, describe in sorted(checks, key=lambda c: c[0]):
+            failures.extend((positions[i], describe(typed_values[i])) for i in numpy.flatnonzero(failed))
+        return failures
+
+    def _enum_checks(self, values, array):
+        if 'enum' not in self.schema:
+            return []
+        enum = self.schema['enum']
+        # only values of the column's type can match, (1.0 can match 1 though)
+        is_candidate = TYPE_CHECKS['number' if self.type == 'integer' else self.type]
+        candidates = numpy.array([e for e in enum if is_candidate(e)])
+        failed = ~numpy.isin(array, candidates)
+        description = describe_enum(enum)
+        return [('enum', failed, lambda v: f'{v!r} is not one of {description}')]
+
+    def _numeric_checks(self, values):
+        schema = self.schema
+        array = numpy.array(values)
+        checks = self._enum_checks(values, array)
+        if 'maximum' in schema:
+            maximum = schema['maximum']
+            if schema.get('exclusiveMaximum'):
+                failed, comparison = array >= maximum, 'greater than or equal to'
+            else:
+                failed, comparison = array > maximum, 'greater than'
+            checks.append(('maximum', failed, lambda v: f'{v!r} is {comparison} the maximum of {maximum!r}'))
+        if 'minimum' in schema:
+            minimum = schema['minimum']
+            if schema.get('exclusiveMinimum'):
+                failed_min, comparison_min = array <= minimum, 'less than or equal to'
+            else:
+                failed_min, comparison_min = array < minimum, 'less than'
+            checks.append(('minimum', failed_min, lambda v: f'{v!r} is {comparison_min} the minimum of {minimum!r}'))
+        if 'multipleOf' in schema:
+            multiple = schema['multipleOf']
+            if isinstance(multiple, float):
+                quotient = array / multiple
+                failed_multiple = quotient != numpy.trunc(quotient)
+            else:
+                failed_multiple = (array % multiple) != 0
+            checks.append(('multipleOf', failed_multiple, lambda v: f'{v!r} is not a multiple of {multiple!r}'))
+        return checks
+
+    def _string_checks(self, values):
+        schema = self.schema
+        checks = self._enum_checks(values, numpy.array(values, dtype=str))
+        if 'minLength' in schema or 'maxLength' in schema:
+            lengths = numpy.fromiter((len(v) for v in values), dtype=numpy.int64, count=len(values))
+            if 'maxLength' in schema:
+                checks.append(('maxLength', lengths > schema['maxLength'], lambda v: f'{v!r} is too long'))
+            if 'minLength' in schema:
+                checks.append(('minLength', lengths < schema['minLength'], lambda v: f'{v!r} is too short'))
+        return checks
+
+
+def is_columnar(schema):
+    '''Whether a field schema can be checked with vector operations'''
+    return schema.get('type') in TYPE_CHECKS and SUPPORTED_KEYS.issuperset(schema.keys())
+
+def compile_columns(model):
+    '''
+    Splits a model's fields into vectorized `Column`s and a jsonschema
+    validator for the rest (None when every field is columnar). Compiled
+    once per model, with its validators.
+    '''
+    return model._compile('columns', _compile_columns) # pylint: disable=protected-access
+
+def _compile_columns(model):
+    columns = []
+    rest = {}
+    for name, field in model.all_attributes.items():
+        schema = field.__schema__
+        if is_columnar(schema):
+            columns.append(Column(name, schema, bool(field.required)))
+        else:
+            columns.append(Column(name, None, bool(field.required)))
+            rest[name] = schema
+
+    fallback = None
+    if rest:
+        definitions = dict((name, m.__schema__) for name, m in referenced_models(model).items())
+        fallback = Validator(compile_enums({'properties': rest, 'definitions': definitions}))
+    return columns, fallback
+
+def validate_columns(model, records):
+    '''
+    Validates a batch of records column by column.
+
+    :param Model model: the model to validate against
+    :param records: an iterable of records (dicts)
+    :returns: a dict of row index to that row's errors (keyed and worded
+        like `Model.validate`), only for the invalid rows
+    '''
+    require_numpy()
+    records = records if isinstance(records, list) else list(records)
+    columns, fallback = compile_columns(model)
+    observer = model.observer
+    started = perf_counter() if observer is not None else None
+    errors = {}
+
+    rows = []
+    for index, record in enumerate(records):
+        if isinstance(record, dict):
+            rows.append(index)
+        else:
+            errors[index] = {'': f"{record!r} is not of type 'object'"}
+
+    for column in columns:
+        present = []
+        values = []
+        for index in rows:
+            value = records[index].get(column.name, MISSING)
+            if value is MISSING:
+                if column.required:
+                    errors.setdefault(index, {})[column.name] = f'{column.name!r} is a required property'
+            else:
+                present.append(index)
+                values.append(value)
+        if column.type is None or not values:
+            continue
+        for position, message in column.check(values):
+            errors.setdefault(present[position], {})[column.name] = message
+
+    if fallback is not None:
+        for index in rows:
+            for error in fallback.iter_errors(records[index]):
+                errors.setdefault(index, {})[error_key(error)] = error.message
+
+    if observer is not None and records:
+        share = (perf_counter() - started) / len(records)
+        for index, record in enumerate(records):
+            observer.observe(model, record, list(errors.get(index, ())), share)
+
+    return errors
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def default_executor():
+    '''Returns the (lazily created) thread pool used to offload spec
+    generation when the caller doesn't provide an executor'''
+    global _default_executor # pylint: disable=global-statement
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='oapispec')
+        return _default_executor
+
+
+class SingleFlight:
+    '''
+    Runs a function at most once in an executor. Every caller that arrives
+    while the call is in flight awaits that same call and every caller after
+    it completes gets the cached result. If the call raises, the error is
+    given to the waiting callers and the next caller starts a new call.
+
+    :param callable func: the function to run, it takes no arguments
+    '''
+
+    def __init__(self, func):
+        self._func = func
+        self._lock = threading.RLock()
+        self._future = None
+
+    def _submit(self, executor):
+        with self._lock:
+            future = self._future
+            if future is None:
+                future = self._future = (executor or default_executor()).submit(self._func)
+                future.add_done_callback(self._forget_failure)
+            return future
+
+    def _forget_failure(self, future):
+        if future.cancelled() or future.exception() is not None:
+            with self._lock:
+                if self._future is future:
+                    self._future = None
+
+    async def __call__(self, executor=None):
+        '''
+        :param concurrent.futures.Executor executor: optional executor to
+            run the call in, only used when a new call has to be started
+        '''
+        future = self._submit(executor)
+        if future.done():
+            return future.result()
+        # shielded so one cancelled caller doesn't cancel the call for the rest
+        return await asyncio.shield(asyncio.wrap_future(future))
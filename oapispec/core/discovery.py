@@ -0,0 +1,165 @@
+'''Discovers the handlers of a package tree, with an on-disk scan index.
+
+Every module file of the package is listed from the file system and only
+the modules that changed since the last scan are imported: the index keeps
+each file's mtime, size and sha256 next to the names of the handlers found
+in it. A touched but unchanged file is recognised by its hash and isn't
+imported either.
+
+Packages are imported first, in order, so their `__init__` side effects run
+as usual. The changed modules are then imported concurrently, any module
+failing to import concurrently (ex. on an import cycle) is retried alone.
+
+Discovered handlers are returned as `module:name` references so handlers
+of unchanged modules are only imported once the spec is generated, the
+referenced modules are then imported concurrently too, see
+`oapispec.core.loader`.'''
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+
+from oapispec.core.loader import handler_names, import_modules
+
+
+INDEX_VERSION = 1
+
+
+def package_modules(package):
+    '''
+    Lists the modules of a package tree from the file system, without
+    importing them (only the package itself and its parents are imported).
+
+    :returns: a sorted list of (module name, file path, is package) tuples
+    '''
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        raise ValueError(f'{package} is not a package')
+
+    modules = []
+    pending = [(package, path) for path in spec.submodule_search_locations]
+    while pending:
+        name, directory = pending.pop()
+        init = os.path.join(directory, '__init__.py')
+        if os.path.exists(init):
+            modules.append((name, init, True))
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if entry.is_dir() and entry.name.isidentifier() and os.path.exists(os.path.join(entry.path, '__init__.py')):
+                pending.append((f'{name}.{entry.name}', entry.path))
+            elif entry.is_file() and entry.name.endswith('.py') and entry.name != '__init__.py':
+                stem = entry.name[:-3]
+                if stem.isidentifier():
+                    modules.append((f'{name}.{stem}', entry.path, False))
+    return sorted(modules)
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_index(path, package):
+    '''Reads a scan index, an empty one when it is missing, unreadable or for another package'''
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get('version') != INDEX_VERSION or index.get('package') != package:
+        return {}
+    return index.get('modules', {})
+
+def save_index(path, package, modules):
+    '''Writes a scan index atomically (to a temporary file swapped in place)'''
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({'version': INDEX_VERSION, 'package': package, 'modules': modules}, f, indent=1, sort_keys=True)
+    os.replace(temporary, path)
+
+def _import_handler_names(name):
+    return handler_names(importlib.import_module(name))
+
+def import_handler_names(names, workers=None):
+    '''
+    Imports modules concurrently (see `loader.import_modules`) and returns
+    a dict of module name to the names of its handlers.
+    '''
+    import_modules(names, workers)
+    return dict((name, _import_handler_names(name)) for name in names)
+
+
+class DiscoveryStats:
+    '''What a discovery did, `imported` modules were (re)scanned, `cached` ones came from the index'''
+
+    def __init__(self):
+        self.modules = 0
+        self.imported = 0
+        self.cached = 0
+        self.handlers = 0
+
+    def as_dict(self):
+        return {
+            'modules': self.modules,
+            'imported': self.imported,
+            'cached': self.cached,
+            'handlers': self.handlers
+        }
+
+
+def discover(package, index_path=None, workers=None, stats=None):
+    '''
+    Finds every handler of a package tree.
+
+    :param str package: the package name, ex. `myapp.handlers`
+    :param str index_path: the scan index file, None to scan (import) every module
+    :param int workers: the number of threads importing modules
+    :param DiscoveryStats stats: optional stats to fill
+    :returns: the handlers as `module:name` references, in module name and
+        then definition order
+    '''
+    stats = stats if stats is not None else DiscoveryStats()
+    previous = load_index(index_path, package) if index_path else {}
+    modules = package_modules(package)
+
+    entries = {}
+    changed = []
+    for name, path, is_package in modules:
+        stat = os.stat(path)
+        entry = {'path': path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        cached = previous.get(name)
+        if cached is not None and cached.get('path') == path:
+            if cached['mtime_ns'] == entry['mtime_ns'] and cached['size'] == entry['size']:
+                entries[name] = cached
+                continue
+            entry['sha256'] = file_hash(path)
+            if cached.get('sha256') == entry['sha256']:
+                entries[name] = {**entry, 'handlers': cached['handlers']}
+                continue
+        entries[name] = entry
+        changed.append((name, is_package))
+
+    # packages first and in order, their modules may rely on them being initialized
+    packages = [name for name, is_package in changed if is_package]
+    found = dict((name, _import_handler_names(name)) for name in packages)
+    found.update(import_handler_names([name for name, is_package in changed if not is_package], workers))
+
+    for name, handlers in found.items():
+        entry = entries[name]
+        entry['handlers'] = handlers
+        if 'sha256' not in entry:
+            entry['sha256'] = file_hash(entry['path'])
+
+    if index_path:
+        save_index(index_path, package, entries)
+
+    references = [
+        f'{name}:{handler}'
+        for name, _, _ in modules
+        for handler in entries[name]['handlers']
+    ]
+    stats.modules = len(modules)
+    stats.imported = len(found)
+    stats.cached = len(modules) - len(found)
+    stats.handlers = len(references)
+    return references
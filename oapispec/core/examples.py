@@ -0,0 +1,593 @@
+'''Synthesizes example payloads from models, for fixtures and load tests.
+
+A model is compiled once into a tree of small generator functions, one per
+field, that read the field's type, bounds, `enum`, `pattern`, `format`,
+nested models and array items. Generating a record is then a walk of plain
+function calls on a seeded `random.Random`, so the same seed always yields
+the same records.
+
+Three modes are supported:
+
+- `valid`: random values within the constraints
+- `boundary`: values on the edges of the constraints (minimum, maximum,
+  lengths and item counts)
+- `invalid`: valid records with one constraint of one field violated,
+  optionally only the given keywords (`required`, `type`, `maximum` ...).
+  A float just past a bound can also fail its `multipleOf`.'''
+import base64
+import datetime
+import itertools
+import math
+import re
+import string
+import struct
+import uuid
+from random import Random
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError: # pragma: no cover, python < 3.11
+    import sre_constants
+    import sre_parse
+
+
+MODES = ('valid', 'boundary', 'invalid')
+
+#: The width of the range numbers are drawn from when they have no bound
+DEFAULT_RANGE = 1000
+
+#: Extra repetitions generated for unbounded regex quantifiers (`*`, `+`)
+EXTRA_REPEATS = 4
+
+#: Number of arrays items generated past `minItems` when there is no `maxItems`
+DEFAULT_ITEMS = 3
+
+#: Optional fields and array items stop being generated below this depth
+MAX_DEPTH = 3
+
+#: Attempts at generating a string matching both a pattern and length bounds
+PATTERN_ATTEMPTS = 50
+
+ALPHABET = string.ascii_letters + string.digits
+PRINTABLE = ALPHABET + ' -_.'
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: string.digits,
+    sre_constants.CATEGORY_NOT_DIGIT: string.ascii_letters,
+    sre_constants.CATEGORY_WORD: ALPHABET + '_',
+    sre_constants.CATEGORY_NOT_WORD: ' -.',
+    sre_constants.CATEGORY_SPACE: ' ',
+    sre_constants.CATEGORY_NOT_SPACE: ALPHABET
+}
+
+REPEATS = tuple(
+    op for op in (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        getattr(sre_constants, 'POSSESSIVE_REPEAT', None)
+    ) if op is not None
+)
+
+EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+DATE_SPAN = 30 * 365 * 24 * 3600
+
+
+def _charset(items):
+    chars = []
+    negate = False
+    for op, value in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            chars.append(chr(value))
+        elif op is sre_constants.RANGE:
+            low, high = value
+            chars.extend(chr(c) for c in range(low, min(high, low + 255) + 1))
+        elif op is sre_constants.CATEGORY:
+            chars.extend(CATEGORIES[value])
+    if negate:
+        excluded = set(chars)
+        chars = [c for c in PRINTABLE if c not in excluded]
+    return chars
+
+def _sequence(items):
+    parts = [part for part in (_node(op, value) for op, value in items) if part is not None]
+    return lambda rng, groups: ''.join(part(rng, groups) for part in parts)
+
+def _node(op, value):
+    if op is sre_constants.LITERAL:
+        char = chr(value)
+        return lambda rng, groups: char
+    if op is sre_constants.NOT_LITERAL:
+        chars = [c for c in PRINTABLE if ord(c) != value]
+        return lambda rng, groups: rng.choice(chars)
+    if op is sre_constants.ANY:
+        return lambda rng, groups: rng.choice(ALPHABET)
+    if op is sre_constants.IN:
+        chars = _charset(value)
+        return lambda rng, groups: rng.choice(chars)
+    if op is sre_constants.BRANCH:
+        branches = [_sequence(branch) for branch in value[1]]
+        return lambda rng, groups: rng.choice(branches)(rng, groups)
+    if op is sre_constants.SUBPATTERN:
+        group, inner = value[0], _sequence(value[-1])
+        def subpattern(rng, groups):
+            text = inner(rng, groups)
+            groups[group] = text
+            return text
+        return subpattern
+    if op in REPEATS:
+        low, high, items = value
+        high = low + EXTRA_REPEATS if high is sre_constants.MAXREPEAT else high
+        inner = _sequence(items)
+        return lambda rng, groups: ''.join(inner(rng, groups) for _ in range(rng.randint(low, high)))
+    if op is sre_constants.GROUPREF:
+        return lambda rng, groups: groups.get(value, '')
+    if op is sre_constants.AT:
+        return None
+    raise ValueError(f'Unsupported regular expression construct: {op}')
+
+def compile_pattern(pattern):
+    '''
+    Compiles a regular expression into a function generating (random)
+    strings it matches, ex. `lambda rng: 'ABC-42'` for `^[A-Z]{3}-\\d+$`.
+    Flags are ignored so check the results against the pattern when using
+    those.
+
+    :raises ValueError: on constructs it can't generate, ex. lookarounds
+    '''
+    generate = _sequence(list(sre_parse.parse(pattern)))
+    return lambda rng: generate(rng, {})
+
+
+class FieldSynth:
+    '''
+    The compiled generators of a field.
+
+    :param valid: `valid(rng, depth)` returns a random valid value
+    :param boundary: `boundary(rng, depth)` returns a valid value on the
+        edge of the field's constraints
+    :param violations: a function returning a list of `(keyword, bad(rng))`
+        where `bad` returns a value violating the keyword, built lazily so
+        recursive models can be compiled
+    '''
+
+    __slots__ = ('valid', 'boundary', 'violations')
+
+    def __init__(self, valid, boundary=None, violations=None):
+        self.valid = valid
+        self.boundary = boundary or valid
+        self.violations = violations or (lambda: [])
+
+
+class ModelSynth:
+    '''The compiled generators of a model, see `Synthesizer`'''
+
+    def __init__(self, synthesizer, model):
+        self.synthesizer = synthesizer
+        self.model = model
+        self._fields = None
+        self._violations = None
+        self._building = False
+
+    @property
+    def fields(self):
+        if self._fields is None:
+            self._fields = [
+                (name, bool(field.required), self.synthesizer.field(field, self.model))
+                for name, field in self.model.all_attributes.items()
+            ]
+        return self._fields
+
+    def record(self, rng, depth=0, boundary=False):
+        '''Generates a valid record, on the edges of the constraints with `boundary`'''
+        optional = self.synthesizer.optional if depth < self.synthesizer.max_depth else 0
+        record = {}
+        for name, required, synth in self.fields:
+            if required or (optional and rng.random() < optional):
+                record[name] = (synth.boundary if boundary else synth.valid)(rng, depth + 1)
+        return record
+
+    @property
+    def violations(self):
+        '''
+        The ways a record can be made invalid, a list of `(keyword,
+        apply(record, rng))` where `apply` breaks a valid record in place.
+        A model nested in itself only contributes its own violations once.
+        '''
+        if self._violations is not None:
+            return self._violations
+        if self._building:
+            return []
+        self._building = True
+        violations = []
+        for name, required, synth in self.fields:
+            if required:
+                violations.append(('required', _remove(name)))
+            for keyword, bad in synth.violations():
+                violations.append((keyword, _replace(name, bad)))
+        self._violations = violations
+        self._building = False
+        return violations
+
+def _remove(name):
+    def apply(record, rng):
+        record.pop(name, None)
+    return apply
+
+def _replace(name, bad):
+    def apply(record, rng):
+        record[name] = bad(rng)
+    return apply
+
+
+class Synthesizer:
+    '''
+    Compiles models and fields into generators, each model is compiled once
+    per synthesizer.
+
+    :param float optional: the probability an optional field is generated
+    :param int max_depth: the nesting depth below which optional fields
+        and array items aren't generated any more
+    '''
+
+    def __init__(self, optional=0.5, max_depth=MAX_DEPTH):
+        self.optional = optional
+        self.max_depth = max_depth
+        self._models = {}
+
+    def model(self, model):
+        synth = self._models.get(model.name)
+        if synth is None:
+            synth = self._models[model.name] = ModelSynth(self, model)
+        return synth
+
+    def field(self, field, owner=None):
+        '''
+        Compiles a field into a `FieldSynth`
+
+        :param owner: the model the field belongs to, the value of its
+            discriminator field is that model's name
+        '''
+        model = field.get('model')
+        if model is not None:
+            nested = self._nested(self.model(model))
+            return self._array(nested, field.__schema__) if field.get('as_list') else nested
+        item = field.get('item')
+        if item is not None:
+            return self._array(self.field(item), field.__schema__)
+
+        definition = field.get('definition')
+        schema = field.__schema__
+        if definition is not None:
+            # a shared enum, maybe narrowed by the field's constraints (see `fields.string`)
+            schema = dict(definition.__schema__)
+            for constraints in field.__schema__.get('allOf', [])[1:]:
+                schema.update(constraints)
+        kind = schema.get('type')
+        if 'enum' in schema:
+            return _enum(_allowed_values(schema), kind)
+        if owner is not None and field.get('discriminator') and kind == 'string':
+            return _constant(owner.name, kind)
+        if kind == 'integer':
+            return _integer(schema)
+        if kind == 'number':
+            return _number(schema)
+        if kind == 'string':
+            return _string(schema)
+        if kind == 'boolean':
+            return FieldSynth(
+                lambda rng, depth: rng.random() < 0.5,
+                violations=lambda: [('type', lambda rng: 'true')])
+        return _raw(schema)
+
+    def _nested(self, synth):
+        def violations():
+            nested = [('type', lambda rng: 'x')]
+            for keyword, apply in synth.violations:
+                nested.append((keyword, _broken(synth, apply)))
+            return nested
+        return FieldSynth(
+            synth.record,
+            lambda rng, depth: synth.record(rng, depth, boundary=True),
+            violations)
+
+    def _array(self, item, schema):
+        low = schema.get('minItems', 0)
+        high = schema.get('maxItems', low + DEFAULT_ITEMS)
+        unique = schema.get('uniqueItems', False)
+        max_depth = self.max_depth
+
+        def items(rng, depth, size, generate):
+            values = []
+            for _ in range(size * 10 if unique else size):
+                value = generate(rng, depth)
+                if not unique or value not in values:
+                    values.append(value)
+                if len(values) == size:
+                    break
+            return values
+
+        def valid(rng, depth):
+            size = rng.randint(low, high) if depth < max_depth else low
+            return items(rng, depth, size, item.valid)
+
+        def boundary(rng, depth):
+            return items(rng, depth, rng.choice([low, high]), item.boundary)
+
+        def violations():
+            found = [('type', lambda rng: {})]
+            if low > 0:
+                found.append(('minItems', lambda rng: items(rng, 0, low - 1, item.valid)))
+            if 'maxItems' in schema:
+                found.append(('maxItems', lambda rng: [item.valid(rng, 0) for _ in range(high + 1)]))
+            if unique:
+                found.append(('uniqueItems', lambda rng: [item.valid(rng, 0)] * max(low, 2)))
+            for keyword, bad in item.violations():
+                found.append((keyword, _with_bad_item(items, item, max(low, 1), bad)))
+            return found
+
+        return FieldSynth(valid, boundary, violations)
+
+def _broken(synth, apply):
+    def bad(rng):
+        record = synth.record(rng, 1)
+        apply(record, rng)
+        return record
+    return bad
+
+def _with_bad_item(items, item, size, bad):
+    return lambda rng: [*items(rng, 0, size - 1, item.valid), bad(rng)]
+
+def _wrong_type(kind):
+    if kind == 'string':
+        return lambda rng: rng.randint(0, DEFAULT_RANGE)
+    if kind is None:
+        return None
+    return lambda rng: str(rng.randint(0, DEFAULT_RANGE))
+
+def _type_violation(kind):
+    wrong = _wrong_type(kind)
+    return [('type', wrong)] if wrong is not None else []
+
+def _constant(value, kind):
+    return FieldSynth(lambda rng, depth: value, violations=lambda: _type_violation(kind))
+
+def _allowed_values(schema):
+    '''The enum values meeting the schema's string length and pattern constraints'''
+    low = schema.get('minLength')
+    high = schema.get('maxLength')
+    regex = re.compile(schema['pattern']) if 'pattern' in schema else None
+    values = [
+        value for value in schema['enum']
+        if not isinstance(value, str) or (
+            (low is None or len(value) >= low)
+            and (high is None or len(value) <= high)
+            and (regex is None or regex.search(value)))
+    ]
+    if not values:
+        raise ValueError(f'No enum value meets {schema}')
+    return values
+
+def _enum(values, kind):
+    values = list(values)
+
+    def outside(rng):
+        candidate = f'not-{values[0]}'
+        while candidate in values:
+            candidate += '-'
+        return candidate
+
+    return FieldSynth(
+        lambda rng, depth: rng.choice(values),
+        lambda rng, depth: rng.choice([values[0], values[-1]]),
+        lambda: [('enum', outside)])
+
+def _raw(schema):
+    if 'example' in schema or 'default' in schema:
+        value = schema.get('example', schema.get('default'))
+    else:
+        value = {} if schema.get('type') == 'object' else None
+    return _constant(value, schema.get('type'))
+
+def _integer(schema):
+    multiple = schema.get('multipleOf') or 1
+    low = schema.get('minimum')
+    high = schema.get('maximum')
+    if low is not None:
+        low = math.floor(low) + 1 if schema.get('exclusiveMinimum') else math.ceil(low)
+    if high is not None:
+        high = math.ceil(high) - 1 if schema.get('exclusiveMaximum') else math.floor(high)
+    low = low if low is not None else (high - DEFAULT_RANGE if high is not None else 0)
+    high = high if high is not None else low + DEFAULT_RANGE
+
+    # generate multiples, k * multiple with k in [first, last]
+    first = math.ceil(low / multiple)
+    last = math.floor(high / multiple)
+    if first > last:
+        raise ValueError(f'No integer satisfies {schema}')
+
+    edges = []
+    if 'minimum' in schema:
+        edges.append(first * multiple)
+    if 'maximum' in schema:
+        edges.append(last * multiple)
+
+    def valid(rng, depth):
+        return rng.randint(first, last) * multiple
+
+    def violations():
+        found = _type_violation('integer')
+        if 'minimum' in schema:
+            found.append(('minimum', lambda rng: (first - 1) * multiple))
+        if 'maximum' in schema:
+            found.append(('maximum', lambda rng: (last + 1) * multiple))
+        if multiple > 1:
+            found.append(('multipleOf', lambda rng: rng.randint(first, last) * multiple + 1))
+        return found
+
+    boundary = (lambda rng, depth: rng.choice(edges)) if edges else valid
+    return FieldSynth(valid, boundary, violations)
+
+def next_float(value, up):
+    '''The closest float above (or below) the value, like `math.nextafter`
+    which needs python 3.9. Adjacent floats have adjacent bit patterns.'''
+    if value == 0:
+        smallest = struct.unpack('<d', struct.pack('<q', 1))[0]
+        return smallest if up else -smallest
+    bits = struct.unpack('<q', struct.pack('<d', value))[0]
+    bits += 1 if (value > 0) == up else -1
+    return struct.unpack('<d', struct.pack('<q', bits))[0]
+
+def _number(schema):
+    multiple = schema.get('multipleOf')
+    low = schema.get('minimum')
+    high = schema.get('maximum')
+    if low is not None and schema.get('exclusiveMinimum'):
+        low = next_float(low, up=True)
+    if high is not None and schema.get('exclusiveMaximum'):
+        high = next_float(high, up=False)
+    low = low if low is not None else (high - DEFAULT_RANGE if high is not None else 0)
+    high = high if high is not None else low + DEFAULT_RANGE
+    if low > high:
+        raise ValueError(f'No number satisfies {schema}')
+
+    if multiple:
+        first = math.ceil(low / multiple)
+        last = math.floor(high / multiple)
+        if first > last:
+            raise ValueError(f'No number satisfies {schema}')
+
+        def valid(rng, depth):
+            # k * multiple isn't always a multiple in floating point, ex. 3 * 0.1
+            for _ in range(10):
+                value = rng.randint(first, last) * multiple
+                if (value / multiple) == int(value / multiple):
+                    return value
+            raise ValueError(f'Could not generate a number satisfying {schema}')
+    else:
+        def valid(rng, depth):
+            return rng.uniform(low, high)
+
+    edges = []
+    if 'minimum' in schema:
+        edges.append(first * multiple if multiple else low)
+    if 'maximum' in schema:
+        edges.append(last * multiple if multiple else high)
+
+    def violations():
+        found = _type_violation('number')
+        if 'minimum' in schema:
+            found.append(('minimum', lambda rng: schema['minimum'] - (multiple or 1)))
+        if 'maximum' in schema:
+            found.append(('maximum', lambda rng: schema['maximum'] + (multiple or 1)))
+        if multiple:
+            found.append(('multipleOf', lambda rng: rng.randint(first, last) * multiple + multiple / 2))
+        return found
+
+    boundary = (lambda rng, depth: rng.choice(edges)) if edges else valid
+    return FieldSynth(valid, boundary, violations)
+
+def _random_datetime(rng):
+    return EPOCH + datetime.timedelta(seconds=rng.randint(0, DATE_SPAN))
+
+#: Generators for the string formats, by format name
+FORMATS = {
+    'date-time': lambda rng: _random_datetime(rng).isoformat(),
+    'date': lambda rng: _random_datetime(rng).date().isoformat(),
+    'email': lambda rng: f'user{rng.randint(0, 10 ** 6)}@example.com',
+    'uuid': lambda rng: str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+    'uri': lambda rng: f'https://example.com/{rng.randint(0, 10 ** 6)}',
+    'url': lambda rng: f'https://example.com/{rng.randint(0, 10 ** 6)}',
+    'hostname': lambda rng: f'host{rng.randint(0, 10 ** 6)}.example.com',
+    'ipv4': lambda rng: '.'.join(str(rng.randint(0, 255)) for _ in range(4)),
+    'byte': lambda rng: base64.b64encode(rng.getrandbits(96).to_bytes(12, 'big')).decode('ascii')
+}
+
+def _string(schema):
+    low = schema.get('minLength', 0)
+    high = schema.get('maxLength', max(low, 1) + 15)
+    pattern = schema.get('pattern')
+    generate_format = FORMATS.get(schema.get('format'))
+
+    def text(rng, size):
+        return ''.join(rng.choice(ALPHABET) for _ in range(size))
+
+    if pattern is not None:
+        regex = re.compile(pattern)
+        generate = compile_pattern(pattern)
+
+        def valid(rng, depth):
+            for _ in range(PATTERN_ATTEMPTS):
+                value = generate(rng)
+                if low <= len(value) <= high and regex.search(value):
+                    return value
+            raise ValueError(f'Could not generate a string matching {schema}')
+        boundary = valid
+    elif generate_format is not None:
+        longest = schema.get('maxLength', float('inf'))
+
+        def valid(rng, depth):
+            for _ in range(PATTERN_ATTEMPTS):
+                value = generate_format(rng)
+                if low <= len(value) <= longest:
+                    return value
+            raise ValueError(f'Could not generate a {schema["format"]} string meeting {schema}')
+        boundary = valid
+    else:
+        def valid(rng, depth):
+            return text(rng, rng.randint(low, high))
+
+        def boundary(rng, depth):
+            return text(rng, rng.choice([low, high]))
+
+    def violations():
+        found = _type_violation('string')
+        if low > 0:
+            found.append(('minLength', lambda rng: text(rng, low - 1)))
+        if 'maxLength' in schema:
+            found.append(('maxLength', lambda rng: text(rng, high + 1)))
+        if pattern is not None:
+            mismatch = next((c for c in ('', '!', ' ', '~~', '\n') if not regex.search(c)), None)
+            if mismatch is not None:
+                found.append(('pattern', lambda rng: mismatch))
+        return found
+
+    return FieldSynth(valid, boundary, violations)
+
+
+def examples(model, count=None, seed=None, mode='valid', optional=0.5, targets=None):
+    '''
+    Lazily generates example records of a model.
+
+    :param Model model: the model to generate records of
+    :param int count: the number of records, None for an endless stream
+    :param seed: the random seed, the same seed yields the same records
+    :param str mode: `valid`, `boundary` or `invalid`
+    :param float optional: the probability an optional field is generated
+    :param targets: in `invalid` mode, the keywords to violate (ex.
+        `{'required', 'maximum'}`), None for any
+    '''
+    if mode not in MODES:
+        raise ValueError(f'Unknown mode {mode!r}, expected one of {MODES}')
+    rng = Random(seed)
+    synth = Synthesizer(optional=optional).model(model)
+
+    if mode == 'invalid':
+        violations = [v for v in synth.violations if targets is None or v[0] in targets]
+        if not violations:
+            raise ValueError(f'Model {model.name} has no constraint to violate')
+
+        def generate():
+            record = synth.record(rng)
+            _, apply = rng.choice(violations)
+            apply(record, rng)
+            return record
+    else:
+        boundary = mode == 'boundary'
+
+        def generate():
+            return synth.record(rng, boundary=boundary)
+
+    for _ in (itertools.count() if count is None else range(count)):
+        yield generate()
@@ -0,0 +1,114 @@
+'''Stable content fingerprints for a generated spec.
+
+Operations and definitions are each hashed on their own canonical json and
+the document fingerprint is composed from those leaf hashes (a merkle tree),
+so registering or changing one handler only rehashes its own branch.'''
+import hashlib
+import json
+from weakref import WeakKeyDictionary
+
+from oapispec.core.openapi import (
+    clean_route,
+    create_openapi_spec_dict,
+    extract_tags,
+    find_models,
+    serialize_operation
+)
+from oapispec.core.utils import immutable
+
+
+_operation_hashes = WeakKeyDictionary()
+_definition_hashes = WeakKeyDictionary()
+
+
+def canonical_json(value):
+    '''
+    Serialize a value as canonical json. Keys are sorted at every nesting
+    level (not just the top one like `not_none`) and whitespace is removed
+    so the same value produces the same bytes in every process.
+
+    :param value: any json serializable value
+    :rtype: bytes
+    '''
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def digest(data):
+    '''Returns the hex sha256 digest of the given bytes'''
+    return hashlib.sha256(data).hexdigest()
+
+def _cached(cache, key, version, compute):
+    '''Looks up a leaf hash, recomputing it when the object it was computed
+    from (`version`) has been replaced since'''
+    try:
+        cached = cache.get(key)
+    except TypeError:
+        return compute()
+    if cached is not None and cached[0] is version:
+        return cached[1]
+    value = compute()
+    cache[key] = (version, value)
+    return value
+
+def operation_fingerprint(handler):
+    '''
+    Fingerprint of a single handler's serialized operation. The result is
+    cached per handler until its `__apidoc__` is replaced (each doc decorator
+    assigns a new one).
+
+    :param handler: a function decorated with the doc decorators
+    :rtype: str
+    '''
+    apidoc = getattr(handler, '__apidoc__', {})
+    return _cached(
+        _operation_hashes,
+        handler,
+        apidoc,
+        lambda: digest(canonical_json(serialize_operation({**apidoc, 'handler': handler}))))
+
+def definition_fingerprint(model):
+    '''
+    Fingerprint of a model's definition. The result is cached per model
+    until its attributes are replaced.
+
+    :param Model model: the model to fingerprint
+    :rtype: str
+    '''
+    return _cached(
+        _definition_hashes,
+        model,
+        model.attributes,
+        lambda: digest(canonical_json(model.__schema__)))
+
+def spec_fingerprint(metadata, handlers):
+    '''
+    Fingerprint the spec that `create_openapi_spec_dict` would produce for
+    the given metadata and handlers, without building it.
+
+    :returns: an immutable with the document fingerprint as `spec`, the
+        operation fingerprints as `operations` (keyed by path and then
+        method, like the spec's paths) and the definition fingerprints as
+        `definitions` (keyed by model name)
+    '''
+    operations = {}
+    for handler in handlers:
+        operation = operation_fingerprint(handler)
+        apidoc = handler.__apidoc__
+        operations.setdefault(clean_route(apidoc['route']), {})[apidoc['method']] = operation
+
+    definitions = dict(
+        (name, definition_fingerprint(model))
+        for name, model in find_models(handlers).items()
+    )
+
+    document = {
+        **create_openapi_spec_dict(metadata, []),
+        'tags': extract_tags(metadata, handlers),
+        'paths': operations,
+        'definitions': definitions
+    }
+
+    return immutable(
+        spec=digest(canonical_json(document)),
+        operations=operations,
+        definitions=definitions
+    )
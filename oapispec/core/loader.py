@@ -0,0 +1,152 @@
+'''Handlers registered by reference, imported only when first needed.
+
+A reference is either:
+
+- `package.module:handler`, a single handler (the attribute may be dotted)
+- `package.module`, every handler defined in the module
+- `package.*`, every handler defined in the package's modules (and in its
+  subpackages' `__init__`)
+- `package.**`, the same through every subpackage, recursively
+
+Handlers are functions decorated with (at least) `doc.route` and
+`doc.method`. Modules are scanned in name order and the handlers of a
+module are taken in definition order, so the spec is the same every time.
+The modules named by `module:handler` and `module` references can be
+imported concurrently when the references are resolved, see
+`resolve_handlers`.'''
+import importlib
+import pkgutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_object(path):
+    '''
+    Imports an object from a `package.module:attribute` path, the attribute
+    may be dotted (`pkg.mod:Class.attr`).
+    '''
+    module_name, _, attribute = path.partition(':')
+    if not module_name or not attribute:
+        raise ValueError(f'Expected a path like package.module:attribute, got {path!r}')
+    obj = importlib.import_module(module_name)
+    for name in attribute.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+def is_handler(obj):
+    '''Whether an object is a handler documented with a route and a method'''
+    apidoc = getattr(obj, '__apidoc__', None)
+    return callable(obj) and isinstance(apidoc, dict) and 'route' in apidoc and 'method' in apidoc
+
+def handler_names(module):
+    '''Returns the names of the handlers defined (not just imported) in a module, in definition order'''
+    return [
+        name for name, obj in vars(module).items()
+        if is_handler(obj) and getattr(obj, '__module__', None) == module.__name__
+    ]
+
+def module_handlers(module):
+    '''Returns the handlers defined (not just imported) in a module, in definition order'''
+    return [getattr(module, name) for name in handler_names(module)]
+
+def scan_modules(pattern):
+    '''
+    Imports the modules a `package.*` or `package.**` pattern (or a plain
+    module name) refers to, in name order.
+    '''
+    recursive = pattern.endswith('.**')
+    if not recursive and not pattern.endswith('.*'):
+        return [importlib.import_module(pattern)]
+
+    package = importlib.import_module(pattern[:-3] if recursive else pattern[:-2])
+    if recursive:
+        found = pkgutil.walk_packages(package.__path__, package.__name__ + '.')
+        modules = [package]
+    else:
+        found = pkgutil.iter_modules(package.__path__, package.__name__ + '.')
+        modules = []
+    names = sorted(info.name for info in found)
+    return modules + [importlib.import_module(name) for name in names]
+
+def _try_import(name):
+    '''Imports a module, returns the exception raised or None'''
+    try:
+        importlib.import_module(name)
+        return None
+    except Exception as error: # pylint: disable=broad-except
+        return error
+
+def is_concurrent_import_error(error):
+    '''
+    Whether an import failed only because another thread was initializing
+    a module it needs: a module of an import cycle seen partially
+    initialized, or an import lock deadlock.
+    '''
+    if type(error).__name__ == '_DeadlockError':
+        return True
+    if not isinstance(error, ImportError):
+        return False
+    if 'partially initialized module' in str(error):
+        return True
+    # before python 3.8 the message doesn't say, the module it names was found though
+    return sys.version_info < (3, 8) and error.name in sys.modules # pragma: no cover
+
+def import_modules(names, workers=None):
+    '''
+    Imports modules concurrently. A module failing because of a concurrent
+    import (see `is_concurrent_import_error`) is imported again, alone, any
+    other error is raised as is, without importing the module twice.
+    '''
+    if not names:
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = list(pool.map(_try_import, names))
+    for name, error in zip(names, errors):
+        if error is None:
+            continue
+        if not is_concurrent_import_error(error):
+            raise error
+        importlib.import_module(name)
+
+def reference_modules(handlers):
+    '''The names of the modules `module:handler` and `module` references
+    refer to, that aren't imported yet'''
+    names = set()
+    for reference in handlers:
+        if isinstance(reference, str) and not reference.endswith(('.*', '.**')):
+            names.add(reference.partition(':')[0])
+    return sorted(names.difference(sys.modules))
+
+def resolve_reference(reference):
+    '''Returns the list of handlers a reference (or a handler) stands for'''
+    if not isinstance(reference, str):
+        return [reference]
+    if ':' in reference:
+        return [load_object(reference)]
+    handlers = []
+    for module in scan_modules(reference):
+        handlers.extend(module_handlers(module))
+    return handlers
+
+def resolve_handlers(handlers, workers=None):
+    '''
+    Resolves a list of handlers and handler references into the list of
+    handlers, in registration order and without duplicates.
+
+    :param int workers: the number of threads importing the modules
+        `module:handler` and `module` references refer to, None to import
+        them one by one as they are resolved
+    '''
+    if workers is not None:
+        pending = reference_modules(handlers)
+        if len(pending) > 1:
+            import_modules(pending, workers)
+
+    resolved = []
+    seen = set()
+    for reference in handlers:
+        for handler in resolve_reference(reference):
+            if id(handler) not in seen:
+                seen.add(id(handler))
+                resolved.append(handler)
+    return resolved
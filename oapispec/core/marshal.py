@@ -0,0 +1,186 @@
+'''Compiles models into functions that serialize objects (or dicts) into
+the documented shape, either as dicts or directly as json text.
+
+Each field is resolved once at compile time into its key, default and value
+converter (nested model, array or date), so marshalling an object is a
+single loop without any per field type dispatch.'''
+import json
+from collections.abc import Mapping
+from json.encoder import encode_basestring_ascii
+
+
+DATE_FORMATS = frozenset(['date', 'date-time'])
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_encode_json = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def _isoformat(value):
+    isoformat = getattr(value, 'isoformat', None)
+    return isoformat() if isoformat is not None else value
+
+def getter(obj):
+    '''Returns a `get(name, default)` reading keys of mappings and attributes of anything else'''
+    if isinstance(obj, Mapping):
+        return obj.get
+    return lambda name, default: getattr(obj, name, default)
+
+def list_of(convert):
+    '''Wraps a converter to convert every item of a list, keeping None items'''
+    if convert is None:
+        return list
+    return lambda values: [None if v is None else convert(v) for v in values]
+
+def field_converter(field):
+    '''
+    Returns a function converting a (non None) value of the field to its
+    documented representation, or None when the value is used as is.
+    '''
+    model = field.get('model')
+    if model is not None:
+        marshal = lambda value: model.marshal(value)
+        return list_of(marshal) if field.get('as_list') else marshal
+    item = field.get('item')
+    if item is not None:
+        return list_of(field_converter(item))
+    if field.__schema__.get('format') in DATE_FORMATS:
+        return _isoformat
+    return None
+
+def compile_layout(model):
+    '''
+    Resolves a model's fields, including inherited ones, into a list of
+    (name, converter, default) tuples.
+    '''
+    return [
+        (name, field_converter(field), field.__schema__.get('default'))
+        for name, field in model.all_attributes.items()
+    ]
+
+def compile_marshaller(model):
+    '''
+    Compiles a function that marshals an object or dict into a dict of the
+    model's fields. Keys are read from mappings and attributes from any other
+    object. Missing or None values take the field default (or None).
+    '''
+    return layout_marshaller(compile_layout(model))
+
+def layout_marshaller(layout):
+    '''Returns a function marshalling objects with a `compile_layout` style layout'''
+
+    def marshal(obj):
+        get = getter(obj)
+        result = {}
+        for name, convert, default in layout:
+            value = get(name, None)
+            if value is None:
+                result[name] = default
+            elif convert is None:
+                result[name] = value
+            else:
+                result[name] = convert(value)
+        return result
+
+    return marshal
+
+def encode_value(value):
+    '''Encodes a plain value as json, with fast paths for the common types'''
+    kind = type(value)
+    if kind is str:
+        return encode_basestring_ascii(value)
+    if kind is int:
+        return int.__repr__(value)
+    return _encode_json(value)
+
+def _write_value(value, parts):
+    parts.append(encode_value(value))
+
+def _write_date(value, parts):
+    parts.append(encode_value(_isoformat(value)))
+
+def _write_list_of(write):
+    def write_list(values, parts):
+        parts.append('[')
+        for i, value in enumerate(values):
+            if i:
+                parts.append(',')
+            if value is None:
+                parts.append('null')
+            else:
+                write(value, parts)
+        parts.append(']')
+    return write_list
+
+def field_writer(field):
+    '''
+    Returns a function that appends the json text of a (non None) value of
+    the field to a list of parts.
+    '''
+    model = field.get('model')
+    if model is not None:
+        write = lambda value, parts: model.write_json(value, parts)
+        return _write_list_of(write) if field.get('as_list') else write
+    item = field.get('item')
+    if item is not None:
+        return _write_list_of(field_writer(item))
+    if field.__schema__.get('format') in DATE_FORMATS:
+        return _write_date
+    return _write_value
+
+def compile_writer(model):
+    '''
+    Compiles a function that appends the json text of an object or dict
+    (marshalled like `compile_marshaller` would) to a list of parts, without
+    building the intermediate dict. Keys and defaults are encoded up front.
+    '''
+    layout = []
+    for i, (name, field) in enumerate(model.all_attributes.items()):
+        prefix = ('{' if i == 0 else ',') + encode_basestring_ascii(name) + ':'
+        default = _encode_json(field.__schema__.get('default'))
+        layout.append((prefix, name, field_writer(field), default))
+
+    if not layout:
+        return lambda obj, parts: parts.append('{}')
+
+    def write(obj, parts):
+        get = getter(obj)
+        for prefix, name, write_field, default in layout:
+            parts.append(prefix)
+            value = get(name, None)
+            if value is None:
+                parts.append(default)
+            else:
+                write_field(value, parts)
+        parts.append('}')
+
+    return write
+
+def stream_json(model, objects, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Encodes an iterable of objects as a json array, marshalled with the
+    model, yielding utf-8 chunks of at least `chunk_size` bytes (except the
+    last). Memory use is bounded by the chunk size, not the array length.
+
+    :param Model model: the model describing each item
+    :param objects: any iterable, consumed lazily
+    :param int chunk_size: the minimum number of bytes per chunk
+    '''
+    buffer = ['[']
+    size = 1
+    for i, obj in enumerate(objects):
+        parts = [','] if i else []
+        if obj is None:
+            parts.append('null')
+        else:
+            model.write_json(obj, parts)
+        item = ''.join(parts)
+        buffer.append(item)
+        size += len(item)
+        if size >= chunk_size:
+            # ascii only json, so characters and bytes line up
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    buffer.append(']')
+    yield ''.join(buffer).encode('utf-8')
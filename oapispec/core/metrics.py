@@ -0,0 +1,223 @@
+'''Validation metrics: calls, latency, errors and payload sizes per model.
+
+Once installed, every `Model.errors` call (so `validate`, the validation
+cache, the response sampler ...) and every record of a batch validation is
+reported to the metrics. When nothing is installed the only cost is one
+`is None` check per validation. The metrics can be read as a dict or
+rendered in the Prometheus text format, `metrics_resolver` serves them with
+the `oapispec.serve` apps.'''
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from http import HTTPStatus
+
+from oapispec.model import Model
+from oapispec.serve import METHOD_NOT_ALLOWED, NOT_FOUND, Response
+
+
+#: Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+#: Upper bounds (in bytes) of the payload size histogram buckets
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+RE_INDEX = re.compile(r'(?<=\.)\d+(?=\.|$)|^\d+(?=\.|$)')
+
+
+def field_path(key):
+    '''Replaces the list indexes of an error key with `*`, `items.3.name` ->
+    `items.*.name`, so error counts are per field and not per item'''
+    return RE_INDEX.sub('*', key)
+
+
+class Histogram:
+    '''
+    A histogram with fixed buckets, observing a value is a binary search and
+    an increment.
+
+    :param tuple buckets: the sorted upper bounds of the buckets
+    '''
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        '''Returns (upper bound, count of values <= it) pairs, the last bound is `+Inf`'''
+        total = 0
+        pairs = []
+        for bound, count in zip([*self.buckets, '+Inf'], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def as_dict(self):
+        return {
+            'buckets': dict((str(bound), count) for bound, count in self.cumulative()),
+            'sum': self.sum,
+            'count': self.count
+        }
+
+
+class ModelMetrics:
+    '''The metrics of a single model'''
+
+    def __init__(self, latency_buckets, size_buckets):
+        self.calls = 0
+        self.invalid = 0
+        self.latency = Histogram(latency_buckets)
+        self.sizes = Histogram(size_buckets) if size_buckets is not None else None
+        self.errors = Counter()
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'invalid': self.invalid,
+            'latency': self.latency.as_dict(),
+            'payload_bytes': self.sizes.as_dict() if self.sizes is not None else None,
+            'errors': dict(self.errors)
+        }
+
+
+class ValidationMetrics:
+    '''
+    Collects validation metrics per model, see `install`.
+
+    :param tuple latency_buckets: the latency histogram buckets, in seconds
+    :param bool payload_sizes: also record the size of each payload's json,
+        this serializes every payload so it is off by default
+    :param tuple size_buckets: the payload size histogram buckets, in bytes
+    '''
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, payload_sizes=False, size_buckets=SIZE_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets if payload_sizes else None
+        self.models = {}
+        self._lock = threading.Lock()
+
+    def install(self):
+        '''Starts recording every model validation, returns the metrics'''
+        Model.observer = self
+        return self
+
+    def uninstall(self):
+        '''Stops recording if these are the installed metrics'''
+        if Model.observer is self:
+            Model.observer = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *args):
+        self.uninstall()
+
+    def observe(self, model, data, keys, seconds):
+        '''
+        Records a validation.
+
+        :param Model model: the validated model
+        :param data: the validated payload
+        :param keys: the keys of the errors found (see `FieldError.key`)
+        :param float seconds: how long the validation took
+        '''
+        size = None
+        if self.size_buckets is not None:
+            try:
+                size = len(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+            except (TypeError, ValueError):
+                pass
+        paths = [field_path(key) for key in keys]
+
+        with self._lock:
+            metrics = self.models.get(model.name)
+            if metrics is None:
+                metrics = self.models[model.name] = ModelMetrics(self.latency_buckets, self.size_buckets)
+            metrics.calls += 1
+            metrics.latency.observe(seconds)
+            if paths:
+                metrics.invalid += 1
+                metrics.errors.update(paths)
+            if size is not None:
+                metrics.sizes.observe(size)
+
+    def reset(self):
+        with self._lock:
+            self.models = {}
+
+    def snapshot(self):
+        '''The metrics as a dict keyed by model name'''
+        with self._lock:
+            return dict((name, metrics.as_dict()) for name, metrics in sorted(self.models.items()))
+
+    def prometheus(self, prefix='oapispec'):
+        '''Renders the metrics in the Prometheus text exposition format'''
+        with self._lock:
+            models = sorted(self.models.items())
+            lines = []
+
+            def family(name, kind, description):
+                lines.append(f'# HELP {prefix}_{name} {description}')
+                lines.append(f'# TYPE {prefix}_{name} {kind}')
+
+            def histogram(name, model, histogram):
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{prefix}_{name}_bucket{{model="{_escape(model)}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_{name}_sum{{model="{_escape(model)}"}} {histogram.sum}')
+                lines.append(f'{prefix}_{name}_count{{model="{_escape(model)}"}} {histogram.count}')
+
+            family('validations_total', 'counter', 'Validations per model')
+            for name, metrics in models:
+                lines.append(f'{prefix}_validations_total{{model="{_escape(name)}"}} {metrics.calls}')
+
+            family('validation_failures_total', 'counter', 'Invalid payloads per model')
+            for name, metrics in models:
+                lines.append(f'{prefix}_validation_failures_total{{model="{_escape(name)}"}} {metrics.invalid}')
+
+            family('validation_errors_total', 'counter', 'Validation errors per model and field')
+            for name, metrics in models:
+                for path, count in sorted(metrics.errors.items()):
+                    lines.append(f'{prefix}_validation_errors_total{{model="{_escape(name)}",field="{_escape(path)}"}} {count}')
+
+            family('validation_seconds', 'histogram', 'Validation latency per model')
+            for name, metrics in models:
+                histogram('validation_seconds', name, metrics.latency)
+
+            if self.size_buckets is not None:
+                family('validation_payload_bytes', 'histogram', 'Size of the validated payloads per model')
+                for name, metrics in models:
+                    histogram('validation_payload_bytes', name, metrics.sizes)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def metrics_resolver(metrics, path='/metrics', fallback=None):
+    '''
+    Returns a resolver (see `oapispec.serve.to_wsgi`) serving the metrics
+    in the Prometheus text format on the path, other paths go to the
+    fallback resolver (or get a 404).
+    '''
+    def resolve(method, request_path, header):
+        if request_path != path:
+            return fallback(method, request_path, header) if fallback is not None else NOT_FOUND
+        if method not in ('GET', 'HEAD'):
+            return METHOD_NOT_ALLOWED
+        response = Response(
+            HTTPStatus.OK,
+            [('Content-Type', PROMETHEUS_CONTENT_TYPE), ('Cache-Control', 'no-store')],
+            metrics.prometheus().encode('utf-8'))
+        return response.head() if method == 'HEAD' else response
+    return resolve
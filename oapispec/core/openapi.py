@@ -7,6 +7,7 @@ from werkzeug.routing import parse_rule
 
 from oapispec.model import Model
 from oapispec.core.utils import merge, not_none
+from oapispec.core.validation import referenced_models
 
 
 
@@ -344,10 +345,10 @@ def find_models(handlers):
     for apidoc in apidoc_list:
         for expect, _ in apidoc.get('expect', []):
             if isinstance(expect, Model):
-                models[expect.name] = expect
+                models.update(referenced_models(expect))
         for _, (_, model, _) in apidoc.get('responses', {}).items():
             if isinstance(model, Model):
-                models[model.name] = model
+                models.update(referenced_models(model))
     return models
 
 def security_for(apidoc):
@@ -0,0 +1,217 @@
+'''An index of the registered operations for validating incoming requests.
+
+Every operation's parameters (from `doc.param`, the route and `doc.expect`)
+are compiled once into coercers and validators, so validating a request is
+a dict lookup plus a single pass over its parameters and body.'''
+from oapispec.model import Model
+from oapispec.core.openapi import PY_TYPES, clean_route, extract_path_params
+from oapispec.core.router import Router
+
+
+#: The request parts (and the `Operation.parse` argument they come from) validated per parameter location
+LOCATIONS = {
+    'path': 'path',
+    'query': 'query',
+    'header': 'headers'
+}
+
+TRUE_VALUES = frozenset(['true', '1', 'yes', 'on'])
+FALSE_VALUES = frozenset(['false', '0', 'no', 'off'])
+
+
+def _to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+def _to_integer(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    return int(value)
+
+def _to_number(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    return float(value)
+
+def _to_string(value):
+    return value if isinstance(value, str) else str(value)
+
+#: Maps swagger parameter types to functions converting raw (string) values
+COERCERS = {
+    'integer': _to_integer,
+    'number': _to_number,
+    'boolean': _to_boolean,
+    'string': _to_string
+}
+
+def _identity(value):
+    return value
+
+def swagger_type(param_type):
+    '''Returns the swagger type name of a `doc.param` type (python type or swagger name)'''
+    if isinstance(param_type, (type, type(None))) and param_type in PY_TYPES:
+        return PY_TYPES[param_type]
+    return param_type
+
+
+class Parameter:
+    '''
+    A compiled request parameter.
+
+    :param str name: the parameter name
+    :param dict spec: the parameter as recorded by `doc.param` or `extract_path_params`
+    '''
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.location = spec.get('in', 'query')
+        self.type = swagger_type(spec.get('type', 'string'))
+        self.required = bool(spec.get('required'))
+        self.default = spec.get('default')
+        self.coerce = COERCERS.get(self.type, _identity)
+        self.key = f'{self.location}.{name}'
+        # Headers are looked up case insensitively
+        self.lookup = name.lower() if self.location == 'header' else name
+
+    def parse(self, values, errors):
+        '''
+        Reads and coerces this parameter from the given values, recording any
+        error in `errors`. Returns the coerced value (or the default).
+        '''
+        value = values.get(self.lookup) if values is not None else None
+        if value is None:
+            if self.required:
+                errors[self.key] = f'{self.name!r} is a required property'
+            return self.default
+        try:
+            return self.coerce(value)
+        except (TypeError, ValueError):
+            errors[self.key] = f'{value!r} is not of type {self.type!r}'
+            return None
+
+
+class Operation:
+    '''
+    A registered handler compiled for request validation.
+
+    :param handler: a function decorated with the doc decorators
+    '''
+
+    def __init__(self, handler):
+        apidoc = handler.__apidoc__
+        self.handler = handler
+        self.operation_id = apidoc.get('name')
+        self.method = apidoc['method']
+        self.route = apidoc['route']
+        self.path = clean_route(self.route)
+        self.model = None
+        for model, _ in apidoc.get('expect', []):
+            self.model = model if isinstance(model, Model) else None
+        self.responses = dict(
+            (code, model)
+            for code, (_, model, _) in apidoc.get('responses', {}).items()
+            if isinstance(model, Model)
+        )
+
+        specs = {**apidoc.get('params', {}), **extract_path_params(self.route)}
+        parameters = [Parameter(name, spec) for name, spec in specs.items()]
+        self.parameters = dict(
+            (location, [p for p in parameters if p.location == location])
+            for location in LOCATIONS
+        )
+
+    def parse(self, body=None, query=None, headers=None, path=None):
+        '''
+        Coerces and validates a request's parameters and body.
+
+        :param body: the decoded request body
+        :param dict query: the query string values
+        :param dict headers: the request headers
+        :param dict path: the path parameters
+        :returns: a tuple of the parsed parameters (a dict per location plus
+            the body) and a dict of errors keyed by `location.name` (None if valid)
+        '''
+        request = {'path': path, 'query': query, 'headers': headers}
+        if headers is not None and self.parameters['header']:
+            request['headers'] = dict((k.lower(), v) for k, v in headers.items())
+
+        errors = {}
+        parsed = {'body': body}
+        for location, argument in LOCATIONS.items():
+            values = request[argument]
+            parsed[location] = dict(
+                (p.name, p.parse(values, errors))
+                for p in self.parameters[location]
+            )
+
+        if self.model is not None:
+            if body is None:
+                errors['body'] = "'body' is a required property"
+            else:
+                for key, message in (self.model.validate(body) or {}).items():
+                    errors[f'body.{key}' if key else 'body'] = message
+
+        return parsed, errors or None
+
+    def validate(self, body=None, query=None, headers=None, path=None):
+        '''Validates a request, returns a dict of errors or None if it is valid. See `parse`'''
+        return self.parse(body=body, query=query, headers=headers, path=path)[1]
+
+    def response_model(self, status):
+        '''Returns the model documented for a response status (or the
+        `default` response), None if there isn't one'''
+        return self.responses.get(str(status), self.responses.get('default'))
+
+
+class OperationIndex:
+    '''
+    The compiled operations of a set of handlers, looked up by method and
+    route (either as registered, `/book/<int:id>`, or as documented,
+    `/book/{id}`) or by operation id.
+
+    :param list handlers: functions decorated with the doc decorators
+    '''
+
+    def __init__(self, handlers):
+        self.operations = [Operation(handler) for handler in handlers]
+        self.router = Router()
+        self._by_route = {}
+        self._by_id = {}
+        for operation in self.operations:
+            self._by_route[(operation.method, operation.route)] = operation
+            self._by_route[(operation.method, operation.path)] = operation
+            self._by_id[operation.operation_id] = operation
+            self.router.add(operation.route, operation.method, operation)
+
+    def get(self, method, route):
+        '''Returns the operation for the method and route, None if there isn't one'''
+        return self._by_route.get((method.lower(), route))
+
+    def get_by_id(self, operation_id):
+        '''Returns the operation with the given operation id, None if there isn't one'''
+        return self._by_id.get(operation_id)
+
+    def match(self, method, path):
+        '''
+        Finds the operation serving a concrete request path, ex. `/book/42`.
+
+        :returns: a tuple of the operation and the decoded path parameters,
+            or None when no registered route matches
+        '''
+        return self.router.match(method, path)
+
+    def validate(self, method, route, body=None, query=None, headers=None, path=None):
+        '''
+        Validates a request against the operation registered for the method
+        and route, see `Operation.parse`. Raises a KeyError if there is none.
+        '''
+        operation = self.get(method, route)
+        if operation is None:
+            raise KeyError(f'No operation registered for {method.upper()} {route}')
+        return operation.validate(body=body, query=query, headers=headers, path=path)
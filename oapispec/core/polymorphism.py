@@ -0,0 +1,87 @@
+'''Discriminator dispatch for validating against a family of subtypes.
+
+A base model marks one of its fields with `discriminator=True` and its
+subtypes are created with `inherit`. In Swagger 2 the discriminator value of
+a payload is the name of its model, so subtypes are indexed by name and a
+payload is validated only against the subtype it names, instead of trying
+each subtype in turn.'''
+from itertools import islice
+
+from jsonschema.exceptions import ValidationError
+
+from oapispec.core.validation import FieldError, error_limit
+
+
+def find_discriminator(model):
+    '''Returns the discriminator property of a model or of its closest
+    parent that has one, None when there is none'''
+    for current in [model, *reversed(model.__parents__)]:
+        discriminator = current._schema.get('discriminator')
+        if discriminator is not None:
+            return discriminator
+    return None
+
+
+class PolymorphicValidator:
+    '''
+    Validates payloads against the subtype named by their discriminator.
+
+    :param Model base: the model declaring the discriminator
+    :param subtypes: the models inheriting from base, either a list (indexed
+        by model name) or a dict of discriminator value to model
+    '''
+
+    def __init__(self, base, subtypes):
+        self.base = base
+        self.discriminator = find_discriminator(base)
+        if self.discriminator is None:
+            raise ValueError(f'Model {base.name} has no discriminator field')
+
+        if not isinstance(subtypes, dict):
+            subtypes = dict((model.name, model) for model in subtypes)
+        for model in subtypes.values():
+            if model is not base and base not in model.__parents__:
+                raise ValueError(f'Model {model.name} does not inherit from {base.name}')
+
+        self.subtypes = subtypes
+        self.values = sorted(subtypes)
+
+    def model_for(self, data):
+        '''Returns the subtype the data names, None when it names none'''
+        if not isinstance(data, dict):
+            return None
+        try:
+            return self.subtypes.get(data.get(self.discriminator))
+        except TypeError: # an unhashable discriminator value
+            return None
+
+    def iter_errors(self, data):
+        '''Lazily yields a `FieldError` for each problem with the data'''
+        model = self.model_for(data)
+        if model is not None:
+            yield from model.iter_errors(data)
+            return
+        if not isinstance(data, dict) or self.discriminator not in data:
+            # Not an object or no discriminator, the base reports it
+            yield from self.base.iter_errors(data)
+            return
+        value = data[self.discriminator]
+        yield FieldError(ValidationError(
+            '%r is not one of %r' % (value, self.values),
+            path=(self.discriminator,),
+            validator='enum',
+            validator_value=self.values,
+            instance=value))
+
+    def errors(self, data, fail_fast=False, max_errors=None):
+        '''Like `Model.errors`, against the subtype the data names'''
+        limit = error_limit(fail_fast, max_errors)
+        model = self.model_for(data)
+        if model is not None:
+            return model.errors(data, fail_fast, max_errors)
+        return list(islice(self.iter_errors(data), limit))
+
+    def validate(self, data, fail_fast=False, max_errors=None):
+        '''Like `Model.validate`, against the subtype the data names'''
+        errors = dict((e.key, e.message) for e in self.errors(data, fail_fast, max_errors))
+        return errors or None
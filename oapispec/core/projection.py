@@ -0,0 +1,78 @@
+'''Sparse fieldsets: compiles a field mask like `id,title,author.name` into
+a function extracting only those paths from objects or dicts.
+
+Compiled projectors are LRU cached per (model, mask) since the same few
+masks are requested over and over.'''
+from functools import lru_cache
+
+from oapispec.core.marshal import field_converter, layout_marshaller, list_of
+
+
+PROJECTOR_CACHE_SIZE = 1024
+
+
+def parse_mask(mask):
+    '''
+    Parses a field mask into a tree of requested paths,
+    'id,author.name,author.id' -> {'id': {}, 'author': {'name': {}, 'id': {}}}
+
+    :param mask: a comma separated string or an iterable of dotted paths
+    :rtype: dict
+    '''
+    paths = mask.split(',') if isinstance(mask, str) else mask
+    tree = {}
+    for path in paths:
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split('.'):
+            if not name:
+                raise ValueError(f'Invalid field mask path: {path!r}')
+            node = node.setdefault(name, {})
+    return tree
+
+def _nested_model(field):
+    '''Returns the model behind a nested (or array of nested) field and
+    whether values are lists of it'''
+    model = field.get('model')
+    if model is not None:
+        return model, bool(field.get('as_list'))
+    item = field.get('item')
+    if item is not None:
+        model, _ = _nested_model(item)
+        return model, True
+    return None, False
+
+def _compile(model, tree):
+    attributes = model.all_attributes
+    layout = []
+    for name, children in tree.items():
+        field = attributes.get(name)
+        if field is None:
+            raise ValueError(f'Unknown field {name!r} in field mask for model {model.name}')
+        if not children:
+            convert = field_converter(field)
+        else:
+            nested, as_list = _nested_model(field)
+            if nested is None:
+                raise ValueError(f'Field {name!r} of model {model.name} has no nested fields to select')
+            convert = _compile(nested, children)
+            convert = list_of(convert) if as_list else convert
+        layout.append((name, convert, field.__schema__.get('default')))
+    return layout_marshaller(layout)
+
+@lru_cache(maxsize=PROJECTOR_CACHE_SIZE)
+def compile_projector(model, mask):
+    '''
+    Compiles (and caches) a function that marshals only the fields in the
+    mask. Raises a ValueError when the mask selects fields the model (or its
+    nested models) doesn't have.
+
+    :param Model model: the model to project
+    :param str mask: the field mask, ex. 'id,title,author.name'
+    '''
+    tree = parse_mask(mask)
+    if not tree:
+        raise ValueError('Field mask selects no fields')
+    return _compile(model, tree)
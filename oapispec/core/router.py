@@ -0,0 +1,163 @@
+'''A segment trie for mapping concrete request paths (`/book/42`) back to
+registered routes (`/book/<int:book_id>`).
+
+Static segments are preferred over parameters and parameters are tried from
+the most to the least specific converter (`int`, `float`, then `string`), so
+a lookup walks the path once and only backtracks where routes overlap.'''
+import re
+from urllib.parse import unquote
+
+
+RE_PARAM_SEGMENT = re.compile(r'^<(?:(?P<converter>[a-z]+):)?(?P<variable>[a-zA-Z_][a-zA-Z0-9_]*)>$')
+RE_FLOAT = re.compile(r'^\d+\.\d+$')
+# ascii digits only, \Z so a trailing newline isn't accepted
+RE_INT = re.compile(r'^[0-9]+\Z')
+
+NO_MATCH = object()
+
+
+def _convert_int(segment):
+    if RE_INT.match(segment) is None:
+        return NO_MATCH
+    return int(segment)
+
+def _convert_float(segment):
+    if RE_FLOAT.match(segment) is None:
+        return NO_MATCH
+    return float(segment)
+
+def _convert_string(segment):
+    if not segment:
+        return NO_MATCH
+    return unquote(segment)
+
+#: Maps Flask/Werkzeug routing converters to a (priority, converter) pair,
+#: lower priorities are tried first
+CONVERTERS = {
+    'int': (0, _convert_int),
+    'float': (1, _convert_float),
+    'string': (2, _convert_string),
+    'str': (2, _convert_string),
+    'default': (2, _convert_string)
+}
+
+
+def split_path(path):
+    '''Splits a path into its segments, `/a/b/` -> ['a', 'b', '']'''
+    return path.split('/')[1:] if path.startswith('/') else path.split('/')
+
+def parse_segment(segment):
+    '''
+    Parses a route segment into a (converter, variable) pair for parameters
+    or (None, segment) for static segments.
+    '''
+    match = RE_PARAM_SEGMENT.match(segment)
+    if match is None:
+        if '<' in segment:
+            raise ValueError(f'Parameters must span a whole path segment: {segment}')
+        return None, segment
+    converter = match.group('converter') or 'default'
+    if converter not in CONVERTERS:
+        raise ValueError(f'Unsupported type converter: {converter}')
+    return converter, match.group('variable')
+
+
+class Node:
+
+    __slots__ = ('static', 'params', 'values')
+
+    def __init__(self):
+        self.static = {}
+        self.params = []
+        self.values = {}
+
+    def param_child(self, converter, variable):
+        for key, _, _, child in self.params:
+            if key == (converter, variable):
+                return child
+        priority, convert = CONVERTERS[converter]
+        child = Node()
+        self.params.append(((converter, variable), priority, convert, child))
+        self.params.sort(key=lambda p: p[1])
+        return child
+
+
+class Router:
+    '''
+    Routes (method, path) pairs to the values registered for them.
+    '''
+
+    def __init__(self):
+        self.root = Node()
+
+    def add(self, route, method, value):
+        '''
+        Registers a value for a werkzeug style route and method, replacing
+        any value already registered for the same route and method.
+
+        :param str route: the route, ex. '/book/<int:book_id>'
+        :param str method: the http method
+        :param value: what `match` returns for requests to this route
+        '''
+        node = self.root
+        for segment in split_path(route):
+            converter, name = parse_segment(segment)
+            if converter is None:
+                node = node.static.setdefault(name, Node())
+            else:
+                node = node.param_child(converter, name)
+        node.values[method.lower()] = value
+
+    def match(self, method, path):
+        '''
+        Finds the value registered for the method and concrete path.
+
+        :returns: a tuple of the value and a dict of the decoded path
+            parameters, or None when no route matches
+        '''
+        params = {}
+        node = _match(self.root, split_path(path), 0, method.lower(), params)
+        if node is None:
+            return None
+        return node.values[method.lower()], params
+
+    def methods(self, path):
+        '''Returns the methods registered for routes matching the concrete path'''
+        methods = set()
+        _collect_methods(self.root, split_path(path), 0, methods)
+        return methods
+
+
+def _match(node, segments, index, method, params):
+    if index == len(segments):
+        return node if method in node.values else None
+
+    segment = segments[index]
+    child = node.static.get(segment)
+    if child is not None:
+        found = _match(child, segments, index + 1, method, params)
+        if found is not None:
+            return found
+
+    for (_, variable), _, convert, child in node.params:
+        value = convert(segment)
+        if value is NO_MATCH:
+            continue
+        found = _match(child, segments, index + 1, method, params)
+        if found is not None:
+            params[variable] = value
+            return found
+
+    return None
+
+def _collect_methods(node, segments, index, methods):
+    if index == len(segments):
+        methods.update(node.values)
+        return
+    segment = segments[index]
+    child = node.static.get(segment)
+    if child is not None:
+        _collect_methods(child, segments, index + 1, methods)
+    for _, _, convert, child in node.params:
+        if convert(segment) is not NO_MATCH:
+            _collect_methods(child, segments, index + 1, methods)
@@ -0,0 +1,126 @@
+'''Sampled validation of responses against their documented models.
+
+Validating every production response is too expensive, so `ResponseSampler`
+only validates a sample of them: a fraction of the responses (a credit
+accumulating the rate, so an unsampled response costs one addition) and/or
+as many as fit in a budget of validation cpu time per second (a token bucket
+refilled with wall time and charged with the validating thread's cpu time,
+so waiting on the GIL or on I/O doesn't spend it). Problems are aggregated
+into counters, by operation, status, field and keyword, rather than reported
+one by one.'''
+import time
+from collections import Counter
+
+
+class ResponseSampler:
+    '''
+    Validates a sample of responses against the models documented with
+    `doc.response`. The counters are updated without locking, under
+    concurrent use they are close estimates.
+
+    :param OperationIndex operations: the registered operations, ex. `schema.operations()`
+    :param float rate: the fraction of responses to validate, ex. 0.01 for
+        one in a hundred, None to not sample by rate
+    :param float budget: cpu seconds of validation per second, ex. 0.005
+        for half a percent of a cpu, None for no budget
+    :param clock: the wall time function refilling the budget
+    :param cpu_clock: the cpu time function validations are charged with,
+        defaults to `time.thread_time` (`time.process_time` before python 3.7)
+    '''
+
+    def __init__(self, operations, rate=None, budget=None, clock=time.perf_counter, cpu_clock=None):
+        if rate is not None and not 0 < rate <= 1:
+            raise ValueError('rate must be in (0, 1]')
+        if budget is not None and budget <= 0:
+            raise ValueError('budget must be positive')
+        self.operations = operations
+        self.rate = rate
+        self.budget = budget
+        self.clock = clock
+        self.cpu_clock = cpu_clock or getattr(time, 'thread_time', time.process_time)
+
+        self._credit = 0.0
+        self._tokens = budget
+        self._refilled = clock() if budget is not None else None
+
+        self.seen = 0
+        self.sampled = 0
+        self.invalid = 0
+        self.undocumented = 0
+        self.violations = Counter()
+
+    def _sample(self):
+        '''Whether to validate the current response'''
+        if self.rate is not None:
+            self._credit += self.rate
+            if self._credit < 1:
+                return False
+            self._credit -= 1
+        if self.budget is not None:
+            now = self.clock()
+            self._tokens = min(self.budget, self._tokens + (now - self._refilled) * self.budget)
+            self._refilled = now
+            if self._tokens <= 0:
+                return False
+        return True
+
+    def check(self, method, route, status, body):
+        '''
+        Maybe validates a response, depending on the sampling.
+
+        :param str method: the request method
+        :param str route: the operation's route, as registered or documented
+        :param status: the response status code
+        :param body: the decoded response body
+        :returns: the response's errors (like `Model.validate` returns) when
+            it was sampled and is invalid, None otherwise
+        '''
+        self.seen += 1
+        if not self._sample():
+            return None
+
+        started = self.cpu_clock()
+        try:
+            return self._check(method, route, status, body)
+        finally:
+            if self.budget is not None:
+                self._tokens -= self.cpu_clock() - started
+
+    def _check(self, method, route, status, body):
+        self.sampled += 1
+        operation = self.operations.get(method, route)
+        model = operation.response_model(status) if operation is not None else None
+        if model is None:
+            self.undocumented += 1
+            return None
+
+        errors = model.errors(body)
+        if not errors:
+            return None
+        self.invalid += 1
+        name = f'{operation.method.upper()} {operation.path}'
+        for error in errors:
+            self.violations[(name, str(status), error.key, error.validator)] += 1
+        return dict((e.key, e.message) for e in errors)
+
+    def stats(self):
+        '''
+        The counters as a dict, `violations` is a list of the distinct
+        problems (operation, status, field and failed keyword) with how
+        often each was seen, most frequent first
+        '''
+        return {
+            'seen': self.seen,
+            'sampled': self.sampled,
+            'invalid': self.invalid,
+            'undocumented': self.undocumented,
+            'violations': [
+                {'operation': name, 'status': status, 'field': key, 'validator': validator, 'count': count}
+                for (name, status, key, validator), count in self.violations.most_common()
+            ]
+        }
+
+    def reset(self):
+        '''Zeroes the counters'''
+        self.seen = self.sampled = self.invalid = self.undocumented = 0
+        self.violations.clear()
@@ -0,0 +1,207 @@
+from jsonschema import Draft4Validator, _validators
+from jsonschema.exceptions import ValidationError
+from jsonschema.validators import extend
+
+
+#: Enums with more values are cut short in error messages
+ENUM_MESSAGE_LIMIT = 20
+
+
+def describe_enum(values):
+    '''The repr of an enum's values for error messages, only the first
+    `ENUM_MESSAGE_LIMIT` values (and the count) of longer enums'''
+    if len(values) <= ENUM_MESSAGE_LIMIT:
+        return repr(list(values))
+    shown = ', '.join(repr(v) for v in values[:ENUM_MESSAGE_LIMIT])
+    return f'[{shown}, ...] ({len(values)} values)'
+
+
+class EnumValues(list):
+    '''
+    An enum's values (still a list, so equality is unchanged) with a
+    frozenset of them for constant time membership checks and their
+    description for error messages, built once.
+    '''
+
+    def __init__(self, values):
+        super().__init__(values)
+        try:
+            self.lookup = frozenset(values)
+        except TypeError:
+            self.lookup = None
+        self.description = describe_enum(self)
+
+def compile_enums(schema):
+    '''Returns a copy of the schema with every `enum` list replaced by `EnumValues`'''
+    if isinstance(schema, dict):
+        compiled = dict((k, compile_enums(v)) for k, v in schema.items())
+        if isinstance(schema.get('enum'), list):
+            compiled['enum'] = EnumValues(schema['enum'])
+        return compiled
+    if isinstance(schema, list):
+        return [compile_enums(v) for v in schema]
+    return schema
+
+def strip_required(schema):
+    '''Returns a copy of the schema without any `required` list, at every
+    level, for validating partial updates'''
+    if isinstance(schema, dict):
+        return dict(
+            (k, strip_required(v))
+            for k, v in schema.items()
+            if not (k == 'required' and isinstance(v, list))
+        )
+    if isinstance(schema, list):
+        return [strip_required(v) for v in schema]
+    return schema
+
+def required(validator, required_properties, instance, schema):
+    '''Draft4's `required` keyword, but each error's path ends with the
+    missing property so callers don't have to parse it out of the message'''
+    if not validator.is_type(instance, 'object'):
+        return
+    for name in required_properties:
+        if name not in instance:
+            yield ValidationError('%r is a required property' % name, path=(name,))
+
+def enum(validator, enums, instance, schema):
+    '''Draft4's `enum` keyword, checked against the frozenset of `EnumValues`
+    instead of scanning the list. 0 and 1 (which equal False and True) and
+    unhashable values still go through jsonschema's own check. Long enums
+    are cut short in the message, see `describe_enum`.'''
+    lookup = getattr(enums, 'lookup', None)
+    if lookup is None or instance == 0 or instance == 1:
+        found = not any(_validators.enum(validator, enums, instance, schema))
+    else:
+        try:
+            found = instance in lookup
+        except TypeError:
+            found = instance in enums
+    if not found:
+        description = getattr(enums, 'description', None) or describe_enum(enums)
+        yield ValidationError('%r is not one of %s' % (instance, description))
+
+
+#: The Draft4 validator with the overrides above
+Validator = extend(Draft4Validator, {'required': required, 'enum': enum})
+
+
+def error_limit(fail_fast=False, max_errors=None):
+    '''
+    The number of errors to stop validating at, None for all of them.
+
+    :raises ValueError: if max_errors is less than 1
+    '''
+    if fail_fast:
+        return 1
+    if max_errors is not None and max_errors < 1:
+        raise ValueError('max_errors must be at least 1')
+    return max_errors
+
+def error_key(error):
+    '''Joins a jsonschema error's path with dots, ex. `users.0.name`'''
+    return '.'.join(str(p) for p in error.path)
+
+
+class FieldError:
+    '''
+    A structured validation error. It wraps the jsonschema error and only
+    builds what is asked for.
+
+    :param jsonschema.ValidationError error: the wrapped error
+    '''
+
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+    @property
+    def path(self):
+        '''The path to the invalid value as a tuple of keys and indexes'''
+        return tuple(self.error.path)
+
+    @property
+    def key(self):
+        '''The path joined with dots, ex. `users.0.name`'''
+        return error_key(self.error)
+
+    @property
+    def validator(self):
+        '''The failed keyword, ex. `required`, `type` or `maximum`'''
+        return self.error.validator
+
+    @property
+    def expected(self):
+        '''The failed keyword's value in the schema, ex. `integer` for `type`'''
+        return self.error.validator_value
+
+    @property
+    def value(self):
+        '''The invalid value (the parent object for `required`)'''
+        return self.error.instance
+
+    @property
+    def message(self):
+        return self.error.message
+
+    def __repr__(self):
+        return 'FieldError({0!r}, {1!r})'.format(self.key, self.message)
+
+
+def field_models(field):
+    '''Yields the models (and shared enums) a field references, through
+    nested fields and array items'''
+    model = field.get('model')
+    if model is not None:
+        yield model
+    definition = field.get('definition')
+    if definition is not None:
+        yield definition
+    item = field.get('item')
+    if item is not None:
+        yield from field_models(item)
+
+def referenced_models(model):
+    '''
+    Finds every model reachable from the given one, through its parents and
+    its (possibly nested in arrays) fields, including itself. The parents of
+    flattened models aren't referenced, only their fields are followed.
+
+    :rtype: dict of model name to model
+    '''
+    found = {}
+    pending = [model]
+    while pending:
+        current = pending.pop()
+        if current.name in found:
+            continue
+        found[current.name] = current
+        if getattr(current, 'flatten', False):
+            attributes = current.all_attributes
+        else:
+            pending.extend(current.__parents__)
+            attributes = current.attributes
+        for field in attributes.values():
+            pending.extend(field_models(field))
+    return found
+
+def self_contained_schema(model):
+    '''The model's schema with every definition it references embedded, so
+    its `$ref`s resolve without the rest of the spec'''
+    definitions = dict(
+        (name, referenced.__schema__)
+        for name, referenced in referenced_models(model).items()
+    )
+    return {**model.__schema__, 'definitions': definitions}
+
+def compile_validator(model, partial=False):
+    '''
+    Builds the jsonschema validator for a model
+
+    :param bool partial: build the variant where no property is required
+    '''
+    schema = self_contained_schema(model)
+    if partial:
+        schema = strip_required(schema)
+    return Validator(compile_enums(schema))
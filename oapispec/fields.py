@@ -42,16 +42,19 @@ def raw(**kwargs):
 
 def nested(model, as_list=False, **kwargs):
 
-    nested_name = getattr(model, 'resolved', model).name
-    ref = { '$ref': f'#/definitions/{nested_name}' }
+    model = getattr(model, 'resolved', model)
+    ref = { '$ref': f'#/definitions/{model.name}' }
 
-    return create_schema(
+    field = create_schema(
         type='array' if as_list else None,
         **ref,
         **kwargs)
 
+    # Keep the model so consumers (validation etc.) can resolve the $ref
+    return immutable({**field, 'model': model, 'as_list': as_list})
+
 def array(item_type, min_items=None, max_items=None, unique=None, **kwargs):
-    return create_schema(
+    field = create_schema(
         type='array',
         minItems=_eval(min_items),
         maxItems=_eval(max_items),
@@ -59,10 +62,27 @@ def array(item_type, min_items=None, max_items=None, unique=None, **kwargs):
         items=item_type.schema(),
         **kwargs)
 
+    return immutable({**field, 'item': item_type})
+
+def shared_enum(name, values, type='string', description=None):
+    '''
+    Declares an enum emitted once in the spec's definitions and referenced
+    with a `$ref` by every field using it, pass it as `string(enum=...)`
+
+    :param str name: the definition name
+    :param list values: the enum values
+    '''
+    values = list(_eval(values))
+    return immutable({
+        'name': name,
+        'values': values,
+        '__schema__': not_none({'type': type, 'enum': values, 'description': description}),
+        'attributes': {},
+        '__parents__': []
+    })
+
 def string(enum=None, min_length=None, max_length=None, pattern=None, **kwargs):
     enum = _eval(enum)
-    if enum and 'example' not in kwargs:
-        kwargs['example'] = enum[0]
 
     # If a discriminator was provided
     # attempt to set required
@@ -71,6 +91,24 @@ def string(enum=None, min_length=None, max_length=None, pattern=None, **kwargs):
         # it explicitly as False
         kwargs['required'] = True
 
+    if hasattr(enum, '__schema__'):
+        ref = { '$ref': f'#/definitions/{enum.name}' }
+        constraints = not_none({
+            'minLength': _eval(min_length),
+            'maxLength': _eval(max_length),
+            'pattern': _eval(pattern)
+        })
+        # A $ref can't have siblings, with constraints or annotations
+        # (description, example ...) it goes in an allOf instead
+        annotations = create_schema(type=None, **kwargs).__schema__
+        if constraints or annotations:
+            field = create_schema(type=None, allOf=[ref, constraints] if constraints else [ref], **kwargs)
+        else:
+            field = create_schema(type=None, **ref, **kwargs)
+        return immutable({**field, 'definition': enum})
+    if enum and 'example' not in kwargs:
+        kwargs['example'] = enum[0]
+
     return create_schema(
         type='string',
         minLength=_eval(min_length),
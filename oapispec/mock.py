@@ -0,0 +1,112 @@
+'''A mock backend generated from a schema, as WSGI and ASGI apps.
+
+Requests are routed with the registered routes and methods and answered
+with an example of the documented response (generated from its model with
+`oapispec.core.examples`). Every response is built and serialized once when
+the app is created, serving a request is a route match and a dict lookup.
+
+The first documented 2xx status is served by default, a request can ask for
+another documented status with a `Prefer: code=404` header.'''
+import json
+import re
+from http import HTTPStatus
+
+from oapispec.model import Model
+from oapispec.serve import NOT_FOUND, Response, to_asgi, to_wsgi
+
+
+RE_PREFER_CODE = re.compile(r'\bcode=(\d{3})\b')
+
+JSON_HEADERS = [('Content-Type', 'application/json')]
+
+
+def mock_body(model, seed):
+    '''Serializes an example of the model, an empty body without a model'''
+    if not isinstance(model, Model):
+        return b''
+    example = next(model.examples(1, seed=seed, optional=1))
+    return json.dumps(example, separators=(',', ':')).encode('utf-8')
+
+def mock_responses(handler, seed=0):
+    '''
+    Builds the responses of a handler, one per documented status.
+
+    :returns: a tuple of the default status and a dict of status to `Response`
+    '''
+    documented = dict(handler.__apidoc__.get('responses', {}))
+    # The `default` response is only served (as a 200) when it is the only one
+    fallback = documented.pop('default', None)
+    if not documented:
+        documented['200'] = fallback or (None, None, None)
+
+    responses = {}
+    for code, (_, model, _) in documented.items():
+        status = int(code)
+        if status in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+            responses[status] = Response(status)
+            continue
+        body = mock_body(model, seed)
+        responses[status] = Response(status, JSON_HEADERS if body else [], body)
+
+    successes = sorted(status for status in responses if 200 <= status < 300)
+    default = successes[0] if successes else min(responses)
+    return default, responses
+
+
+class MockOperation:
+    '''The precomputed GET (or other method) and HEAD responses of an operation'''
+
+    def __init__(self, handler, seed=0):
+        self.default, self.responses = mock_responses(handler, seed)
+        self.heads = dict((status, response.head()) for status, response in self.responses.items())
+
+    def respond(self, head, header):
+        responses = self.heads if head else self.responses
+        prefer = header('prefer')
+        if prefer:
+            match = RE_PREFER_CODE.search(prefer)
+            if match and int(match.group(1)) in responses:
+                return responses[int(match.group(1))]
+        return responses[self.default]
+
+
+def mock_resolver(schema, seed=0):
+    '''
+    Returns a resolver (see `oapispec.serve.to_wsgi`) answering the
+    schema's registered operations with precomputed example responses.
+
+    :param schema: the schema to mock (see `oapispec.schema`)
+    :param int seed: the seed the examples are generated with
+    '''
+    operations = schema.operations()
+    mocks = dict(
+        (operation, MockOperation(operation.handler, seed))
+        for operation in operations.operations
+    )
+    router = operations.router
+
+    def resolve(method, path, header):
+        matched = operations.match(method, path)
+        head = False
+        if matched is None and method == 'HEAD':
+            matched = operations.match('GET', path)
+            head = True
+        if matched is not None:
+            return mocks[matched[0]].respond(head, header)
+
+        allowed = router.methods(path)
+        if not allowed:
+            return NOT_FOUND
+        return Response(
+            HTTPStatus.METHOD_NOT_ALLOWED,
+            [('Allow', ', '.join(sorted(m.upper() for m in allowed)))],
+            b'')
+    return resolve
+
+def wsgi_app(schema, seed=0):
+    '''Creates a WSGI app mocking the schema's operations, see `mock_resolver`'''
+    return to_wsgi(mock_resolver(schema, seed))
+
+def asgi_app(schema, seed=0):
+    '''Creates an ASGI app mocking the schema's operations, see `mock_resolver`'''
+    return to_asgi(mock_resolver(schema, seed))
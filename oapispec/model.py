@@ -1,40 +1,53 @@
-import re
-
-from jsonschema import Draft4Validator
-from jsonschema.exceptions import ValidationError
+from itertools import islice
+from time import perf_counter
 
 from oapispec.core.utils import not_none
+from oapispec.core.validation import FieldError, compile_validator, error_limit
+from oapispec.core.marshal import DEFAULT_CHUNK_SIZE, compile_marshaller, compile_writer, stream_json
+from oapispec.core.projection import compile_projector
+from oapispec.core.batch import validate_chunks, validate_iter
+from oapispec.core.polymorphism import PolymorphicValidator
+from oapispec.core.examples import examples
 
 
-RE_REQUIRED = re.compile(r'u?\'(?P<name>.*)\' is a required property', re.I | re.U)
-
-def _format_error(error):
-    path = list(error.path)
-    if error.validator == 'required':
-        name = RE_REQUIRED.match(error.message).group('name')
-        path.append(name)
-    key = '.'.join(str(p) for p in path)
-    return key, error.message
-
 class Model:
     '''
     Handles validation and swagger style inheritance for both subclasses.
     Subclass must define `schema` attribute.
 
     :param str name: The model public name
+    :param bool flatten: emit (and validate) the merged schema of the model
+        and its parents instead of an `allOf` of references to them
     '''
 
-    def __init__(self, name, attributes):
+    #: Reported every validation when set, see `oapispec.core.metrics`
+    observer = None
+
+    def __init__(self, name, attributes, flatten=False):
         self.attributes = attributes
+        self.flatten = flatten
 
         self.__apidoc__ = {
             'name': name
         }
         self.name = name
         self.__parents__ = []
+        # compiled artifacts (validators, marshaller ...) keyed by kind, built on first use
+        self._compiled = {}
+
+    def _compile(self, kind, compile_artifact, **kwargs):
+        '''Returns the compiled artifact of a kind, compiled with
+        `compile_artifact(self, **kwargs)` on first use'''
+        compiled = self._compiled.get(kind)
+        if compiled is None:
+            compiled = self._compiled[kind] = compile_artifact(self, **kwargs)
+        return compiled
 
     @property
     def __schema__(self):
+        if self.flatten and self.__parents__:
+            return self._compile('flat_schema', lambda model: model._object_schema(model.all_attributes))
+
         schema = self._schema
 
         if self.__parents__:
@@ -48,33 +61,170 @@ class Model:
             }
         return schema
 
-    def inherit(self, name, attributes):
+    def inherit(self, name, attributes, flatten=None):
         '''
         Inherit this model (use the Swagger composition pattern aka. allOf)
         :param str name: The new model name
         :param dict fields: The new model extra fields
+        :param bool flatten: merge the parents' fields into the new model's
+            schema instead of referencing them, defaults to this model's setting
         '''
-        model = Model(name, attributes)
+        model = Model(name, attributes, flatten=self.flatten if flatten is None else flatten)
         model.__parents__ = [*self.__parents__, self]
         return model
 
-    def validate(self, data):
-        validator = Draft4Validator(self.__schema__)
-        try:
-            validator.validate(data)
-        except ValidationError:
-            return dict(_format_error(e) for e in validator.iter_errors(data))
-        return None
+    def polymorphic(self, subtypes):
+        '''
+        Returns a `PolymorphicValidator` validating payloads against the
+        subtype named by this model's discriminator field.
+
+        :param subtypes: the models inheriting from this one, a list (the
+            discriminator value is the model name) or a dict of value to model
+        '''
+        return PolymorphicValidator(self, subtypes)
+
+    @property
+    def validator(self):
+        '''The jsonschema validator for this model (including the definitions
+        of any nested or parent models), compiled once on first use'''
+        return self._compile('validator', compile_validator)
+
+    @property
+    def partial_validator(self):
+        '''The variant of `validator` where nothing is required, at any
+        level, for partial updates. Compiled once on first use'''
+        return self._compile('partial_validator', compile_validator, partial=True)
+
+    def iter_errors(self, data, partial=False):
+        '''Lazily yields a `FieldError` for each problem with the data'''
+        validator = self.partial_validator if partial else self.validator
+        for error in validator.iter_errors(data):
+            yield FieldError(error)
+
+    def errors(self, data, fail_fast=False, max_errors=None, partial=False):
+        '''
+        Returns a list of `FieldError`s for the data, empty if it is valid.
+
+        :param bool fail_fast: stop at the first error
+        :param int max_errors: stop after this many errors, at least 1
+        :param bool partial: don't require any property (ex. for PATCH payloads)
+        '''
+        limit = error_limit(fail_fast, max_errors)
+        observer = self.observer
+        if observer is None:
+            return list(islice(self.iter_errors(data, partial), limit))
+        started = perf_counter()
+        errors = list(islice(self.iter_errors(data, partial), limit))
+        observer.observe(self, data, [e.key for e in errors], perf_counter() - started)
+        return errors
+
+    def validate(self, data, fail_fast=False, max_errors=None, partial=False):
+        '''
+        Validates the data, returning a dict of error messages keyed by the
+        dotted path of the invalid value, or None if it is valid. Validation
+        stops as soon as enough errors are found, see `errors`.
+        '''
+        errors = dict((e.key, e.message) for e in self.errors(data, fail_fast, max_errors, partial))
+        return errors or None
+
+    @property
+    def all_attributes(self):
+        '''The model's attributes including those inherited from its parents'''
+        attributes = {}
+        for parent in self.__parents__:
+            attributes.update(parent.attributes)
+        attributes.update(self.attributes)
+        return attributes
+
+    def marshal(self, obj):
+        '''
+        Serializes an object (read by attribute) or dict (read by key) into a
+        dict with exactly this model's fields. The marshaller is compiled on
+        first use and reused after.
+        '''
+        if obj is None:
+            return None
+        return self._compile('marshaller', compile_marshaller)(obj)
+
+    def marshal_many(self, objects):
+        '''Marshals every object in an iterable, returns a list'''
+        return [self.marshal(obj) for obj in objects]
+
+    def projector(self, mask):
+        '''
+        Returns the compiled (and cached) function that marshals only the
+        fields selected by a mask like 'id,title,author.name'. Raises a
+        ValueError if the mask selects fields this model doesn't have.
+        '''
+        return compile_projector(self, mask)
+
+    def project(self, obj, mask):
+        '''Marshals only the fields of the object selected by the mask, see `projector`'''
+        if obj is None:
+            return None
+        return compile_projector(self, mask)(obj)
+
+    def write_json(self, obj, parts):
+        '''Appends the json text of a marshalled object to a list of str parts'''
+        self._compile('writer', compile_writer)(obj, parts)
+
+    def stream_many(self, objects, chunk_size=DEFAULT_CHUNK_SIZE):
+        '''
+        Yields a json array of the marshalled objects as utf-8 chunks of about
+        `chunk_size` bytes, encoding each object straight to text.
+        '''
+        return stream_json(self, objects, chunk_size=chunk_size)
+
+    def validate_iter(self, records, errors_only=False, fail_fast=False, max_errors=None, stop_after=None, summary=None):
+        '''
+        Lazily validates an iterable of records with this model's compiled
+        validator, yielding `(index, errors)` pairs (errors is None when the
+        record is valid). See `oapispec.core.batch.validate_iter`.
+        '''
+        return validate_iter(
+            self,
+            records,
+            errors_only=errors_only,
+            fail_fast=fail_fast,
+            max_errors=max_errors,
+            stop_after=stop_after,
+            summary=summary)
+
+    def validate_chunks(self, records, chunk_size, **kwargs):
+        '''Like `validate_iter` but yields lists of up to `chunk_size` results'''
+        return validate_chunks(self, records, chunk_size, **kwargs)
+
+    def validate_columns(self, records):
+        '''
+        Validates a batch of flat records column by column with numpy (which
+        must be installed, see `oapispec.core.columnar`). Returns a dict of
+        row index to errors (like `validate` returns) for the invalid rows.
+        '''
+        # imported on use so `import oapispec` doesn't load numpy, an optional extra
+        from oapispec.core.columnar import validate_columns # pylint: disable=import-outside-toplevel
+        return validate_columns(self, records)
+
+    def examples(self, count=None, seed=None, mode='valid', optional=0.5, targets=None):
+        '''
+        Lazily generates example records of this model, valid ones, ones on
+        the edges of the constraints or ones breaking a single constraint.
+        See `oapispec.core.examples.examples`.
+        '''
+        return examples(self, count=count, seed=seed, mode=mode, optional=optional, targets=targets)
 
     def __str__(self):
         return 'Model({name},{{{fields}}})'.format(name=self.name, fields=','.join(self.attributes.keys()))
 
     @property
     def _schema(self):
+        return self._object_schema(self.attributes)
+
+    @staticmethod
+    def _object_schema(attributes):
         properties = {}
         required = set()
         discriminator = None
-        for name, field in self.attributes.items():
+        for name, field in attributes.items():
             properties[name] = field.__schema__
             if field.required:
                 required.add(name)
@@ -0,0 +1,114 @@
+import threading
+
+from oapispec.schema import schema
+from oapispec.core.concurrency import default_executor
+
+
+class Registry:
+    '''
+    A mutable, thread safe holder of a schema for applications that register
+    handlers at runtime (plugins etc.).
+
+    Writers (`register`/`unregister`) serialize on a lock and replace the
+    current immutable schema with a new one (copy on write), so readers get a
+    consistent `snapshot` with a single attribute read and never lock.
+
+    Generated specs are double buffered: `generate` always returns the last
+    fully built spec and, when handlers changed since it was built, starts a
+    rebuild in the background which is swapped in once complete. A failed
+    build is kept in `last_error` and isn't retried until handlers change.
+
+    :param list handlers: the initial handlers
+    :param dict metadata: the schema metadata, see `oapispec.schema.meta`
+    :param concurrent.futures.Executor executor: optional executor used for
+        background rebuilds, defaults to a single shared thread
+    '''
+
+    def __init__(self, handlers=None, metadata=None, executor=None):
+        self._executor = executor
+        self._write_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+        # (version, schema) and (version, spec) pairs, each swapped as one reference
+        self._current = (0, schema(handlers=list(handlers or []), metadata=metadata))
+        self._published = None
+        # (version, exception) of the last failed build
+        self._failed = None
+
+    def register(self, handler):
+        '''Registers a handler, returns it so this can be used as a decorator'''
+        with self._write_lock:
+            version, current = self._current
+            self._current = (version + 1, current.register(handler))
+        return handler
+
+    def unregister(self, handler):
+        '''Removes a registered handler, raises a ValueError if it isn't registered'''
+        with self._write_lock:
+            version, current = self._current
+            if handler not in current.handlers:
+                raise ValueError(f'Handler {handler!r} is not registered')
+            handlers = [h for h in current.handlers if h != handler]
+            self._current = (version + 1, schema(handlers=handlers, metadata=current.metadata))
+
+    def snapshot(self):
+        '''Returns the current immutable schema'''
+        return self._current[1]
+
+    @property
+    def handlers(self):
+        return self.snapshot().handlers
+
+    @property
+    def last_error(self):
+        '''The exception raised by the last build, None if it succeeded'''
+        failed = self._failed
+        return failed[1] if failed is not None else None
+
+    def publish(self):
+        '''
+        Builds the spec for the current snapshot and swaps it in, waiting for
+        any rebuild already in progress. Returns the published spec.
+        '''
+        with self._build_lock:
+            version, current = self._current
+            published = self._published
+            if published is None or published[0] != version:
+                try:
+                    published = self._published = (version, current.generate())
+                except Exception as error:
+                    self._failed = (version, error)
+                    raise
+                self._failed = None
+            return published[1]
+
+    def generate(self):
+        '''
+        Returns the last published spec without waiting on a rebuild. Only the
+        very first call, when nothing has been published yet, builds the spec
+        in the calling thread. The returned dict is shared, don't mutate it.
+        '''
+        published = self._published
+        if published is None:
+            return self.publish()
+        version = self._current[0]
+        failed = self._failed
+        if published[0] != version and (failed is None or failed[0] != version):
+            self._schedule_rebuild()
+        return published[1]
+
+    def _schedule_rebuild(self):
+        with self._write_lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        (self._executor or default_executor()).submit(self._rebuild)
+
+    def _rebuild(self):
+        try:
+            self.publish()
+        except Exception: # pylint: disable=broad-except
+            pass # kept in last_error by publish
+        finally:
+            with self._write_lock:
+                self._rebuilding = False
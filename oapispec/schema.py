@@ -1,20 +1,79 @@
 
 from oapispec.core.openapi import OpenApi
+from oapispec.core.fingerprint import spec_fingerprint
+from oapispec.core.concurrency import SingleFlight
+from oapispec.core.operations import OperationIndex
+from oapispec.core.loader import resolve_handlers
+from oapispec.core.discovery import discover as discover_handlers
 from oapispec.core.utils import immutable
 from oapispec.core.swagger import generate_swagger_ui
 
 
-def schema(handlers=None, metadata=None):
+#: Threads importing the modules of discovered handlers when they are resolved
+DEFAULT_IMPORT_WORKERS = 8
+
+
+def schema(handlers=None, metadata=None, workers=None):
 
     handlers = handlers or []
     metadata = metadata or {}
     metadata = meta(**metadata)
+    compiled = {}
 
     def register(handler):
-        return schema(handlers=[*handlers, handler], metadata=metadata)
+        '''Returns a new schema with the handler registered. The handler may
+        be a reference like 'pkg.module:handler', 'pkg.module' or 'pkg.*',
+        imported only when the handlers are first needed (see `resolved_handlers`)
+        '''
+        return schema(handlers=[*handlers, handler], metadata=metadata, workers=workers)
+
+    def discover(package, index_path=None, workers=None):
+        '''Returns a new schema with every handler of a package tree registered.
+        Modules unchanged since the scan recorded in `index_path` aren't
+        imported, their handlers are registered by reference (see `register`)
+        and imported when the handlers are first needed, concurrently
+        :param str package: the package to scan, ex. 'myapp.handlers'
+        :param str index_path: optional file to keep the scan index in
+        :param int workers: the number of threads importing modules, None for the default
+        '''
+        references = discover_handlers(package, index_path=index_path, workers=workers)
+        return schema(handlers=[*handlers, *references], metadata=metadata, workers=workers or DEFAULT_IMPORT_WORKERS)
+
+    def resolved_handlers():
+        '''Returns the registered handlers with the references imported and
+        expanded, resolved once on first use (by `generate` etc.)
+        '''
+        if 'handlers' not in compiled:
+            compiled['handlers'] = resolve_handlers(handlers, workers)
+        return compiled['handlers']
 
     def generate():
-        return OpenApi(metadata, handlers).as_dict()
+        return OpenApi(metadata, resolved_handlers()).as_dict()
+
+    single_flight = SingleFlight(generate)
+
+    async def agenerate(executor=None):
+        '''Generates the spec in an executor so the event loop isn't blocked.
+        Concurrent callers share one in-flight generation and later callers
+        get its cached result (the same dict, don't mutate it).
+        :param concurrent.futures.Executor executor: optional executor to generate in, defaults to a single shared thread
+        '''
+        return await single_flight(executor)
+
+    def fingerprint():
+        '''Returns stable content hashes for the spec, each of its operations
+        and each of its definitions. Usable as ETags or cache keys without
+        generating and serializing the whole spec.
+        '''
+        return spec_fingerprint(metadata, resolved_handlers())
+
+    def operations():
+        '''Returns the `OperationIndex` of the registered handlers, used to
+        validate incoming requests. It is compiled once on first use.
+        '''
+        if 'operations' not in compiled:
+            compiled['operations'] = OperationIndex(resolved_handlers())
+        return compiled['operations']
 
     def generate_ui(spec_url):
         '''Generates the swagger-ui html file and returns the content
@@ -24,8 +83,13 @@ def schema(handlers=None, metadata=None):
 
     return immutable(dict(
         register=register,
+        discover=discover,
         generate=generate,
+        agenerate=agenerate,
+        fingerprint=fingerprint,
+        operations=operations,
         handlers=handlers,
+        resolved_handlers=resolved_handlers,
         metadata=metadata,
         generate_ui=generate_ui
     ))
@@ -0,0 +1,253 @@
+'''Small framework agnostic WSGI and ASGI apps that serve a generated spec
+and its swagger-ui page.
+
+Everything a response needs (serialized and compressed bodies, etags and
+headers) is computed once when the app is created so serving a request is a
+dict lookup and a couple of header comparisons.'''
+import gzip
+import zlib
+from http import HTTPStatus
+from io import BytesIO
+
+from oapispec.core.fingerprint import canonical_json, digest
+
+
+#: Encodings we precompress to, in order of preference
+ENCODINGS = ('gzip', 'deflate')
+
+DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+
+BODILESS = (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED)
+
+
+def compress(body, encoding):
+    '''Compresses the body with the given content-coding (`gzip` or `deflate`)'''
+    if encoding == 'gzip':
+        # a fixed mtime keeps the output deterministic, gzip.compress only takes one on python 3.8+
+        buffer = BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as f:
+            f.write(body)
+        return buffer.getvalue()
+    if encoding == 'deflate':
+        return zlib.compress(body, 9)
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+def parse_accept_encoding(header):
+    '''
+    Parses an Accept-Encoding header into a dict of coding to q-value.
+
+    :param str header: the raw header value (or None)
+    :rtype: dict
+    '''
+    codings = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+def negotiate_encoding(header, available):
+    '''
+    Picks the encoding from `available` the client accepts with the highest
+    q-value, ties going to the order of `available`. Returns 'identity' when
+    the client accepts none of them or explicitly prefers identity.
+    '''
+    codings = parse_accept_encoding(header)
+    best, best_q = 'identity', 0.0
+    for encoding in available:
+        q = codings.get(encoding, codings.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    if codings.get('identity', 0.0) > best_q:
+        return 'identity'
+    return best
+
+def etag_matches(if_none_match, etag):
+    '''Weak comparison of an If-None-Match header against an etag'''
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class Response:
+    '''
+    A fully precomputed response, holds the status, headers and body in the
+    shapes both WSGI and ASGI servers want them.
+    '''
+
+    def __init__(self, status, headers=None, body=b''):
+        status = HTTPStatus(status)
+        headers = list(headers or [])
+        # 1xx, 204 and 304 responses must not send a Content-Length (RFC 7230 3.3.2)
+        if status >= 200 and status not in BODILESS:
+            headers.append(('Content-Length', str(len(body))))
+        self.status = status.value
+        self.body = body
+        self.wsgi_status = f'{status.value} {status.phrase}'
+        self.wsgi_headers = headers
+        self.asgi_headers = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+    def head(self):
+        '''The same response without a body but keeping its Content-Length'''
+        response = Response(self.status)
+        response.wsgi_headers = self.wsgi_headers
+        response.asgi_headers = self.asgi_headers
+        return response
+
+
+NOT_FOUND = Response(HTTPStatus.NOT_FOUND, [('Content-Type', 'text/plain; charset=utf-8')], b'Not Found')
+METHOD_NOT_ALLOWED = Response(
+    HTTPStatus.METHOD_NOT_ALLOWED,
+    [('Allow', 'GET, HEAD'), ('Content-Type', 'text/plain; charset=utf-8')],
+    b'Method Not Allowed')
+
+
+class Resource:
+    '''
+    A static resource with an etag, served identity or precompressed
+    depending on the request's Accept-Encoding.
+
+    :param bytes body: the uncompressed body
+    :param str content_type: the Content-Type header value
+    :param str etag: the etag (without quotes), defaults to the body's sha256,
+        the compressed copies get it suffixed with their encoding
+    :param str cache_control: the Cache-Control header value
+    '''
+
+    def __init__(self, body, content_type, etag=None, cache_control=DEFAULT_CACHE_CONTROL):
+        etag = etag or digest(body)
+        self.etag = f'"{etag}"'
+        self.etags = {'identity': self.etag}
+        self.not_modified = {}
+        self.responses = {}
+        bodies = {'identity': body}
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                bodies[encoding] = compressed
+                # every representation gets its own strong etag
+                self.etags[encoding] = f'"{etag}-{encoding}"'
+
+        for encoding, content in bodies.items():
+            common = [
+                ('ETag', self.etags[encoding]),
+                ('Cache-Control', cache_control),
+                ('Vary', 'Accept-Encoding')
+            ]
+            self.not_modified[encoding] = Response(HTTPStatus.NOT_MODIFIED, common)
+            coding = [] if encoding == 'identity' else [('Content-Encoding', encoding)]
+            self.responses[encoding] = Response(HTTPStatus.OK, [('Content-Type', content_type), *coding, *common], content)
+        self.encodings = tuple(e for e in ENCODINGS if e in self.responses)
+        self.heads = dict((k, r.head()) for k, r in self.responses.items())
+
+    def respond(self, method, header):
+        '''
+        :param str method: the request method
+        :param callable header: returns a request header value by lower case name
+        :rtype: Response
+        '''
+        if method not in ('GET', 'HEAD'):
+            return METHOD_NOT_ALLOWED
+        encoding = negotiate_encoding(header('accept-encoding'), self.encodings)
+        if etag_matches(header('if-none-match'), self.etags[encoding]):
+            return self.not_modified[encoding]
+        return (self.responses if method == 'GET' else self.heads)[encoding]
+
+
+def spec_resources(schema, spec_path='/swagger.json', ui_path='/', spec_url=None, cache_control=DEFAULT_CACHE_CONTROL):
+    '''
+    Builds the resources served by `wsgi_app` and `asgi_app`, keyed by path.
+    Pass `ui_path=None` to only serve the spec.
+    '''
+    resources = {
+        spec_path: Resource(
+            canonical_json(schema.generate()),
+            'application/json',
+            etag=schema.fingerprint().spec,
+            cache_control=cache_control)
+    }
+    if ui_path is not None:
+        resources[ui_path] = Resource(
+            schema.generate_ui(spec_url or spec_path).encode('utf-8'),
+            'text/html; charset=utf-8',
+            cache_control=cache_control)
+    return resources
+
+def static_resolver(resources):
+    '''Returns a resolver that serves the given resources by exact path'''
+    def resolve(method, path, header):
+        resource = resources.get(path)
+        if resource is None:
+            return NOT_FOUND
+        return resource.respond(method, header)
+    return resolve
+
+def to_wsgi(resolve):
+    '''
+    Wraps a resolver into a WSGI app. A resolver is called with the request
+    method, path and a header lookup function and returns a `Response`.
+    '''
+    def app(environ, start_response):
+        def header(name):
+            return environ.get('HTTP_' + name.upper().replace('-', '_'))
+        response = resolve(environ['REQUEST_METHOD'], environ.get('PATH_INFO') or '/', header)
+        start_response(response.wsgi_status, list(response.wsgi_headers))
+        return [response.body]
+    return app
+
+def to_asgi(resolve):
+    '''Wraps a resolver (see `to_wsgi`) into an ASGI app'''
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        headers = dict(
+            (k.decode('latin-1').lower(), v.decode('latin-1'))
+            for k, v in scope.get('headers', [])
+        )
+        response = resolve(scope['method'], scope['path'] or '/', headers.get)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status,
+            'headers': response.asgi_headers
+        })
+        await send({'type': 'http.response.body', 'body': response.body})
+    return app
+
+def wsgi_app(schema, spec_path='/swagger.json', ui_path='/', spec_url=None, cache_control=DEFAULT_CACHE_CONTROL):
+    '''
+    Creates a WSGI app serving the schema's spec and swagger-ui page.
+
+    :param schema: the schema to serve (see `oapispec.schema`)
+    :param str spec_path: the path the spec json is served on
+    :param str ui_path: the path the swagger-ui page is served on, None to disable it
+    :param str spec_url: the url swagger-ui loads the spec from, defaults to `spec_path`
+    :param str cache_control: the Cache-Control header sent with both
+    '''
+    return to_wsgi(static_resolver(spec_resources(schema, spec_path, ui_path, spec_url, cache_control)))
+
+def asgi_app(schema, spec_path='/swagger.json', ui_path='/', spec_url=None, cache_control=DEFAULT_CACHE_CONTROL):
+    '''Creates an ASGI app serving the schema's spec and swagger-ui page, see `wsgi_app`'''
+    return to_asgi(static_resolver(spec_resources(schema, spec_path, ui_path, spec_url, cache_control)))
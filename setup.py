@@ -40,5 +40,8 @@ setuptools.setup(
         'pytz',
         'six',
         'Werkzeug'
-    ]
+    ],
+    extras_require={
+        'columnar': ['numpy']
+    }
 )
@@ -0,0 +1 @@
+'''Handler modules used by tests/core/loader_test.py'''
@@ -0,0 +1,7 @@
+import oapispec as oapi
+
+
+@oapi.doc.route('/admin')
+@oapi.doc.method('GET')
+def dashboard():
+    pass
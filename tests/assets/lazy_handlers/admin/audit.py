@@ -0,0 +1,7 @@
+import oapispec as oapi
+
+
+@oapi.doc.route('/admin/audit')
+@oapi.doc.method('GET')
+def audit_log():
+    pass
@@ -0,0 +1,18 @@
+import oapispec as oapi
+
+from tests.assets.lazy_handlers.users import get_user # imported, not defined here
+
+
+@oapi.doc.route('/book')
+@oapi.doc.method('POST')
+def add_book():
+    pass
+
+@oapi.doc.route('/book/<int:id>')
+@oapi.doc.method('GET')
+def get_book():
+    pass
+
+@oapi.doc.namespace('Book')
+def not_a_handler():
+    pass
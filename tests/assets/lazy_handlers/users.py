@@ -0,0 +1,7 @@
+import oapispec as oapi
+
+
+@oapi.doc.route('/user/<int:id>')
+@oapi.doc.method('GET')
+def get_user():
+    pass
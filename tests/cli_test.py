@@ -0,0 +1,202 @@
+import gzip
+import json
+import runpy
+import sys
+import zlib
+from http import HTTPStatus
+
+import pytest
+
+import oapispec as oapi
+from oapispec import cli
+
+
+record_model = oapi.model.Model('Record', {
+    'id': oapi.fields.integer(required=True),
+    'name': oapi.fields.string(max_length=3)
+})
+
+LINES = [
+    '{"id": 1, "name": "a"}',
+    '{"name": "toolong"}',
+    '',
+    '{"id": 3}',
+    'not json',
+    '{"id": "x", "name": 5}'
+]
+
+@pytest.fixture
+def ndjson(tmp_path):
+    path = tmp_path / 'data.ndjson'
+    path.write_text('\n'.join(LINES * 3) + '\n')
+    return str(path)
+
+def expected_lines():
+    per_copy = [2, 5, 6]
+    return [copy * len(LINES) + line for copy in range(3) for line in per_copy]
+
+def test_load_object():
+    assert cli.load_object('oapispec.model:Model') is oapi.model.Model
+    assert cli.load_object('oapispec:model.Model') is oapi.model.Model
+
+    with pytest.raises(ValueError):
+        cli.load_object('tests.cli_test')
+
+def test_line_ranges_end_on_newlines():
+    data = b'aaaa\nbb\ncccccc\nd'
+
+    ranges = list(cli.line_ranges(data, 3))
+
+    assert ranges == [(0, 5), (5, 8), (8, 15), (15, 16)]
+    assert list(cli.line_ranges(b'abc\n', 2)) == [(0, 4)]
+    assert list(cli.line_ranges(b'abcdef', 2)) == [(0, 6)]
+
+def test_validate_file_in_process(ndjson):
+    results = list(cli.validate_file(ndjson, 'tests.cli_test:record_model', workers=1, chunk_size=40))
+
+    assert [line for line, _ in results] == expected_lines()
+    assert results[0][1] == {'id': "'id' is a required property", 'name': "'toolong' is too long"}
+    assert results[1][1][''].startswith('Invalid JSON')
+
+def test_validate_file_with_process_pool(ndjson):
+    results = list(cli.validate_file(
+        ndjson,
+        'tests.cli_test:record_model',
+        workers=2,
+        chunk_size=40,
+        fail_fast=True))
+
+    assert [line for line, _ in results] == expected_lines()
+    assert all(len(errors) == 1 for _, errors in results)
+
+def test_validate_empty_file(tmp_path):
+    path = tmp_path / 'empty.ndjson'
+    path.write_text('')
+
+    assert list(cli.validate_file(str(path), 'tests.cli_test:record_model', workers=1)) == []
+
+def test_main_validate_writes_reports(ndjson, capsys):
+    code = cli.main(['validate', '--model', 'tests.cli_test:record_model', '--workers', '1', '--max-errors', '1', ndjson])
+
+    out, err = capsys.readouterr()
+    reports = [json.loads(line) for line in out.splitlines()]
+    assert code == 1
+    assert [r['line'] for r in reports] == expected_lines()
+    assert err == f'9 invalid line(s) in {ndjson}\n'
+
+def test_main_validate_valid_file(tmp_path, capsys):
+    path = tmp_path / 'valid.ndjson'
+    path.write_text('{"id": 1}\n{"id": 2}')
+
+    assert cli.main(['validate', '--model', 'tests.cli_test:record_model', '--workers', '1', str(path)]) == 0
+    assert capsys.readouterr().out == ''
+
+@pytest.mark.parametrize('option', ['--workers', '--chunk-size', '--max-errors'])
+@pytest.mark.parametrize('value', ['0', '-1', 'x'])
+def test_main_validate_rejects_non_positive_counts(ndjson, capsys, option, value):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(['validate', '--model', 'tests.cli_test:record_model', option, value, ndjson])
+
+    assert exit_info.value.code == 2
+    assert 'is not a positive integer' in capsys.readouterr().err
+
+def test_module_entry_point(tmp_path, monkeypatch):
+    path = tmp_path / 'valid.ndjson'
+    path.write_text('{"id": 1}\n')
+    monkeypatch.setattr(sys, 'argv', ['oapispec', 'validate', '--model', 'tests.cli_test:record_model', '--workers', '1', str(path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module('oapispec', run_name='__main__')
+
+    assert exit_info.value.code == 0
+
+
+@oapi.doc.namespace('Record')
+@oapi.doc.route('/record/<int:record_id>')
+@oapi.doc.method('GET')
+@oapi.doc.response(HTTPStatus.OK, record_model)
+def get_record():
+    pass
+
+api_schema = oapi.schema(metadata={'title': 'Build API', 'version': '1.0'}).register(get_record)
+
+other_schema = oapi.schema(metadata={'title': 'Build API', 'version': '2.0'}).register(get_record)
+
+def build(out, *extra, schema='tests.cli_test:api_schema'):
+    return cli.main(['build', schema, '-o', str(out), *extra])
+
+def test_build_writes_artifact(tmp_path, capsys):
+    assert build(tmp_path / 'dist') == 0
+
+    dist = tmp_path / 'dist'
+    assert sorted(p.name for p in dist.iterdir()) == [
+        'swagger.json',
+        'swagger.json.deflate',
+        'swagger.json.gz',
+        'swagger.manifest.json',
+        'swagger.py'
+    ]
+    spec = api_schema.generate()
+    body = (dist / 'swagger.json').read_bytes()
+    assert json.loads(body) == spec
+    assert gzip.decompress((dist / 'swagger.json.gz').read_bytes()) == body
+    assert zlib.decompress((dist / 'swagger.json.deflate').read_bytes()) == body
+
+    manifest = json.loads((dist / 'swagger.manifest.json').read_text())
+    assert manifest['fingerprint'] == api_schema.fingerprint().spec
+    assert sorted(manifest['files']) == ['swagger.json', 'swagger.json.deflate', 'swagger.json.gz', 'swagger.py']
+    assert capsys.readouterr().out.count('wrote ') == 5
+
+def test_build_module_holds_spec(tmp_path):
+    build(tmp_path, '--name', 'api_spec')
+
+    module = runpy.run_path(str(tmp_path / 'api_spec.py'))
+    assert module['SPEC'] == api_schema.generate()
+    assert module['FINGERPRINT'] == api_schema.fingerprint().spec
+
+def test_build_module_escapes_title(tmp_path):
+    title = "x''' + __import__('os').getcwd() + '''\\ \"\"\" \\'"
+    schema = oapi.schema(metadata={'title': title, 'version': '1.0'}).register(get_record)
+
+    files = cli.build_artifacts(schema)
+    module = {}
+    exec(compile(files['swagger.py'], 'swagger.py', 'exec'), module) # pylint: disable=exec-used
+
+    assert module['__doc__'] == 'A spec generated by `python -m oapispec build`. Do not edit.'
+    assert module['TITLE'] == title
+    assert module['SPEC']['info']['title'] == title
+
+def test_build_is_reproducible(tmp_path):
+    build(tmp_path / 'a')
+    build(tmp_path / 'b')
+
+    for path in (tmp_path / 'a').iterdir():
+        assert path.read_bytes() == (tmp_path / 'b' / path.name).read_bytes()
+
+def test_check_up_to_date(tmp_path, capsys):
+    build(tmp_path)
+    capsys.readouterr()
+
+    assert build(tmp_path, '--check') == 0
+    assert capsys.readouterr().out == f'{tmp_path} is up to date\n'
+
+def test_check_stale_spec(tmp_path, capsys):
+    build(tmp_path)
+    capsys.readouterr()
+
+    assert build(tmp_path, '--check', schema='tests.cli_test:other_schema') == 1
+    assert capsys.readouterr().err == 'stale: the spec changed since the artifact was built\n'
+
+def test_check_modified_files(tmp_path, capsys):
+    build(tmp_path)
+    capsys.readouterr()
+    (tmp_path / 'swagger.json').write_bytes(b'{}')
+    (tmp_path / 'swagger.py').unlink()
+
+    assert build(tmp_path, '--check') == 1
+    assert capsys.readouterr().err == 'stale: swagger.json was modified\nstale: swagger.py is missing\n'
+
+def test_check_without_artifact(tmp_path, capsys):
+    assert build(tmp_path, '--check') == 1
+    assert capsys.readouterr().err == 'stale: swagger.manifest.json is missing or unreadable\n'
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,85 @@
+import pytest
+
+import oapispec as oapi
+from oapispec.core.batch import BatchSummary, chunked
+
+
+model = oapi.model.Model('Record', {
+    'id': oapi.fields.integer(required=True),
+    'name': oapi.fields.string(max_length=3)
+})
+
+def records():
+    yield {'id': 1, 'name': 'a'}
+    yield {'name': 'toolong'}
+    yield {'id': 3}
+    yield {'id': 'x', 'name': 5}
+    yield {'id': 5}
+
+def test_validate_iter_yields_every_record():
+    summary = BatchSummary()
+
+    results = list(model.validate_iter(records(), summary=summary))
+
+    assert results == [
+        (0, None),
+        (1, {'id': "'id' is a required property", 'name': "'toolong' is too long"}),
+        (2, None),
+        (3, {'id': "'x' is not of type 'integer'", 'name': "5 is not of type 'string'"}),
+        (4, None)
+    ]
+    assert summary.as_dict() == {'total': 5, 'valid': 3, 'invalid': 2, 'errors': 4, 'stopped': False}
+    assert repr(summary) == 'BatchSummary(total=5, valid=3, invalid=2, errors=4, stopped=False)'
+
+def test_validate_iter_errors_only_and_fail_fast():
+    results = list(model.validate_iter(records(), errors_only=True, fail_fast=True))
+
+    assert [index for index, _ in results] == [1, 3]
+    assert all(len(errors) == 1 for _, errors in results)
+
+def test_validate_iter_max_errors():
+    results = list(model.validate_iter(records(), errors_only=True, max_errors=2))
+
+    assert [len(errors) for _, errors in results] == [2, 2]
+
+def test_validate_iter_stop_after():
+    summary = BatchSummary()
+    consumed = []
+
+    def tracked():
+        for record in records():
+            consumed.append(record)
+            yield record
+
+    results = list(model.validate_iter(tracked(), errors_only=True, stop_after=1, summary=summary))
+
+    assert [index for index, _ in results] == [1]
+    assert len(consumed) == 2
+    assert summary.stopped is True
+
+    with pytest.raises(ValueError):
+        list(model.validate_iter(records(), stop_after=0))
+    with pytest.raises(ValueError):
+        list(model.validate_iter(records(), max_errors=0))
+
+def test_validate_iter_is_lazy():
+    def endless():
+        while True:
+            yield {'id': 1}
+
+    results = model.validate_iter(endless())
+
+    assert next(results) == (0, None)
+    assert next(results) == (1, None)
+
+def test_validate_chunks():
+    chunks = list(model.validate_chunks(records(), 2))
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert chunks[2] == [(4, None)]
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    with pytest.raises(ValueError):
+        list(chunked(range(5), 0))
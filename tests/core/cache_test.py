@@ -0,0 +1,112 @@
+import datetime
+
+import pytest
+
+from oapispec import fields
+from oapispec.model import Model
+from oapispec.core.cache import ValidationCache, payload_hash
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_model():
+    return Model('User', {
+        'name': fields.string(required=True),
+        'age': fields.integer(maximum=150)
+    })
+
+def test_payload_hash_ignores_key_order():
+    assert payload_hash({'a': 1, 'b': [1, 2]}) == payload_hash({'b': [1, 2], 'a': 1})
+    assert payload_hash({'a': 1}) != payload_hash({'a': 1.0})
+    with pytest.raises(TypeError):
+        payload_hash({'at': datetime.date.today()})
+
+def test_payload_hash_rejects_coerced_types():
+    with pytest.raises(TypeError):
+        payload_hash({'tags': ('a',)})
+    with pytest.raises(TypeError):
+        payload_hash({'a': [{1: 'x'}]})
+
+def test_returns_cached_results():
+    model = make_model()
+    cache = ValidationCache(maxsize=10)
+
+    assert cache.validate(model, {'name': 'x'}) is None
+    assert cache.validate(model, {'name': 'x'}) is None
+    errors = cache.validate(model, {'age': 200})
+    cached = cache.validate(model, {'age': 200})
+    assert cached == errors == model.validate({'age': 200})
+    assert cached is not errors
+    assert cache.validate(model, {'age': 200}, fail_fast=True) == {'age': '200 is greater than the maximum of 150'}
+    assert cache.validate(model, {'age': 200}, partial=True) == {'age': '200 is greater than the maximum of 150'}
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (2, 4, 4)
+    assert stats['hit_rate'] == pytest.approx(2 / 6)
+
+def test_keys_results_by_model():
+    cache = ValidationCache()
+    strict = make_model()
+    loose = Model('User', {'name': fields.string()})
+
+    assert cache.validate(strict, {}) == {'name': "'name' is a required property"}
+    assert cache.validate(loose, {}) is None
+    assert cache.fingerprint(strict) != cache.fingerprint(loose)
+
+def test_evicts_least_recently_used():
+    model = make_model()
+    cache = ValidationCache(maxsize=2)
+
+    cache.validate(model, {'name': 'a'})
+    cache.validate(model, {'name': 'b'})
+    cache.validate(model, {'name': 'a'})
+    cache.validate(model, {'name': 'c'})
+    cache.validate(model, {'name': 'a'})
+
+    assert len(cache) == 2
+    assert cache.stats()['evictions'] == 1
+    assert cache.hits == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+def test_expires_results():
+    clock = Clock()
+    model = make_model()
+    cache = ValidationCache(ttl=10, clock=clock)
+
+    cache.validate(model, {'name': 'a'})
+    clock.now = 5
+    cache.validate(model, {'name': 'a'})
+    clock.now = 10
+    cache.validate(model, {'name': 'a'})
+
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 2, 1)
+
+def test_validates_uncacheable_payloads():
+    model = make_model()
+    cache = ValidationCache()
+
+    assert cache.validate(model, {'name': {1, 2}}) == {'name': "{1, 2} is not of type 'string'"}
+    assert cache.stats()['uncacheable'] == 1
+    assert len(cache) == 0
+
+def test_does_not_cache_tuples_or_non_str_keys():
+    model = Model('Post', {'tags': fields.array(fields.string())})
+    cache = ValidationCache()
+
+    assert cache.validate(model, {'tags': ['a']}) is None
+    assert cache.validate(model, {'tags': ('a',)}) == model.validate({'tags': ('a',)})
+    assert cache.validate(model, {'tags': ('a',)}) is not None
+    assert cache.stats()['uncacheable'] == 2
+    assert len(cache) == 1
+
+def test_requires_a_size():
+    with pytest.raises(ValueError):
+        ValidationCache(maxsize=0)
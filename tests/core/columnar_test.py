@@ -0,0 +1,114 @@
+import random
+import subprocess
+import sys
+
+import pytest
+
+import oapispec as oapi
+from oapispec.core import columnar
+from oapispec.core.metrics import ValidationMetrics
+
+pytest.importorskip('numpy')
+
+
+address_model = oapi.model.Model('Address', {
+    'road': oapi.fields.string(required=True)
+})
+
+record_model = oapi.model.Model('Record', {
+    'id': oapi.fields.integer(required=True, minimum=1, maximum=1000, multiple=2),
+    'ratio': oapi.fields.float(minimum=0, exclusive_minimum=True, maximum=1, exclusive_maximum=True),
+    'step': oapi.fields.float(multiple=0.5),
+    'code': oapi.fields.string(min_length=2, max_length=3, enum=['ab', 'abc', 'x']),
+    'name': oapi.fields.string(max_length=5),
+    'level': oapi.fields.integer(enum=[1, 2, 3.0]),
+    'active': oapi.fields.boolean(enum=[True]),
+    'slug': oapi.fields.string(pattern='^[a-z]+$'),
+    'address': oapi.fields.nested(address_model)
+})
+
+VALUES = {
+    'id': [2, 3, 0, 1002, 500, -4, 'x', None, 2.0, True, 2 ** 70],
+    'ratio': [0, 0.5, 1, 1.5, -1, 'x', True],
+    'step': [1, 1.5, 1.2, 3],
+    'code': ['ab', 'abc', 'x', 'abcd', 'zz', 5],
+    'name': ['ok', 'toolong', None],
+    'level': [1, 3, 4, 'x', False],
+    'active': [True, False, 1],
+    'slug': ['abc', 'ABC'],
+    'address': [{'road': 'a'}, {}, 'x']
+}
+
+def random_records(count, seed=0):
+    rand = random.Random(seed)
+    records = []
+    for _ in range(count):
+        record = {}
+        for name, values in VALUES.items():
+            if rand.random() < 0.8:
+                record[name] = rand.choice(values)
+        records.append(record)
+    return records
+
+def expected_errors(model, records):
+    results = {}
+    for index, record in enumerate(records):
+        errors = model.validate(record)
+        if errors:
+            results[index] = errors
+    return results
+
+def test_validate_columns_matches_validate():
+    records = random_records(500) + ['not a record', None]
+
+    result = record_model.validate_columns(records)
+
+    assert result == expected_errors(record_model, records)
+    assert len(result) < len(records)
+
+def test_validate_columns_valid_batch():
+    records = [{'id': 2, 'code': 'ab'}, {'id': 4, 'ratio': 0.5}]
+
+    assert record_model.validate_columns(iter(records)) == {}
+
+def test_validate_columns_all_columnar_and_empty():
+    flat = oapi.model.Model('Flat', {
+        'id': oapi.fields.integer(required=True),
+        'name': oapi.fields.string()
+    })
+
+    assert columnar.compile_columns(flat)[1] is None
+    assert columnar.compile_columns(flat) is columnar.compile_columns(flat)
+    assert flat.validate_columns([]) == {}
+    assert flat.validate_columns([{'name': 1}, {'id': 1}]) == {0: {
+        'id': "'id' is a required property",
+        'name': "1 is not of type 'string'"
+    }}
+
+def test_validate_columns_reports_rows_to_observer():
+    records = [{'id': 2}, {'id': 3, 'name': 'toolong'}, 'x']
+    with ValidationMetrics() as metrics:
+        record_model.validate_columns(records)
+        record_model.validate_columns([])
+
+    snapshot = metrics.snapshot()['Record']
+    assert snapshot['calls'] == 3
+    assert snapshot['invalid'] == 2
+    assert snapshot['errors'] == {'id': 1, 'name': 1, '': 1}
+    assert snapshot['latency']['count'] == 3
+
+def test_is_columnar():
+    assert columnar.is_columnar(oapi.fields.integer(minimum=1).__schema__)
+    assert not columnar.is_columnar(oapi.fields.string(pattern='x').__schema__)
+    assert not columnar.is_columnar(oapi.fields.raw().__schema__)
+
+def test_validate_columns_requires_numpy(monkeypatch):
+    monkeypatch.setattr(columnar, 'numpy', None)
+
+    with pytest.raises(ImportError):
+        record_model.validate_columns([{}])
+
+def test_importing_oapispec_does_not_load_numpy():
+    code = 'import sys, oapispec; oapispec.model.Model("M", {}); print("numpy" in sys.modules)'
+
+    assert subprocess.check_output([sys.executable, '-c', code]).strip() == b'False'
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import oapispec as oapi
+from oapispec.core.concurrency import SingleFlight, default_executor
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+def test_single_flight_coalesces_concurrent_callers():
+    release = threading.Event()
+    calls = []
+
+    def build():
+        calls.append(1)
+        release.wait(5)
+        return {'built': len(calls)}
+
+    sut = SingleFlight(build)
+
+    async def main():
+        tasks = [asyncio.ensure_future(sut()) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = run(main())
+
+    assert calls == [1]
+    assert all(r is results[0] for r in results)
+
+def test_single_flight_returns_cached_result():
+    calls = []
+    sut = SingleFlight(lambda: calls.append(1) or 'result')
+
+    assert run(sut()) == 'result'
+    assert run(sut()) == 'result'
+    assert calls == [1]
+
+def test_single_flight_retries_after_failure():
+    calls = []
+
+    def build():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('boom')
+        return 'ok'
+
+    sut = SingleFlight(build)
+
+    with pytest.raises(RuntimeError):
+        run(sut())
+
+    assert run(sut()) == 'ok'
+
+def test_single_flight_uses_given_executor():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mock-executor')
+    sut = SingleFlight(lambda: threading.current_thread().name)
+
+    assert run(sut(executor)).startswith('mock-executor')
+
+def test_default_executor_is_shared():
+    assert default_executor() is default_executor()
+
+def test_schema_agenerate_matches_generate():
+
+    @oapi.doc.route('/ping')
+    @oapi.doc.method('GET')
+    def ping():
+        pass
+
+    sut = oapi.schema().register(ping)
+
+    result = run(sut.agenerate())
+
+    assert result == sut.generate()
+    assert run(sut.agenerate()) is result
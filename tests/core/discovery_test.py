@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+
+import pytest
+
+import oapispec as oapi
+from oapispec.core.discovery import (
+    DiscoveryStats,
+    discover,
+    import_handler_names,
+    load_index,
+    package_modules
+)
+
+
+HANDLER = '''
+import oapispec as oapi
+
+@oapi.doc.route('/{route}')
+@oapi.doc.method('GET')
+def {name}():
+    pass
+'''
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    '''Creates a package `discovered` in a temporary directory on the path'''
+    root = tmp_path / 'discovered'
+    (root / 'nested').mkdir(parents=True)
+    (root / 'data').mkdir()
+    (root / '__init__.py').write_text('')
+    (root / 'nested' / '__init__.py').write_text(HANDLER.format(route='nested', name='nested_index'))
+    (root / 'alpha.py').write_text(HANDLER.format(route='alpha', name='get_alpha'))
+    (root / 'beta.py').write_text(
+        HANDLER.format(route='beta', name='get_beta') +
+        HANDLER.format(route='beta2', name='get_beta2') +
+        'from discovered.alpha import get_alpha\n')
+    (root / 'nested' / 'gamma.py').write_text('import discovered.beta\n' + HANDLER.format(route='gamma', name='get_gamma'))
+    (root / 'notes.txt').write_text('')
+    (root / 'data' / 'ignored.py').write_text('raise RuntimeError()')
+    (root / 'not-a-module.py').write_text('raise RuntimeError()')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield root
+    for name in list(sys.modules):
+        if name.startswith('discovered'):
+            del sys.modules[name]
+
+def forget():
+    for name in list(sys.modules):
+        if name.startswith('discovered.'):
+            del sys.modules[name]
+
+def test_package_modules(package):
+    assert [(name, is_package) for name, _, is_package in package_modules('discovered')] == [
+        ('discovered', True),
+        ('discovered.alpha', False),
+        ('discovered.beta', False),
+        ('discovered.nested', True),
+        ('discovered.nested.gamma', False)
+    ]
+    with pytest.raises(ValueError):
+        package_modules('discovered.alpha')
+
+def test_discover_without_index(package):
+    stats = DiscoveryStats()
+
+    assert discover('discovered', workers=4, stats=stats) == [
+        'discovered.alpha:get_alpha',
+        'discovered.beta:get_beta',
+        'discovered.beta:get_beta2',
+        'discovered.nested:nested_index',
+        'discovered.nested.gamma:get_gamma'
+    ]
+    assert stats.as_dict() == {'modules': 5, 'imported': 5, 'cached': 0, 'handlers': 5}
+
+def test_discover_skips_unchanged_modules(package, tmp_path):
+    index_path = str(tmp_path / 'cache' / 'index.json')
+    first = discover('discovered', index_path=index_path)
+    forget()
+
+    stats = DiscoveryStats()
+    assert discover('discovered', index_path=index_path, stats=stats) == first
+    assert stats.as_dict() == {'modules': 5, 'imported': 0, 'cached': 5, 'handlers': 5}
+    assert 'discovered.alpha' not in sys.modules
+
+    # touched but unchanged files are recognised by their hash
+    alpha = package / 'alpha.py'
+    os.utime(alpha, ns=(0, 0))
+    assert discover('discovered', index_path=index_path, stats=stats) == first
+    assert stats.imported == 0
+    assert load_index(index_path, 'discovered')['discovered.alpha']['mtime_ns'] == 0
+
+    alpha.write_text(HANDLER.format(route='alpha', name='get_alpha') + HANDLER.format(route='alpha2', name='get_alpha2'))
+    (package / 'beta.py').unlink()
+    (package / 'delta.py').write_text(HANDLER.format(route='delta', name='get_delta'))
+    assert discover('discovered', index_path=index_path, stats=stats) == [
+        'discovered.alpha:get_alpha',
+        'discovered.alpha:get_alpha2',
+        'discovered.delta:get_delta',
+        'discovered.nested:nested_index',
+        'discovered.nested.gamma:get_gamma'
+    ]
+    assert stats.as_dict() == {'modules': 5, 'imported': 2, 'cached': 3, 'handlers': 5}
+    assert 'discovered.beta' not in load_index(index_path, 'discovered')
+
+def test_load_index_ignores_other_indexes(tmp_path):
+    path = tmp_path / 'index.json'
+    assert load_index(str(path), 'pkg') == {}
+
+    path.write_text('not json')
+    assert load_index(str(path), 'pkg') == {}
+
+    path.write_text(json.dumps({'version': 1, 'package': 'other', 'modules': {'a': {}}}))
+    assert load_index(str(path), 'pkg') == {}
+
+def test_import_errors_surface(package):
+    (package / 'broken.py').write_text('raise RuntimeError("broken")')
+
+    assert import_handler_names([]) == {}
+    with pytest.raises(RuntimeError):
+        discover('discovered')
+
+def test_schema_discover(package, tmp_path):
+    index_path = str(tmp_path / 'index.json')
+    oapi.schema().discover('discovered', index_path=index_path)
+    forget()
+
+    sut = oapi.schema(metadata={'title': 'Discovered'}).discover('discovered', index_path=index_path)
+
+    assert 'discovered.alpha' not in sys.modules
+    assert sorted(sut.generate()['paths']) == ['/alpha', '/beta', '/beta2', '/gamma', '/nested']
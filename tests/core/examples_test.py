@@ -0,0 +1,149 @@
+import re
+from itertools import islice
+from random import Random
+
+import pytest
+
+from oapispec import fields
+from oapispec.model import Model
+from oapispec.core.examples import Synthesizer, compile_pattern, examples, next_float
+
+
+currency = fields.shared_enum('Currency', ['EUR', 'USD'])
+
+item = Model('Item', {
+    'sku': fields.string(required=True, pattern=r'^[A-Z]{3}-\d{2,5}(x|yz)?$'),
+    'quantity': fields.integer(minimum=1, maximum=50, required=True, multiple=2),
+    'price': fields.float(minimum=0, exclusive_minimum=True, maximum=100, multiple=0.5),
+    'currency': fields.string(enum=currency),
+    'tags': fields.array(fields.string(min_length=2, max_length=4), max_items=3, unique=True)
+})
+
+order = Model('Order', {
+    'kind': fields.string(discriminator=True),
+    'id': fields.integer(required=True),
+    'score': fields.integer(exclusive_maximum=True, maximum=0.5),
+    'ratio': fields.float(maximum=1, exclusive_maximum=True),
+    'weight': fields.float(minimum=-1),
+    'email': fields.string(format='email'),
+    'at': fields.date_time(),
+    'on': fields.date(),
+    'flag': fields.boolean(),
+    'items': fields.array(fields.nested(item), min_items=1, max_items=4, required=True),
+    'main': fields.nested(item),
+    'name': fields.string(min_length=3, max_length=8, required=True),
+    'code': fields.string(pattern='.*'),
+    'raw': fields.raw(type='object'),
+    'note': fields.raw(example='n/a', type=None),
+    'size': fields.string(enum=['S', 'not-S']),
+    'anything': fields.raw(type=None)
+})
+
+@pytest.mark.parametrize('mode', ['valid', 'boundary'])
+def test_generates_valid_records(mode):
+    records = list(examples(order, 300, seed=1, mode=mode, optional=0.8))
+
+    assert [r for r in records if order.validate(r) is not None] == []
+    assert {r['kind'] for r in records} == {'Order'}
+
+def test_boundary_values():
+    records = list(order.examples(100, seed=1, mode='boundary', optional=1))
+
+    assert {r['weight'] for r in records} == {-1}
+    assert {len(r['name']) for r in records} == {3, 8}
+    assert {len(r['items']) for r in records} == {1, 4}
+    assert {i['quantity'] for r in records for i in r['items']} == {2, 50}
+    assert {r['score'] for r in records} == {0}
+
+def test_generates_invalid_records():
+    found = set()
+    for record in order.examples(1000, seed=2, mode='invalid'):
+        errors = order.errors(record)
+        assert errors
+        found.update(e.validator for e in errors)
+
+    assert found == {
+        'type', 'required', 'minimum', 'maximum', 'multipleOf', 'minLength', 'maxLength',
+        'minItems', 'maxItems', 'uniqueItems', 'enum', 'pattern'
+    }
+
+def test_targets_keywords():
+    records = order.examples(50, seed=3, mode='invalid', targets={'pattern', 'required'})
+
+    assert {e.validator for r in records for e in order.errors(r)} == {'pattern', 'required'}
+
+def test_same_seed_same_records():
+    assert list(order.examples(20, seed=7)) == list(order.examples(20, seed=7))
+    assert list(order.examples(20, seed=7)) != list(order.examples(20, seed=8))
+    assert len(list(islice(item.examples(), 5))) == 5
+
+def test_recursive_models():
+    node = Model('Node', {'value': fields.integer(required=True)})
+    node.attributes['children'] = fields.array(fields.nested(node))
+    node.attributes['next'] = fields.nested(node)
+
+    for record in node.examples(20, seed=1, optional=1):
+        assert node.validate(record) is None
+    for record in node.examples(20, seed=1, mode='invalid'):
+        assert node.validate(record) is not None
+
+def test_shared_enum_constraints():
+    codes = fields.shared_enum('Code', ['A', 'BB', 'CCC', 'BBB'])
+    model = Model('Coded', {'code': fields.string(enum=codes, min_length=2, pattern='^B', required=True)})
+
+    assert {r['code'] for r in model.examples(30, seed=1)} == {'BB', 'BBB'}
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.string(enum=codes, max_length=0))
+
+@pytest.mark.parametrize('value', [0, 0.0, 1, -1.5, 0.1, -1e-310, 5e-324, 1e308])
+def test_next_float(value):
+    up = next_float(value, up=True)
+    down = next_float(value, up=False)
+
+    assert down < value < up
+    assert next_float(up, up=False) == value
+    assert next_float(down, up=True) == value
+
+@pytest.mark.parametrize('pattern', [
+    r'^[A-Z]{3}-\d+$',
+    r'[^a-z]+\W\s\S\D',
+    r'^(ab|c)+\1.[^x][xy]$',
+    r'a*?b{2,}?',
+])
+def test_compile_pattern(pattern):
+    generate = compile_pattern(pattern)
+    rng = Random(0)
+
+    for _ in range(50):
+        assert re.search(pattern, generate(rng))
+
+def test_rejects_what_it_cannot_generate():
+    with pytest.raises(ValueError):
+        compile_pattern('(?=a)b')
+    with pytest.raises(ValueError):
+        list(examples(order, 1, mode='nope'))
+    with pytest.raises(ValueError):
+        list(examples(Model('Empty', {'raw': fields.raw(type=None)}), 1, mode='invalid'))
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.integer(minimum=5, maximum=4))
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.float(minimum=5, maximum=4))
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.float(minimum=0.1, maximum=0.2, multiple=0.5))
+
+    rng = Random(0)
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.float(minimum=0.25, maximum=0.35, multiple=0.1)).valid(rng, 0)
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.string(pattern='^a+$', max_length=0)).valid(rng, 0)
+    with pytest.raises(ValueError):
+        Synthesizer().field(fields.string(format='email', max_length=10)).valid(rng, 0)
+
+def test_format_with_length_bounds():
+    model = Model('Contact', {
+        'email': fields.string(format='email', min_length=20, max_length=22, required=True),
+        'id': fields.string(format='uuid', max_length=36, required=True)
+    })
+
+    for record in model.examples(50, seed=1):
+        assert model.validate(record) is None
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import oapispec as oapi
+from oapispec.core import fingerprint
+from oapispec.core.openapi import create_openapi_spec_dict
+
+
+book_model = oapi.model.Model('Book', {
+    'title': oapi.fields.string(required=True),
+    'edition': oapi.fields.integer()
+})
+
+def make_handler(name, route='/book', method='GET', model=book_model):
+
+    @oapi.doc.route(route)
+    @oapi.doc.method(method)
+    @oapi.doc.response(HTTPStatus.OK, model)
+    def handler():
+        pass
+
+    handler.__name__ = name
+    handler.__apidoc__['name'] = name
+    return handler
+
+def test_canonical_json_sorts_nested_keys():
+    a = fingerprint.canonical_json({'b': {'y': 1, 'x': 2}, 'a': [{'d': 1, 'c': 2}]})
+    b = fingerprint.canonical_json({'a': [{'c': 2, 'd': 1}], 'b': {'x': 2, 'y': 1}})
+
+    assert a == b
+    assert a == b'{"a":[{"c":2,"d":1}],"b":{"x":2,"y":1}}'
+
+def test_spec_fingerprint_is_stable():
+    sut = oapi.schema().register(make_handler('get_book'))
+
+    first = sut.fingerprint()
+    second = sut.fingerprint()
+
+    assert first == second
+    assert len(first.spec) == 64
+    assert list(first.operations['/book'].keys()) == ['get']
+    assert list(first.definitions.keys()) == ['Book']
+
+def test_spec_fingerprint_changes_only_touched_branch():
+    get_book = make_handler('get_book')
+    sut = oapi.schema().register(get_book)
+    before = sut.fingerprint()
+
+    after = sut.register(make_handler('add_book', method='POST')).fingerprint()
+
+    assert after.spec != before.spec
+    assert after.operations['/book']['get'] == before.operations['/book']['get']
+    assert after.definitions == before.definitions
+
+def test_spec_fingerprint_changes_with_metadata():
+    handler = make_handler('get_book')
+
+    a = oapi.schema(metadata={'title': 'A'}).register(handler).fingerprint()
+    b = oapi.schema(metadata={'title': 'B'}).register(handler).fingerprint()
+
+    assert a.spec != b.spec
+    assert a.operations == b.operations
+
+def test_operation_fingerprint_is_recomputed_when_apidoc_changes():
+    handler = make_handler('get_book')
+    before = fingerprint.operation_fingerprint(handler)
+
+    oapi.doc.deprecated(handler)
+
+    assert fingerprint.operation_fingerprint(handler) != before
+
+def test_operation_fingerprint_matches_serialized_operation():
+    handler = make_handler('get_book')
+    spec = create_openapi_spec_dict(oapi.schema().metadata, [handler])
+
+    expected = fingerprint.digest(fingerprint.canonical_json(spec['paths']['/book']['get']))
+
+    assert fingerprint.operation_fingerprint(handler) == expected
+
+def test_definition_fingerprint_of_unhashable_model_is_computed():
+
+    class UnhashableModel(oapi.model.Model):
+        __hash__ = None
+
+    model = UnhashableModel('Thing', {'name': oapi.fields.string()})
+
+    expected = fingerprint.digest(fingerprint.canonical_json(model.__schema__))
+
+    assert fingerprint.definition_fingerprint(model) == expected
@@ -0,0 +1,132 @@
+import importlib
+import sys
+
+import pytest
+
+import oapispec as oapi
+from oapispec.core import loader
+
+
+PACKAGE = 'tests.assets.lazy_handlers'
+
+@pytest.fixture(autouse=True)
+def unimported():
+    for name in list(sys.modules):
+        if name.startswith(PACKAGE):
+            del sys.modules[name]
+
+def names(handlers):
+    return [h.__name__ for h in handlers]
+
+def test_load_object():
+    assert loader.load_object('oapispec.model:Model') is oapi.model.Model
+    assert loader.load_object('oapispec:model.Model') is oapi.model.Model
+    with pytest.raises(ValueError):
+        loader.load_object('oapispec.model')
+
+def test_is_handler():
+    @oapi.doc.route('/a')
+    @oapi.doc.method('GET')
+    def handler():
+        pass
+
+    @oapi.doc.route('/a')
+    def incomplete():
+        pass
+
+    assert loader.is_handler(handler)
+    assert not loader.is_handler(incomplete)
+    assert not loader.is_handler(oapi.model.Model('M', {}))
+
+def test_resolve_references():
+    assert names(loader.resolve_reference(f'{PACKAGE}.books:get_book')) == ['get_book']
+    assert names(loader.resolve_reference(f'{PACKAGE}.books')) == ['add_book', 'get_book']
+    assert names(loader.resolve_reference(f'{PACKAGE}.*')) == ['dashboard', 'add_book', 'get_book', 'get_user']
+    assert names(loader.resolve_reference(f'{PACKAGE}.**')) == ['dashboard', 'audit_log', 'add_book', 'get_book', 'get_user']
+
+def test_resolve_handlers_keeps_order_without_duplicates():
+    def handler():
+        pass
+
+    resolved = loader.resolve_handlers([handler, f'{PACKAGE}.users:get_user', f'{PACKAGE}.*', handler])
+
+    assert resolved[0] is handler
+    assert names(resolved) == ['handler', 'get_user', 'dashboard', 'add_book', 'get_book']
+
+def test_resolve_handlers_imports_modules_concurrently(monkeypatch):
+    imported = []
+    import_modules = loader.import_modules
+    monkeypatch.setattr(loader, 'import_modules', lambda names, workers: imported.append(names) or import_modules(names, workers))
+    references = [f'{PACKAGE}.users:get_user', f'{PACKAGE}.books:get_book', f'{PACKAGE}.admin.audit', f'{PACKAGE}.*']
+
+    assert loader.reference_modules(references) == [f'{PACKAGE}.admin.audit', f'{PACKAGE}.books', f'{PACKAGE}.users']
+    assert names(loader.resolve_handlers(references, workers=2)) == ['get_user', 'get_book', 'audit_log', 'dashboard', 'add_book']
+    assert imported == [[f'{PACKAGE}.admin.audit', f'{PACKAGE}.books', f'{PACKAGE}.users']]
+    assert loader.reference_modules(references) == []
+
+def test_resolve_handlers_imports_serially_by_default(monkeypatch):
+    monkeypatch.setattr(loader, 'import_modules', None)
+
+    resolved = loader.resolve_handlers([f'{PACKAGE}.users:get_user', f'{PACKAGE}.books:get_book'])
+
+    assert names(resolved) == ['get_user', 'get_book']
+
+def test_import_modules_surfaces_errors():
+    loader.import_modules([])
+    with pytest.raises(ModuleNotFoundError):
+        loader.import_modules([f'{PACKAGE}.books', f'{PACKAGE}.missing'])
+    assert f'{PACKAGE}.books' in sys.modules
+
+@pytest.fixture
+def cyclic(tmp_path, monkeypatch):
+    '''A package `cyclic` whose modules import each other, run counts in `cyclic.runs`'''
+    root = tmp_path / 'cyclic'
+    root.mkdir()
+    (root / '__init__.py').write_text('runs = []\n')
+    # `a` holds its import lock while `b` waits on it, then needs `b`: a
+    # deadlock when imported concurrently, fine when imported one by one
+    (root / 'a.py').write_text(
+        'import time\nimport cyclic\ncyclic.runs.append("a")\ntime.sleep(0.2)\n'
+        'A = 1\nfrom cyclic.b import B\n')
+    (root / 'b.py').write_text('import cyclic\ncyclic.runs.append("b")\nfrom cyclic.a import A\nB = 2\n')
+    (root / 'broken.py').write_text('import cyclic\ncyclic.runs.append("broken")\nraise RuntimeError("broken")\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module('cyclic')
+    for name in list(sys.modules):
+        if name == 'cyclic' or name.startswith('cyclic.'):
+            del sys.modules[name]
+
+def test_import_modules_retries_concurrent_import_errors(cyclic):
+    loader.import_modules(['cyclic.a', 'cyclic.b'], workers=2)
+
+    assert sys.modules['cyclic.a'].A == 1
+    assert sys.modules['cyclic.b'].B == 2
+
+def test_import_modules_does_not_retry_other_errors(cyclic):
+    with pytest.raises(RuntimeError):
+        loader.import_modules(['cyclic.broken', 'cyclic.b'], workers=2)
+
+    assert cyclic.runs.count('broken') == 1
+
+def test_is_concurrent_import_error():
+    partial = ImportError("cannot import name 'B' from partially initialized module 'cyclic.b'")
+
+    assert loader.is_concurrent_import_error(partial)
+    assert loader.is_concurrent_import_error(type('_DeadlockError', (RuntimeError,), {})())
+    assert not loader.is_concurrent_import_error(ModuleNotFoundError("No module named 'nope'", name='nope'))
+    assert not loader.is_concurrent_import_error(RuntimeError('boom'))
+
+def test_schema_imports_references_on_first_use():
+    sut = oapi.schema().register(f'{PACKAGE}.books').register(f'{PACKAGE}.admin.**')
+
+    assert not any(name.startswith(PACKAGE) for name in sys.modules)
+    assert sut.handlers == [f'{PACKAGE}.books', f'{PACKAGE}.admin.**']
+
+    spec = sut.generate()
+
+    assert sorted(spec['paths']) == ['/admin', '/admin/audit', '/book', '/book/{id}']
+    assert f'{PACKAGE}.books' in sys.modules
+    assert f'{PACKAGE}.users' in sys.modules # imported by books
+    assert sut.resolved_handlers() is sut.resolved_handlers()
+    assert sut.operations().get('GET', '/admin/audit').handler.__name__ == 'audit_log'
+    assert sut.fingerprint().operations.keys() == spec['paths'].keys()
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+
+import oapispec as oapi
+from oapispec.core.marshal import encode_value, stream_json
+
+
+author_model = oapi.model.Model('Author', {
+    'name': oapi.fields.string(),
+})
+
+book_model = oapi.model.Model('Book', {
+    'title': oapi.fields.string(),
+    'edition': oapi.fields.integer(default=1),
+    'rating': oapi.fields.float(),
+    'inPrint': oapi.fields.boolean(),
+    'published': oapi.fields.date_time(),
+    'author': oapi.fields.nested(author_model),
+    'editors': oapi.fields.nested(author_model, as_list=True),
+    'tags': oapi.fields.array(oapi.fields.string()),
+    'metadata': oapi.fields.raw()
+})
+
+class Book:
+    def __init__(self, i):
+        self.title = f'Book é "{i}"'
+        self.edition = i if i % 2 else None
+        self.rating = i / 3
+        self.inPrint = bool(i % 3)
+        self.published = datetime(2020, 1, 1 + i % 28)
+        self.author = {'name': f'author {i}'}
+        self.editors = [{'name': 'e'}, None]
+        self.tags = ['a', None]
+        self.metadata = {'i': i, 'nested': [1, 2.5]}
+
+def test_stream_json_matches_marshal_many():
+    books = [Book(i) for i in range(50)]
+
+    chunks = list(stream_json(book_model, iter(books), chunk_size=512))
+
+    assert len(chunks) > 1
+    assert all(len(c) >= 512 for c in chunks[:-1])
+    assert json.loads(b''.join(chunks)) == json.loads(json.dumps(book_model.marshal_many(books)))
+
+def test_stream_json_empty_and_none_items():
+    assert b''.join(stream_json(book_model, [])) == b'[]'
+    assert json.loads(b''.join(book_model.stream_many([None, {}]))) == [None, book_model.marshal({})]
+
+def test_stream_json_model_without_fields():
+    empty = oapi.model.Model('Empty', {})
+
+    assert b''.join(empty.stream_many([{}, {}])) == b'[{},{}]'
+
+def test_encode_value():
+    assert encode_value('café') == '"caf\\u00e9"'
+    assert encode_value(42) == '42'
+    assert encode_value(True) == 'true'
+    assert encode_value(None) == 'null'
+    assert encode_value({'a': [1.5]}) == '{"a":[1.5]}'
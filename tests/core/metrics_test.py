@@ -0,0 +1,111 @@
+import pytest
+
+from oapispec import fields
+from oapispec.model import Model
+from oapispec.serve import to_wsgi
+from oapispec.core.metrics import Histogram, ValidationMetrics, field_path, metrics_resolver
+
+
+def make_model():
+    return Model('Order', {
+        'id': fields.integer(required=True),
+        'items': fields.array(fields.string(max_length=3))
+    })
+
+@pytest.fixture
+def metrics():
+    with ValidationMetrics(latency_buckets=(0.5, 1000), payload_sizes=True, size_buckets=(10, 100)) as metrics:
+        yield metrics
+    assert Model.observer is None
+
+def test_field_path():
+    assert field_path('items.3.name') == 'items.*.name'
+    assert field_path('0.items.12') == '*.items.*'
+    assert field_path('v2.name') == 'v2.name'
+    assert field_path('') == ''
+
+def test_histogram():
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(1, 2), (5, 3), ('+Inf', 4)]
+    assert histogram.as_dict() == {'buckets': {'1': 2, '5': 3, '+Inf': 4}, 'sum': 14.5, 'count': 4}
+
+def test_records_validations(metrics):
+    model = make_model()
+
+    model.validate({'id': 1})
+    model.validate({'items': ['abcd', 'ok', 'efgh']})
+    list(model.validate_iter([{'id': 'x'}, {'id': 2}]))
+    model.validate({'id': {1, 2}})
+
+    snapshot = metrics.snapshot()['Order']
+    assert snapshot['calls'] == 5
+    assert snapshot['invalid'] == 3
+    assert snapshot['errors'] == {'id': 3, 'items.*': 2}
+    assert snapshot['latency']['count'] == 5
+    assert snapshot['latency']['buckets']['0.5'] == 5
+    assert snapshot['payload_bytes']['count'] == 4
+    assert snapshot['payload_bytes']['buckets'] == {'10': 3, '100': 4, '+Inf': 4}
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+def test_off_by_default():
+    model = make_model()
+    metrics = ValidationMetrics()
+    metrics.install()
+    metrics.uninstall()
+    ValidationMetrics().uninstall()
+
+    model.validate({'id': 1})
+
+    assert metrics.snapshot() == {}
+
+def test_prometheus_text(metrics):
+    Model('Quo"te', {'id': fields.integer(required=True)}).validate({})
+
+    assert metrics.prometheus().splitlines() == [
+        '# HELP oapispec_validations_total Validations per model',
+        '# TYPE oapispec_validations_total counter',
+        'oapispec_validations_total{model="Quo\\"te"} 1',
+        '# HELP oapispec_validation_failures_total Invalid payloads per model',
+        '# TYPE oapispec_validation_failures_total counter',
+        'oapispec_validation_failures_total{model="Quo\\"te"} 1',
+        '# HELP oapispec_validation_errors_total Validation errors per model and field',
+        '# TYPE oapispec_validation_errors_total counter',
+        'oapispec_validation_errors_total{model="Quo\\"te",field="id"} 1',
+        '# HELP oapispec_validation_seconds Validation latency per model',
+        '# TYPE oapispec_validation_seconds histogram',
+        'oapispec_validation_seconds_bucket{model="Quo\\"te",le="0.5"} 1',
+        'oapispec_validation_seconds_bucket{model="Quo\\"te",le="1000"} 1',
+        'oapispec_validation_seconds_bucket{model="Quo\\"te",le="+Inf"} 1',
+        'oapispec_validation_seconds_sum{model="Quo\\"te"} %s' % metrics.models['Quo"te'].latency.sum,
+        'oapispec_validation_seconds_count{model="Quo\\"te"} 1',
+        '# HELP oapispec_validation_payload_bytes Size of the validated payloads per model',
+        '# TYPE oapispec_validation_payload_bytes histogram',
+        'oapispec_validation_payload_bytes_bucket{model="Quo\\"te",le="10"} 1',
+        'oapispec_validation_payload_bytes_bucket{model="Quo\\"te",le="100"} 1',
+        'oapispec_validation_payload_bytes_bucket{model="Quo\\"te",le="+Inf"} 1',
+        'oapispec_validation_payload_bytes_sum{model="Quo\\"te"} 2',
+        'oapispec_validation_payload_bytes_count{model="Quo\\"te"} 1'
+    ]
+
+def test_metrics_resolver():
+    metrics = ValidationMetrics()
+    resolve = metrics_resolver(metrics, fallback=lambda method, path, header: 'fallback')
+
+    response = resolve('GET', '/metrics', {}.get)
+    assert response.status == 200
+    assert response.body.startswith(b'# HELP oapispec_validations_total')
+    assert resolve('HEAD', '/metrics', {}.get).body == b''
+    assert resolve('POST', '/metrics', {}.get).status == 405
+    assert resolve('GET', '/other', {}.get) == 'fallback'
+    assert metrics_resolver(metrics)('GET', '/other', {}.get).status == 404
+
+    calls = []
+    body = to_wsgi(metrics_resolver(metrics))({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/metrics'}, lambda *args: calls.append(args))
+    assert calls[0][0] == '200 OK'
+    assert ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8') in calls[0][1]
+    assert body[0].endswith(b'\n')
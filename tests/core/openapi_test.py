@@ -3,7 +3,9 @@ import pytest
 
 from tests import utils
 
+from oapispec import fields
 from oapispec.core import openapi
+from oapispec.model import Model
 from oapispec.core.utils import immutable
 
 def make_mock_metadata(**overrides):
@@ -146,4 +148,16 @@ def test_parameters_for_throws_error_without_route():
     with pytest.raises(ValueError):
         openapi.parameters_for({})
 
+def test_find_models_includes_referenced_definitions():
+    currency = fields.shared_enum('Currency', ['EUR', 'USD'])
+    price = Model('Price', {'currency': fields.string(enum=currency)})
+    order = Model('Order', {'prices': fields.array(fields.nested(price)), 'total': fields.nested(price)})
+    handler = lambda: None
+    handler.__apidoc__ = {'expect': [(order, None)], 'responses': {'200': ('OK', price, {})}}
+
+    models = openapi.find_models([handler])
+
+    assert models == {'Order': order, 'Price': price, 'Currency': currency}
+    assert openapi.serialize_definitions(models)['Currency'] == {'type': 'string', 'enum': ['EUR', 'USD']}
+
 # Done
@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+
+import oapispec as oapi
+from oapispec.core.operations import OperationIndex, Parameter, swagger_type
+from oapispec.core.utils import immutable
+
+
+book_model = oapi.model.Model('Book', {
+    'title': oapi.fields.string(required=True),
+    'edition': oapi.fields.integer()
+})
+
+@oapi.doc.route('/shelf/<string:shelf_id>/book/<int:book_id>')
+@oapi.doc.method('PUT')
+@oapi.doc.expect(book_model)
+@oapi.doc.param('dry_run', type=bool)
+@oapi.doc.param('limit', type=int, default=10)
+@oapi.doc.param('X-Request-Id', location='header', required=True)
+def update_book():
+    pass
+
+@oapi.doc.route('/ping')
+@oapi.doc.method('GET')
+@oapi.doc.param('ratio', type='number')
+def ping():
+    pass
+
+index = OperationIndex([update_book, ping])
+
+def test_operation_index_lookups():
+    operation = index.get('PUT', '/shelf/<string:shelf_id>/book/<int:book_id>')
+
+    assert operation.handler is update_book
+    assert index.get('put', '/shelf/{shelf_id}/book/{book_id}') is operation
+    assert index.get_by_id('update_book') is operation
+    assert index.get('GET', '/nope') is None
+    assert index.get_by_id('nope') is None
+
+def test_operation_parse_coerces_parameters():
+    operation = index.get_by_id('update_book')
+
+    parsed, errors = operation.parse(
+        body={'title': 'Dune'},
+        query={'dry_run': 'true'},
+        headers={'x-request-id': 'abc'},
+        path={'shelf_id': 'scifi', 'book_id': '42'})
+
+    assert errors is None
+    assert parsed == {
+        'body': {'title': 'Dune'},
+        'path': {'shelf_id': 'scifi', 'book_id': 42},
+        'query': {'dry_run': True, 'limit': 10},
+        'header': {'X-Request-Id': 'abc'}
+    }
+
+def test_index_validate_reports_every_location():
+    errors = index.validate(
+        'PUT',
+        '/shelf/{shelf_id}/book/{book_id}',
+        body={'edition': 'first'},
+        query={'dry_run': 'maybe', 'limit': 'ten'},
+        headers={},
+        path={'shelf_id': 'scifi', 'book_id': 'x'})
+
+    assert errors == {
+        'body.title': "'title' is a required property",
+        'body.edition': "'first' is not of type 'integer'",
+        'query.dry_run': "'maybe' is not of type 'boolean'",
+        'query.limit': "'ten' is not of type 'integer'",
+        'header.X-Request-Id': "'X-Request-Id' is a required property",
+        'path.book_id': "'x' is not of type 'integer'"
+    }
+
+def test_validate_missing_body_and_root_errors():
+    operation = index.get_by_id('update_book')
+    request = {'headers': {'X-Request-Id': 'abc'}, 'path': {'shelf_id': 'a', 'book_id': 1}}
+
+    assert operation.validate(**request) == {'body': "'body' is a required property"}
+    assert operation.validate(body=[], **request) == {'body': "[] is not of type 'object'"}
+
+def test_validate_without_body_model():
+    assert index.validate('GET', '/ping', query={'ratio': '0.5'}) is None
+    assert index.validate('GET', '/ping') is None
+    assert index.validate('GET', '/ping', query={'ratio': True}) == {
+        'query.ratio': "True is not of type 'number'"
+    }
+
+def test_index_validate_unknown_operation_raises():
+    with pytest.raises(KeyError):
+        index.validate('GET', '/nope')
+
+def test_parameter_coercers():
+    flag = Parameter('flag', {'type': bool})
+    count = Parameter('count', {'type': int})
+    name = Parameter('name', {'type': 'string'})
+    raw = Parameter('raw', {'type': 'file'})
+    errors = {}
+
+    assert flag.parse({'flag': False}, errors) is False
+    assert flag.parse({'flag': 'off'}, errors) is False
+    assert count.parse({'count': True}, errors) is None
+    assert name.parse({'name': 5}, errors) == '5'
+    assert raw.parse({'raw': b'data'}, errors) == b'data'
+    assert errors == {'query.count': "True is not of type 'integer'"}
+
+def test_swagger_type():
+    assert swagger_type(int) == 'integer'
+    assert swagger_type('integer') == 'integer'
+
+def test_expect_non_model_has_no_body_validation():
+
+    @oapi.doc.route('/raw')
+    @oapi.doc.method('POST')
+    @oapi.doc.expect('RawBody')
+    def raw():
+        pass
+
+    assert OperationIndex([raw]).get_by_id('raw').model is None
+
+def test_schema_operations_are_compiled_once():
+    sut = oapi.schema().register(ping)
+
+    assert sut.operations() is sut.operations()
+    assert sut.operations().get_by_id('ping').handler is ping
+
+def test_operation_response_models():
+    error_model = oapi.model.Model('Error', {'message': oapi.fields.string()})
+
+    @oapi.doc.route('/thing')
+    @oapi.doc.method('GET')
+    @oapi.doc.response(HTTPStatus.OK, book_model)
+    @oapi.doc.response(HTTPStatus.NO_CONTENT)
+    @oapi.doc.response(immutable(value='default', description='Error'), error_model)
+    def get_thing():
+        pass
+
+    operation = OperationIndex([get_thing]).get('GET', '/thing')
+
+    assert dict((code, m.name) for code, m in operation.responses.items()) == {'200': 'Book', 'default': 'Error'}
+    assert operation.response_model(200).name == 'Book'
+    assert operation.response_model(404).name == 'Error'
+    assert index.get_by_id('ping').response_model(200) is None
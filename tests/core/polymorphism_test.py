@@ -0,0 +1,65 @@
+import pytest
+
+from oapispec import fields
+from oapispec.model import Model
+from oapispec.core.polymorphism import PolymorphicValidator, find_discriminator
+
+
+def make_events():
+    event = Model('Event', {
+        'type': fields.string(discriminator=True),
+        'id': fields.integer(required=True)
+    })
+    created = event.inherit('Created', {'name': fields.string(required=True)})
+    deleted = event.inherit('Deleted', {'reason': fields.string(enum=['spam', 'user'])})
+    return event, created, deleted
+
+def test_find_discriminator():
+    event, created, _ = make_events()
+
+    assert find_discriminator(event) == 'type'
+    assert find_discriminator(created) == 'type'
+    assert find_discriminator(Model('Plain', {'id': fields.integer()})) is None
+
+def test_dispatches_to_named_subtype():
+    event, created, deleted = make_events()
+    validator = event.polymorphic([created, deleted])
+
+    assert validator.model_for({'type': 'Created'}) is created
+    assert validator.validate({'type': 'Created', 'id': 1, 'name': 'x'}) is None
+    assert validator.validate({'type': 'Created', 'id': 1}) == {'name': "'name' is a required property"}
+    assert [e.key for e in validator.iter_errors({'type': 'Created', 'id': 'x'})] == ['id', 'name']
+    assert validator.validate({'type': 'Deleted', 'id': 1, 'reason': 'x'}) == {
+        'reason': "'x' is not one of ['spam', 'user']"
+    }
+
+def test_reports_unknown_or_missing_discriminator():
+    event, created, deleted = make_events()
+    validator = PolymorphicValidator(event, [created, deleted])
+
+    errors = validator.errors({'type': 'Updated', 'id': 1})
+    assert [(e.key, e.validator, e.expected, e.value) for e in errors] == [
+        ('type', 'enum', ['Created', 'Deleted'], 'Updated')
+    ]
+    assert validator.validate({'type': ['Created']}) == {'type': "['Created'] is not one of ['Created', 'Deleted']"}
+    assert validator.validate({'id': 1}) == {'type': "'type' is a required property"}
+    assert validator.validate([]) == {'': "[] is not of type 'object'"}
+    assert len(validator.errors({'type': 'Created'}, fail_fast=True)) == 1
+    with pytest.raises(ValueError):
+        validator.validate({'type': 'Updated'}, max_errors=0)
+
+def test_subtypes_by_value():
+    event, created, deleted = make_events()
+    validator = event.polymorphic({'created': created, 'deleted': deleted, 'event': event})
+
+    assert validator.values == ['created', 'deleted', 'event']
+    assert validator.model_for({'type': 'event'}) is event
+    assert validator.validate({'type': 'created', 'id': 'x', 'name': 'y'}) == {'id': "'x' is not of type 'integer'"}
+
+def test_rejects_invalid_families():
+    event, created, _ = make_events()
+
+    with pytest.raises(ValueError):
+        PolymorphicValidator(Model('Plain', {}), [created])
+    with pytest.raises(ValueError):
+        event.polymorphic([Model('Other', {})])
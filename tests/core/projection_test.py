@@ -0,0 +1,74 @@
+import pytest
+
+import oapispec as oapi
+from oapispec.core.projection import compile_projector, parse_mask
+
+
+author_model = oapi.model.Model('Author', {
+    'id': oapi.fields.integer(),
+    'name': oapi.fields.string(),
+    'country': oapi.fields.string(default='unknown')
+})
+
+book_model = oapi.model.Model('Book', {
+    'id': oapi.fields.integer(),
+    'title': oapi.fields.string(),
+    'author': oapi.fields.nested(author_model),
+    'editors': oapi.fields.nested(author_model, as_list=True),
+    'reviewers': oapi.fields.array(oapi.fields.nested(author_model)),
+    'tags': oapi.fields.array(oapi.fields.string())
+})
+
+class Author:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+book = {
+    'id': 1,
+    'title': 'Dune',
+    'author': Author(7, 'Frank'),
+    'editors': [{'id': 2, 'name': 'Sterling'}, None],
+    'reviewers': [Author(3, 'Ann')],
+    'tags': ['scifi']
+}
+
+def test_parse_mask():
+    assert parse_mask('id, author.name,author.id,,') == {'id': {}, 'author': {'name': {}, 'id': {}}}
+    assert parse_mask(['title']) == {'title': {}}
+
+    with pytest.raises(ValueError):
+        parse_mask('author..name')
+
+def test_project_selects_paths():
+    assert book_model.project(book, 'id,author.name') == {'id': 1, 'author': {'name': 'Frank'}}
+
+def test_project_lists_and_whole_nested_fields():
+    assert book_model.project(book, 'editors.name,reviewers.id,author,tags') == {
+        'editors': [{'name': 'Sterling'}, None],
+        'reviewers': [{'id': 3}],
+        'author': {'id': 7, 'name': 'Frank', 'country': 'unknown'},
+        'tags': ['scifi']
+    }
+
+def test_project_none():
+    assert book_model.project(None, 'id') is None
+    assert book_model.project({'author': None}, 'author.name') == {'author': None}
+
+def test_projector_is_cached_per_model_and_mask():
+    assert book_model.projector('id,title') is book_model.projector('id,title')
+    assert book_model.projector('id,title') is not book_model.projector('title')
+    assert compile_projector.cache_info().hits > 0
+
+def test_projector_rejects_invalid_masks():
+    with pytest.raises(ValueError):
+        book_model.projector('isbn')
+
+    with pytest.raises(ValueError):
+        book_model.projector('author.isbn')
+
+    with pytest.raises(ValueError):
+        book_model.projector('title.length')
+
+    with pytest.raises(ValueError):
+        book_model.projector(' , ')
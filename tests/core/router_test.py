@@ -0,0 +1,94 @@
+import pytest
+
+import oapispec as oapi
+from oapispec.core.operations import OperationIndex
+from oapispec.core.router import Router, parse_segment, split_path
+
+
+def make_router():
+    router = Router()
+    router.add('/book', 'GET', 'list_books')
+    router.add('/book/new', 'GET', 'new_book_form')
+    router.add('/book/<int:book_id>', 'GET', 'get_book')
+    router.add('/book/<float:rating>', 'GET', 'books_by_rating')
+    router.add('/book/<string:slug>', 'GET', 'get_book_by_slug')
+    router.add('/book/<string:slug>', 'POST', 'update_book_by_slug')
+    router.add('/book/<int:book_id>/page/<page>', 'GET', 'get_page')
+    router.add('/', 'GET', 'root')
+    return router
+
+def test_router_prefers_static_segments():
+    assert make_router().match('GET', '/book/new') == ('new_book_form', {})
+
+def test_router_matches_converters_by_specificity():
+    router = make_router()
+
+    assert router.match('GET', '/book/42') == ('get_book', {'book_id': 42})
+    assert router.match('get', '/book/4.5') == ('books_by_rating', {'rating': 4.5})
+    assert router.match('GET', '/book/dune%20messiah') == ('get_book_by_slug', {'slug': 'dune messiah'})
+
+def test_router_backtracks_on_method():
+    assert make_router().match('POST', '/book/new') == ('update_book_by_slug', {'slug': 'new'})
+
+def test_router_matches_nested_params():
+    assert make_router().match('GET', '/book/7/page/intro') == ('get_page', {'book_id': 7, 'page': 'intro'})
+
+def test_router_no_match():
+    router = make_router()
+
+    assert router.match('GET', '/author') is None
+    assert router.match('GET', '/book/7/page/') is None
+    assert router.match('DELETE', '/book/7') is None
+    assert router.match('GET', '/book/7/page/intro/extra') is None
+
+def test_router_root_and_relative_paths():
+    router = make_router()
+
+    assert router.match('GET', '/') == ('root', {})
+    assert router.match('GET', 'book') == ('list_books', {})
+
+def test_router_int_rejects_non_ascii_digits():
+    assert make_router().match('GET', '/book/²') == ('get_book_by_slug', {'slug': '²'})
+    assert make_router().match('GET', '/book/٤٢') == ('get_book_by_slug', {'slug': '٤٢'})
+    assert make_router().match('GET', '/book/42\n') == ('get_book_by_slug', {'slug': '42\n'})
+
+def test_router_methods():
+    router = make_router()
+
+    assert router.methods('/book/new') == {'get', 'post'}
+    assert router.methods('/book/7') == {'get', 'post'}
+    assert router.methods('/nope') == set()
+
+def test_router_replaces_same_route_and_method():
+    router = Router()
+    router.add('/a/<int:id>', 'GET', 'first')
+    router.add('/a/<int:id>', 'GET', 'second')
+
+    assert router.match('GET', '/a/1') == ('second', {'id': 1})
+
+def test_parse_segment():
+    assert parse_segment('book') == (None, 'book')
+    assert parse_segment('<id>') == ('default', 'id')
+    assert parse_segment('<int:id>') == ('int', 'id')
+
+    with pytest.raises(ValueError):
+        parse_segment('<date:day>')
+
+    with pytest.raises(ValueError):
+        parse_segment('<name>.json')
+
+def test_split_path():
+    assert split_path('/a/b/') == ['a', 'b', '']
+    assert split_path('a/b') == ['a', 'b']
+
+def test_operation_index_match():
+
+    @oapi.doc.route('/book/<int:book_id>')
+    @oapi.doc.method('GET')
+    def get_book():
+        pass
+
+    operation, params = OperationIndex([get_book]).match('GET', '/book/42')
+
+    assert operation.handler is get_book
+    assert params == {'book_id': 42}
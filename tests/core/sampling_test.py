@@ -0,0 +1,121 @@
+from http import HTTPStatus
+
+import pytest
+
+import oapispec as oapi
+from oapispec.core.operations import OperationIndex
+from oapispec.core.sampling import ResponseSampler
+
+
+book_model = oapi.model.Model('Book', {
+    'title': oapi.fields.string(required=True),
+    'edition': oapi.fields.integer()
+})
+
+@oapi.doc.route('/book/<int:id>')
+@oapi.doc.method('GET')
+@oapi.doc.response(HTTPStatus.OK, book_model)
+def get_book():
+    pass
+
+operations = OperationIndex([get_book])
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_validates_every_nth_response():
+    sampler = ResponseSampler(operations, rate=0.25)
+
+    results = [sampler.check('GET', '/book/{id}', 200, {'edition': 'x'}) for _ in range(8)]
+
+    assert results == [None, None, None, {'title': "'title' is a required property", 'edition': "'x' is not of type 'integer'"}] * 2
+    assert (sampler.seen, sampler.sampled, sampler.invalid) == (8, 2, 2)
+
+@pytest.mark.parametrize('rate', [0.75, 0.6, 0.1, 0.01])
+def test_samples_the_fraction_of_responses(rate):
+    sampler = ResponseSampler(OperationIndex([]), rate=rate)
+
+    for _ in range(1000):
+        sampler.check('GET', '/', 200, {})
+
+    assert abs(sampler.sampled - 1000 * rate) <= 1
+
+def test_aggregates_violations():
+    sampler = ResponseSampler(operations)
+
+    sampler.check('GET', '/book/<int:id>', 200, {'title': 'Dune'})
+    sampler.check('GET', '/book/<int:id>', 200, {})
+    sampler.check('GET', '/book/<int:id>', 200, {'edition': 2})
+    sampler.check('GET', '/book/<int:id>', 200, {'title': 1})
+    sampler.check('GET', '/book/<int:id>', 404, {})
+    sampler.check('GET', '/nope', 200, {})
+
+    assert sampler.stats() == {
+        'seen': 6,
+        'sampled': 6,
+        'invalid': 3,
+        'undocumented': 2,
+        'violations': [
+            {'operation': 'GET /book/{id}', 'status': '200', 'field': 'title', 'validator': 'required', 'count': 2},
+            {'operation': 'GET /book/{id}', 'status': '200', 'field': 'title', 'validator': 'type', 'count': 1}
+        ]
+    }
+
+    sampler.reset()
+    assert sampler.stats() == {'seen': 0, 'sampled': 0, 'invalid': 0, 'undocumented': 0, 'violations': []}
+
+def test_spends_a_time_budget():
+    clock = Clock()
+    sampler = ResponseSampler(OperationIndex([]), budget=0.1, clock=clock, cpu_clock=clock)
+
+    def slow_check(*args):
+        clock.now += 0.15
+    sampler._check = slow_check
+
+    assert sampler._sample() is True
+    sampler.check('GET', '/', 200, {})
+    # 0.1s of budget and 0.15s spent, no sample until the bucket is positive again
+    assert sampler._sample() is False
+    clock.now += 0.2
+    assert sampler._sample() is False
+    clock.now += 0.2
+    assert sampler._sample() is True
+    assert sampler.seen == 1
+
+def test_budget_is_charged_cpu_time():
+    clock = Clock()
+    cpu_clock = Clock()
+    sampler = ResponseSampler(OperationIndex([]), budget=0.1, clock=clock, cpu_clock=cpu_clock)
+
+    checked = []
+    def waiting_check(*args):
+        # a second of wall time waiting, 10ms of it on the cpu
+        clock.now += 1
+        cpu_clock.now += 0.01
+        checked.append(args)
+    sampler._check = waiting_check
+
+    for _ in range(5):
+        sampler.check('GET', '/', 200, {})
+    assert len(checked) == 5
+    assert sampler._tokens == pytest.approx(0.1 - 0.01)
+
+def test_combines_rate_and_budget():
+    clock = Clock()
+    sampler = ResponseSampler(operations, rate=0.5, budget=1, clock=clock)
+
+    assert [sampler.check('GET', '/book/{id}', 200, {}) is not None for _ in range(4)] == [False, True, False, True]
+
+def test_rejects_invalid_settings():
+    with pytest.raises(ValueError):
+        ResponseSampler(operations, rate=0)
+    with pytest.raises(ValueError):
+        ResponseSampler(operations, rate=1.5)
+    with pytest.raises(ValueError):
+        ResponseSampler(operations, budget=0)
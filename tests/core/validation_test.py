@@ -0,0 +1,52 @@
+from oapispec.core.validation import EnumValues, Validator, compile_enums, describe_enum, strip_required
+
+
+def test_compile_enums():
+    schema = {
+        'properties': {'code': {'type': 'string', 'enum': ['a', 'b']}},
+        'definitions': {'Kind': {'enum': [1, 2]}},
+        'allOf': [{'enum': [{'x': 1}]}]
+    }
+
+    compiled = compile_enums(schema)
+
+    assert compiled == schema
+    assert isinstance(compiled['properties']['code']['enum'], EnumValues)
+    assert compiled['properties']['code']['enum'].lookup == frozenset(['a', 'b'])
+    assert compiled['definitions']['Kind']['enum'].lookup == frozenset([1, 2])
+    assert compiled['allOf'][0]['enum'].lookup is None
+    assert not isinstance(schema['properties']['code']['enum'], EnumValues)
+
+def test_enum_keeps_bool_and_number_semantics():
+    validator = Validator(compile_enums({'enum': [True, 2, 'x']}))
+
+    assert validator.is_valid(True)
+    assert validator.is_valid(2.0)
+    assert validator.is_valid('x')
+    assert not validator.is_valid(1)
+    assert not validator.is_valid('y')
+    assert not validator.is_valid({'x': 1})
+    assert [e.message for e in validator.iter_errors('y')] == ["'y' is not one of [True, 2, 'x']"]
+
+def test_long_enum_messages_are_cut_short():
+    codes = [f'C{i:03}' for i in range(500)]
+    shown = ', '.join(repr(c) for c in codes[:20])
+    validator = Validator(compile_enums({'enum': codes}))
+
+    assert describe_enum(codes) == f'[{shown}, ...] (500 values)'
+    assert [e.message for e in validator.iter_errors('X')] == [f"'X' is not one of [{shown}, ...] (500 values)"]
+    assert [e.validator_value for e in validator.iter_errors('X')] == [codes]
+    assert [e.message for e in Validator({'enum': codes}).iter_errors(0)] == [f"0 is not one of [{shown}, ...] (500 values)"]
+
+def test_strip_required():
+    schema = {
+        'required': ['a'],
+        'properties': {'required': {'type': 'string'}},
+        'allOf': [{'required': ['b'], 'type': 'object'}]
+    }
+
+    assert strip_required(schema) == {
+        'properties': {'required': {'type': 'string'}},
+        'allOf': [{'type': 'object'}]
+    }
+    assert schema['required'] == ['a']
@@ -7,6 +7,7 @@ from functools import partial
 import pytest
 
 from oapispec import fields
+from oapispec.model import Model
 
 
 class FieldTestCase:
@@ -266,3 +267,53 @@ class TestListField(BaseFieldTestMixin, FieldTestCase):
         field = fields.array(fields.string(), unique=True)
         assert 'uniqueItems' in field.__schema__
         assert field.__schema__['uniqueItems'] is True
+
+
+def test_nested_keeps_model_reference():
+    model = Model('Address', {'road': fields.string()})
+
+    field = fields.nested(model, as_list=True)
+
+    assert field.model is model
+    assert field.as_list is True
+
+def test_array_keeps_item_reference():
+    item = fields.string()
+
+    assert fields.array(item).item is item
+
+def test_string_with_shared_enum():
+    currency = fields.shared_enum('Currency', ['EUR', 'USD'], description='ISO 4217 code')
+
+    field = fields.string(enum=currency, required=True)
+
+    assert currency.__schema__ == {'type': 'string', 'enum': ['EUR', 'USD'], 'description': 'ISO 4217 code'}
+    assert field.__schema__ == {'$ref': '#/definitions/Currency'}
+    assert field.definition is currency
+    assert field.required is True
+
+def test_string_with_shared_enum_and_constraints():
+    currency = fields.shared_enum('Currency', ['EUR', 'USD', 'XX'])
+
+    field = fields.string(enum=currency, min_length=1, max_length=2, pattern='^X', discriminator=True)
+
+    assert field.__schema__ == {
+        'allOf': [
+            {'$ref': '#/definitions/Currency'},
+            {'minLength': 1, 'maxLength': 2, 'pattern': '^X'}
+        ]
+    }
+    assert field.definition is currency
+    assert field.required is True
+    assert field.discriminator is True
+
+def test_string_with_shared_enum_and_annotations():
+    currency = fields.shared_enum('Currency', ['EUR', 'USD'])
+
+    field = fields.string(enum=currency, description='Price currency', example='EUR')
+
+    assert field.__schema__ == {
+        'allOf': [{'$ref': '#/definitions/Currency'}],
+        'description': 'Price currency',
+        'example': 'EUR'
+    }
@@ -0,0 +1,107 @@
+import json
+from http import HTTPStatus
+
+from werkzeug.test import Client
+from werkzeug.wrappers import BaseResponse
+
+import oapispec as oapi
+from oapispec import mock
+from oapispec.core.utils import immutable
+from tests.serve_test import asgi_request
+
+
+book_model = oapi.model.Model('Book', {
+    'id': oapi.fields.integer(required=True),
+    'title': oapi.fields.string(required=True, min_length=1),
+    'genre': oapi.fields.string(enum=['scifi', 'poetry'])
+})
+error_model = oapi.model.Model('Error', {'message': oapi.fields.string(required=True)})
+
+@oapi.doc.route('/book/<int:id>')
+@oapi.doc.method('GET')
+@oapi.doc.response(HTTPStatus.OK, book_model)
+@oapi.doc.response(HTTPStatus.NOT_FOUND, error_model)
+def get_book():
+    pass
+
+@oapi.doc.route('/book/<int:id>')
+@oapi.doc.method('DELETE')
+@oapi.doc.response(HTTPStatus.NO_CONTENT)
+@oapi.doc.response(immutable(value='default', description='Error'), error_model)
+def delete_book():
+    pass
+
+@oapi.doc.route('/errors')
+@oapi.doc.method('GET')
+@oapi.doc.response(immutable(value='default', description='Error'), error_model)
+def errors():
+    pass
+
+@oapi.doc.route('/book')
+@oapi.doc.method('POST')
+@oapi.doc.response(HTTPStatus.BAD_REQUEST, error_model)
+def add_book():
+    pass
+
+@oapi.doc.route('/ping')
+@oapi.doc.method('GET')
+def ping():
+    pass
+
+schema = oapi.schema(metadata={'title': 'Mocked API'}).register(get_book).register(delete_book).register(add_book).register(ping).register(errors)
+
+def make_client(seed=0):
+    return Client(mock.wsgi_app(schema, seed=seed), BaseResponse)
+
+def test_serves_examples_of_documented_responses():
+    client = make_client()
+
+    response = client.get('/book/42')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'application/json'
+    assert book_model.validate(json.loads(response.data)) is None
+    assert client.get('/book/7').data == response.data
+    assert make_client(seed=1).get('/book/42').data != response.data
+
+    response = client.get('/book/42', headers={'Prefer': 'code=404'})
+    assert response.status_code == 404
+    assert error_model.validate(json.loads(response.data)) is None
+
+    assert client.get('/book/42', headers={'Prefer': 'code=500'}).status_code == 200
+    assert client.get('/book/42', headers={'Prefer': 'dynamic=true'}).status_code == 200
+
+def test_statuses_without_examples():
+    client = make_client()
+
+    response = client.delete('/book/42')
+    assert response.status_code == 204
+    assert response.data == b''
+    assert 'Content-Length' not in response.headers
+    assert client.delete('/book/42', headers={'Prefer': 'code=200'}).status_code == 204
+    assert client.post('/book').status_code == 400
+    assert error_model.validate(json.loads(client.get('/errors').data)) is None
+
+    response = client.get('/ping')
+    assert response.status_code == 200
+    assert response.data == b''
+
+def test_head_and_unknown_routes():
+    client = make_client()
+
+    response = client.head('/book/42')
+    assert response.status_code == 200
+    assert response.data == b''
+    assert int(response.headers['Content-Length']) > 0
+
+    assert client.get('/nope').status_code == 404
+    assert client.get('/book/abc').status_code == 404
+    response = client.put('/book/42')
+    assert response.status_code == 405
+    assert response.headers['Allow'] == 'DELETE, GET'
+
+def test_asgi():
+    status, headers, body = asgi_request(mock.asgi_app(schema), 'GET', '/book/1', {'Prefer': 'code=404'})
+
+    assert status == 404
+    assert headers['content-type'] == 'application/json'
+    assert error_model.validate(json.loads(body)) is None
@@ -2,7 +2,10 @@ import copy
 
 from collections import OrderedDict
 
+import pytest
+
 import oapispec as oapi
+from oapispec.core import validation
 
 def test_model_validate_succeedes():
 
@@ -337,3 +340,222 @@ def test_model_str():
     })
 
     result = str(model)
+
+def test_model_validate_resolves_nested_models():
+    address = oapi.model.Model('Address', {
+        'road': oapi.fields.string(required=True),
+    })
+
+    person = oapi.model.Model('Person', {
+        'address': oapi.fields.nested(address),
+        'previous': oapi.fields.array(oapi.fields.nested(address))
+    })
+
+    result = person.validate({
+        'address': {},
+        'previous': [{'road': 'Main'}, {'road': 5}]
+    })
+
+    assert result == {
+        'address.road': "'road' is a required property",
+        'previous.1.road': "5 is not of type 'string'"
+    }
+
+def test_model_validate_resolves_parents():
+    parent = oapi.model.Model('Parent', {
+        'name': oapi.fields.string(required=True),
+    })
+
+    child = parent.inherit('Child', {
+        'extra': oapi.fields.string()
+    })
+
+    assert child.validate({'extra': 'x'}) == {
+        'name': "'name' is a required property"
+    }
+
+def test_model_validator_is_compiled_once():
+    model = oapi.model.Model('Car', {
+        'color': oapi.fields.string()
+    })
+
+    assert model.validator is model.validator
+
+def test_model_marshal_object_and_dict():
+    from datetime import date
+
+    class Author:
+        def __init__(self, name):
+            self.name = name
+            self.secret = 'not documented'
+
+    author = oapi.model.Model('Author', {
+        'name': oapi.fields.string(),
+    })
+
+    book = oapi.model.Model('Book', {
+        'title': oapi.fields.string(),
+        'edition': oapi.fields.integer(default=1),
+        'published': oapi.fields.date(),
+        'author': oapi.fields.nested(author),
+        'editors': oapi.fields.nested(author, as_list=True),
+        'tags': oapi.fields.array(oapi.fields.string()),
+        'reviewers': oapi.fields.array(oapi.fields.nested(author)),
+        'metadata': oapi.fields.raw()
+    })
+
+    result = book.marshal({
+        'title': 'Dune',
+        'published': date(1965, 8, 1),
+        'author': Author('Frank'),
+        'editors': [{'name': 'Sterling'}, None],
+        'tags': ('scifi',),
+        'reviewers': [Author('A')],
+        'metadata': {'x': 1},
+        'extra': 'dropped'
+    })
+
+    assert result == {
+        'title': 'Dune',
+        'edition': 1,
+        'published': '1965-08-01',
+        'author': {'name': 'Frank'},
+        'editors': [{'name': 'Sterling'}, None],
+        'tags': ['scifi'],
+        'reviewers': [{'name': 'A'}],
+        'metadata': {'x': 1}
+    }
+
+def test_model_marshal_many_and_none():
+    model = oapi.model.Model('Car', {
+        'color': oapi.fields.string(),
+        'made': oapi.fields.date_time()
+    })
+
+    assert model.marshal(None) is None
+    assert model.marshal_many([{'color': 'red', 'made': 'unknown'}, {}]) == [
+        {'color': 'red', 'made': 'unknown'},
+        {'color': None, 'made': None}
+    ]
+
+def test_model_marshal_includes_inherited_fields():
+    parent = oapi.model.Model('Parent', {
+        'name': oapi.fields.string(),
+    })
+
+    child = parent.inherit('Child', {
+        'extra': oapi.fields.string()
+    })
+
+    assert child.marshal({'name': 'a', 'extra': 'b'}) == {'name': 'a', 'extra': 'b'}
+    assert child.all_attributes.keys() == {'name', 'extra'}
+
+def test_model_structured_errors():
+    model = oapi.model.Model('User', {
+        'username': oapi.fields.string(required=True),
+        'age': oapi.fields.integer(maximum=150),
+    })
+
+    errors = sorted(model.errors({'age': 200}), key=lambda e: e.key)
+
+    assert [(e.path, e.key, e.validator, e.expected) for e in errors] == [
+        (('age',), 'age', 'maximum', 150),
+        (('username',), 'username', 'required', ['username'])
+    ]
+    assert errors[0].value == 200
+    assert errors[0].message == '200 is greater than the maximum of 150'
+    assert errors[1].value == {'age': 200}
+    assert repr(errors[1]) == "FieldError('username', \"'username' is a required property\")"
+    assert model.errors({'username': 'yolo'}) == []
+
+def test_model_validate_fail_fast_and_max_errors():
+    model = oapi.model.Model('Numbers', {
+        'values': oapi.fields.array(oapi.fields.integer())
+    })
+    data = {'values': ['x'] * 50000}
+
+    assert model.validate(data, fail_fast=True) == {'values.0': "'x' is not of type 'integer'"}
+    assert len(model.validate(data, max_errors=3)) == 3
+    assert len(model.errors(data, max_errors=10)) == 10
+    assert len(model.validate({'values': ['x'] * 20})) == 20
+
+def test_model_validate_rejects_max_errors_below_one():
+    model = oapi.model.Model('Numbers', {'value': oapi.fields.integer()})
+
+    for max_errors in (0, -1):
+        with pytest.raises(ValueError):
+            model.validate({'value': 'x'}, max_errors=max_errors)
+    assert model.validate({'value': 'x'}, max_errors=0, fail_fast=True) == {'value': "'x' is not of type 'integer'"}
+
+def test_model_validate_enums():
+    currency = oapi.fields.shared_enum('Currency', ['EUR', 'USD'])
+    model = oapi.model.Model('Price', {
+        'currency': oapi.fields.string(enum=currency, required=True),
+        'unit': oapi.fields.string(enum=['kg', 'l']),
+        'flag': oapi.fields.raw(type=None, enum=[0, [1], {'a': 1}])
+    })
+
+    assert model.validate({'currency': 'EUR', 'unit': 'kg'}) is None
+    assert model.validate({'currency': 'GBP', 'unit': 'm'}) == {
+        'currency': "'GBP' is not one of ['EUR', 'USD']",
+        'unit': "'m' is not one of ['kg', 'l']"
+    }
+    assert model.validate({'currency': 'USD', 'flag': [1]}) is None
+    assert model.validate({'currency': 'USD', 'flag': False}) == {'flag': "False is not one of [0, [1], {'a': 1}]"}
+
+def test_model_validate_shared_enum_constraints():
+    currency = oapi.fields.shared_enum('Currency', ['EUR', 'USD', 'XX'])
+    model = oapi.model.Model('Price', {
+        'currency': oapi.fields.string(enum=currency, max_length=2)
+    })
+
+    assert model.validate({'currency': 'XX'}) is None
+    assert model.validate({'currency': 'EUR'}) == {'currency': "'EUR' is too long"}
+    assert model.validate({'currency': 'YY'}) == {'currency': "'YY' is not one of ['EUR', 'USD', 'XX']"}
+
+def test_inherit_flattened():
+    address = oapi.model.Model('Address', {'road': oapi.fields.string()})
+    grand_parent = oapi.model.Model('GrandParent', {
+        'kind': oapi.fields.string(discriminator=True),
+        'address': oapi.fields.nested(address)
+    })
+    parent = grand_parent.inherit('Parent', {'age': oapi.fields.integer(required=True)}, flatten=True)
+    child = parent.inherit('Child', {'extra': oapi.fields.string()})
+
+    assert child.flatten is True
+    assert child.__schema__ == {
+        'properties': {
+            'kind': {'type': 'string'},
+            'address': {'$ref': '#/definitions/Address'},
+            'age': {'type': 'integer'},
+            'extra': {'type': 'string'}
+        },
+        'required': ['age', 'kind'],
+        'discriminator': 'kind',
+        'type': 'object'
+    }
+    assert child.__schema__ is child.__schema__
+    assert grand_parent.inherit('Other', {}).__schema__['allOf'][0] == {'$ref': '#/definitions/GrandParent'}
+    assert set(validation.referenced_models(child)) == {'Child', 'Address'}
+    assert child.validate({'kind': 'Child', 'age': 'x', 'address': {'road': 1}}) == {
+        'age': "'x' is not of type 'integer'",
+        'address.road': "1 is not of type 'string'"
+    }
+
+def test_model_validate_partial():
+    address = oapi.model.Model('Address', {
+        'road': oapi.fields.string(required=True),
+        'number': oapi.fields.integer(required=True)
+    })
+    model = oapi.model.Model('Person', {
+        'name': oapi.fields.string(required=True),
+        'address': oapi.fields.nested(address, required=True),
+        'required': oapi.fields.boolean()
+    })
+
+    assert model.validate({}) == {'name': "'name' is a required property", 'address': "'address' is a required property"}
+    assert model.validate({}, partial=True) is None
+    assert model.validate({'address': {'road': 'x'}, 'required': True}, partial=True) is None
+    assert model.validate({'address': {'number': 'x'}}, partial=True) == {'address.number': "'x' is not of type 'integer'"}
+    assert model.partial_validator is model.partial_validator
+    assert model.validate({}) == {'name': "'name' is a required property", 'address': "'address' is a required property"}
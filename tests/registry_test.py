@@ -0,0 +1,139 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import oapispec as oapi
+
+
+def make_handler(route):
+
+    @oapi.doc.route(route)
+    @oapi.doc.method('GET')
+    def handler():
+        pass
+
+    return handler
+
+class CountingExecutor(ThreadPoolExecutor):
+    '''A single thread executor counting the submitted tasks'''
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+    def wait(self):
+        super().submit(lambda: None).result()
+
+def test_registry_register_and_unregister():
+    a = make_handler('/a')
+    b = make_handler('/b')
+    sut = oapi.Registry(handlers=[a])
+
+    assert sut.register(b) is b
+    assert sut.handlers == [a, b]
+
+    sut.unregister(a)
+    assert sut.handlers == [b]
+
+def test_registry_unregister_unknown_handler_raises():
+    sut = oapi.Registry()
+
+    with pytest.raises(ValueError):
+        sut.unregister(make_handler('/a'))
+
+def test_registry_unregister_equal_reference():
+    reference = 'tests.assets.lazy_handlers.users:get_user'
+    sut = oapi.Registry(handlers=[reference, make_handler('/a')])
+
+    sut.unregister(''.join(['tests.assets.lazy_handlers.users', ':get_user']))
+
+    assert reference not in sut.handlers
+    assert len(sut.handlers) == 1
+
+def test_registry_snapshot_is_not_affected_by_later_writes():
+    sut = oapi.Registry(metadata={'title': 'Plugins'})
+    snapshot = sut.snapshot()
+
+    sut.register(make_handler('/a'))
+
+    assert snapshot.handlers == []
+    assert len(sut.snapshot().handlers) == 1
+    assert sut.snapshot().metadata.title == 'Plugins'
+
+def test_registry_concurrent_register():
+    sut = oapi.Registry()
+    handlers = [make_handler(f'/h{i}') for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(sut.register, handlers))
+
+    assert len(sut.handlers) == 200
+    assert set(sut.handlers) == set(handlers)
+
+def test_registry_generate_builds_first_spec_in_caller():
+    sut = oapi.Registry(handlers=[make_handler('/a')])
+
+    spec = sut.generate()
+
+    assert list(spec['paths'].keys()) == ['/a']
+    assert sut.generate() is spec
+
+def test_registry_generate_serves_stale_spec_while_rebuilding():
+    executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    executor.submit(release.wait, 5)  # keep the rebuild queued
+    sut = oapi.Registry(handlers=[make_handler('/a')], executor=executor)
+    first = sut.generate()
+
+    sut.register(make_handler('/b'))
+
+    assert sut.generate() is first
+    assert sut.generate() is first
+
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert sorted(sut.generate()['paths'].keys()) == ['/a', '/b']
+
+def test_registry_publish_swaps_in_new_spec():
+    sut = oapi.Registry(handlers=[make_handler('/a')])
+    first = sut.generate()
+
+    sut.register(make_handler('/b'))
+    published = sut.publish()
+
+    assert published is not first
+    assert sut.generate() is published
+    assert sut.publish() is published
+
+def test_registry_rebuild_failure_is_kept_until_handlers_change():
+    executor = CountingExecutor()
+    sut = oapi.Registry(handlers=[make_handler('/a')], executor=executor)
+    first = sut.generate()
+
+    @oapi.doc.method('GET')
+    def broken():
+        pass
+
+    sut.register(broken)
+    assert sut.generate() is first
+    executor.wait()
+
+    assert sut._rebuilding is False
+    assert isinstance(sut.last_error, Exception)
+    assert sut.generate() is first
+    assert executor.submitted == 1
+
+    sut.unregister(broken)
+    assert sut.generate() is first
+    executor.wait()
+
+    assert executor.submitted == 2
+    assert sut.last_error is None
+    assert sut.generate() is not first
+
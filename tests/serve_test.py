@@ -0,0 +1,196 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import BaseResponse
+
+import oapispec as oapi
+from oapispec import serve
+
+
+@oapi.doc.route('/ping')
+@oapi.doc.method('GET')
+def ping():
+    pass
+
+schema = oapi.schema(metadata={'title': 'Served API'}).register(ping)
+
+def make_client(**kwargs):
+    return Client(serve.wsgi_app(schema, **kwargs), BaseResponse)
+
+def asgi_request(app, method, path, headers=None):
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    }
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(app(scope, receive, send))
+    finally:
+        loop.close()
+    start, body = sent
+    return start['status'], dict((k.decode(), v.decode()) for k, v in start['headers']), body['body']
+
+def test_wsgi_serves_spec():
+    response = make_client().get('/swagger.json')
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.headers['Cache-Control'] == serve.DEFAULT_CACHE_CONTROL
+    assert response.headers['ETag'] == '"{0}"'.format(schema.fingerprint().spec)
+    assert json.loads(response.data) == schema.generate()
+
+def test_wsgi_serves_ui():
+    response = make_client(spec_url='https://mock.io/spec.json').get('/')
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert b'https://mock.io/spec.json' in response.data
+    assert b'Served API' in response.data
+
+def test_wsgi_ui_can_be_disabled():
+    assert make_client(ui_path=None).get('/').status_code == 404
+
+def test_wsgi_returns_not_modified_for_matching_etag():
+    client = make_client()
+    etag = client.get('/swagger.json').headers['ETag']
+
+    response = client.get('/swagger.json', headers={'If-None-Match': f'"other", W/{etag}'})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert 'Content-Length' not in response.headers
+
+def test_wsgi_etag_per_encoding():
+    client = make_client()
+    etag = client.get('/swagger.json').headers['ETag']
+    gzip_etag = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    assert gzip_etag == etag[:-1] + '-gzip"'
+    assert client.get('/swagger.json', headers={'If-None-Match': gzip_etag}).status_code == 200
+    response = client.get('/swagger.json', headers={'If-None-Match': gzip_etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == gzip_etag
+
+def test_wsgi_negotiates_compression():
+    client = make_client()
+    identity = client.get('/').data
+
+    response = client.get('/', headers={'Accept-Encoding': 'deflate, gzip;q=0.5'})
+    assert response.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(response.data) == identity
+
+    response = client.get('/', headers={'Accept-Encoding': 'deflate, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == identity
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip;q=0, deflate'})
+    assert response.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(response.data) == identity
+
+    response = client.get('/', headers={'Accept-Encoding': 'br'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+def test_wsgi_head_and_unsupported_methods():
+    client = make_client()
+
+    response = client.head('/swagger.json')
+    assert response.status_code == 200
+    assert response.data == b''
+    assert int(response.headers['Content-Length']) == len(client.get('/swagger.json').data)
+
+    response = client.post('/swagger.json')
+    assert response.status_code == 405
+    assert response.headers['Allow'] == 'GET, HEAD'
+
+def test_wsgi_unknown_path():
+    assert make_client().get('/nope').status_code == 404
+
+def test_asgi_serves_spec_with_conditional_requests():
+    app = serve.asgi_app(schema)
+
+    status, headers, body = asgi_request(app, 'GET', '/swagger.json', {'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['content-encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(body)) == schema.generate()
+
+    status, _, body = asgi_request(app, 'GET', '/swagger.json', {'If-None-Match': headers['etag'], 'Accept-Encoding': 'gzip'})
+    assert status == 304
+    assert body == b''
+
+def test_asgi_lifespan():
+    app = serve.asgi_app(schema)
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(app({'type': 'lifespan'}, receive, send))
+    loop.close()
+
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+def test_parse_accept_encoding():
+    assert serve.parse_accept_encoding('gzip;q=0.8, , br;q=bad, *') == {'gzip': 0.8, 'br': 0.0, '*': 1.0}
+    assert serve.parse_accept_encoding(None) == {}
+
+def test_negotiate_encoding_wildcard():
+    assert serve.negotiate_encoding('*', ('gzip', 'deflate')) == 'gzip'
+    assert serve.negotiate_encoding('*;q=0', ('gzip', 'deflate')) == 'identity'
+
+def test_negotiate_encoding():
+    available = ('gzip', 'deflate')
+
+    assert serve.negotiate_encoding('deflate;q=0.9, gzip;q=0.4', available) == 'deflate'
+    assert serve.negotiate_encoding('*;q=0.5, deflate;q=0.8', available) == 'deflate'
+    assert serve.negotiate_encoding('*', available) == 'gzip'
+    assert serve.negotiate_encoding('identity, gzip;q=0.5', available) == 'identity'
+    assert serve.negotiate_encoding('gzip, identity', available) == 'gzip'
+    assert serve.negotiate_encoding(None, available) == 'identity'
+
+def test_response_content_length():
+    assert ('Content-Length', '2') in serve.Response(200, [], b'ok').wsgi_headers
+    for status in (100, 204, 304):
+        assert not any(k == 'Content-Length' for k, _ in serve.Response(status).wsgi_headers)
+
+def test_etag_matches_wildcard():
+    assert serve.etag_matches('*', '"abc"')
+    assert not serve.etag_matches(None, '"abc"')
+    assert not serve.etag_matches('"other"', '"abc"')
+
+def test_compress_gzip_is_deterministic():
+    body = b'{"a": 1}' * 100
+    compressed = serve.compress(body, 'gzip')
+
+    assert compressed[4:8] == b'\x00\x00\x00\x00' # mtime
+    assert serve.compress(body, 'gzip') == compressed
+    assert gzip.decompress(compressed) == body
+
+def test_compress_unsupported_encoding_raises():
+    with pytest.raises(ValueError):
+        serve.compress(b'data', 'br')
+
+def test_resource_skips_compression_when_not_smaller():
+    resource = serve.Resource(b'x', 'text/plain')
+
+    assert resource.encodings == ()